@@ -5,3 +5,124 @@ load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
+
+# Password hashing pool
+HASH_EXECUTOR = os.getenv("HASH_EXECUTOR", "thread")  # "thread" or "process"
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "4"))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "64"))
+
+# Seat inventory
+MAX_SEATS_PER_BOOKING = int(os.getenv("MAX_SEATS_PER_BOOKING", "10"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "500"))  # items per batch booking call
+SEAT_CLAIM_RETRIES = int(os.getenv("SEAT_CLAIM_RETRIES", "5"))
+
+# Seat holds
+HOLD_TTL_SECONDS = int(os.getenv("HOLD_TTL_SECONDS", "300"))
+HOLD_SWEEP_INTERVAL_SECONDS = float(os.getenv("HOLD_SWEEP_INTERVAL_SECONDS", "5"))
+HOLD_SWEEP_BATCH_SIZE = int(os.getenv("HOLD_SWEEP_BATCH_SIZE", "500"))
+
+# Waitlist
+WAITLIST_PROMOTE_INTERVAL_SECONDS = float(
+    os.getenv("WAITLIST_PROMOTE_INTERVAL_SECONDS", "1")
+)
+
+# Booking pipeline (group commit for on-sale spikes)
+BOOKING_PIPELINE_ENABLED = os.getenv("BOOKING_PIPELINE_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+BOOKING_BATCH_SIZE = int(os.getenv("BOOKING_BATCH_SIZE", "64"))  # bookings per commit
+BOOKING_BATCH_WAIT_MS = float(os.getenv("BOOKING_BATCH_WAIT_MS", "5"))
+BOOKING_QUEUE_LIMIT = int(os.getenv("BOOKING_QUEUE_LIMIT", "1000"))
+# How long a request waits for its queued booking before giving up with a 503
+BOOKING_WAIT_SECONDS = float(os.getenv("BOOKING_WAIT_SECONDS", "30"))
+
+# Scheduling
+# Upper bound on a show's length; overlap checks only look this far back
+MAX_FILM_MINUTES = int(os.getenv("MAX_FILM_MINUTES", "600"))
+
+# Database
+DATABASE_MODE = os.getenv("DATABASE_MODE", "sync")  # "sync" or "async"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./movie.db")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///./movie.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() in ("1", "true", "yes")
+
+# Startup and shutdown
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", str(DB_POOL_SIZE)))
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "10"))
+
+# SQLite connection pragmas
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-20000"))  # negative = KiB
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Listings
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "1000"))
+
+# Movie search
+SEARCH_MAX_EXPANSIONS = int(os.getenv("SEARCH_MAX_EXPANSIONS", "50"))  # per query word
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "100"))
+
+# Caching
+REDIS_URL = os.getenv("REDIS_URL")  # unset = in-process backends
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", "300"))
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "1024"))
+
+# Shared state between workers
+STATE_BACKEND = os.getenv("STATE_BACKEND")  # "memory", "sqlite" or "redis"
+STATE_SQLITE_PATH = os.getenv("STATE_SQLITE_PATH", "./state.db")
+
+# Login throttling
+LOGIN_RATE_LIMIT_ENABLED = os.getenv("LOGIN_RATE_LIMIT_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", "20"))
+LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", "20"))
+LOGIN_USER_BURST = int(os.getenv("LOGIN_USER_BURST", "5"))
+LOGIN_USER_PER_MINUTE = float(os.getenv("LOGIN_USER_PER_MINUTE", "5"))
+LOGIN_MAX_FAILURES = int(os.getenv("LOGIN_MAX_FAILURES", "10"))  # per username
+LOGIN_FAILURE_WINDOW_SECONDS = int(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", "900"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Only enable behind a proxy that sets X-Forwarded-For itself
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Idempotency keys
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+# How long a running request keeps its key claimed if its worker dies
+IDEMPOTENCY_PENDING_SECONDS = int(os.getenv("IDEMPOTENCY_PENDING_SECONDS", "60"))
+
+# Live availability feed
+FEED_COALESCE_SECONDS = float(os.getenv("FEED_COALESCE_SECONDS", "0.25"))
+FEED_KEEPALIVE_SECONDS = float(os.getenv("FEED_KEEPALIVE_SECONDS", "15"))
+FEED_MAX_SUBSCRIBERS = int(os.getenv("FEED_MAX_SUBSCRIBERS", "10000"))  # per process
+
+# Instrumentation
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Access tokens
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose")  # "jose" or "pyjwt"
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+# Listing responses
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson")  # "orjson" or "pydantic"
@@ -0,0 +1,217 @@
+"""What one worker process owns from startup to shutdown.
+
+State every worker must agree on (catalog cache, idempotency keys, login
+limits, feed events) lives in the backend chosen by STATE_BACKEND, see
+app.utils.state. What stays per process (pools, the search index, the hold
+and waitlist queues) is rebuilt from the database on startup, so any
+number of uvicorn workers can serve the same database side by side.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import suppress
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.config import (
+    AUTO_MIGRATE,
+    BOOKING_PIPELINE_ENABLED,
+    DEFAULT_PAGE_SIZE,
+    SHUTDOWN_DRAIN_SECONDS,
+    WARMUP_CONNECTIONS,
+    WARMUP_ENABLED,
+)
+from app.database import SessionLocal, async_engine, engine
+from app.migrations import run_migrations
+from app.models.booking import Booking
+from app.models.movie import Movie
+from app.models.seat import Seat
+from app.utils.cache import catalog_cache
+from app.utils.catalog import catalog_page
+from app.utils.feed import availability, feed_broker, feed_hub
+from app.utils.hashing import hash_pool
+from app.utils.holds import load_active_holds, run_hold_sweeper
+from app.utils.pagination import MovieFilters, PageParams
+from app.utils.pipeline import booking_pipeline
+from app.utils.schedule import next_showings, playing_at
+from app.utils.search import search_index
+from app.utils.state import backend_name, close_state_backend
+from app.utils.waitlist import (
+    available_seats,
+    latest_entry,
+    load_waitlists,
+    run_waitlist_worker,
+)
+
+logger = logging.getLogger(__name__)
+
+# The reads behind the busiest endpoints, run once against a show that does
+# not exist so SQLAlchemy compiles and caches their statements before the
+# first request needs them.
+HOT_READS = (
+    lambda db: db.query(Movie).filter(Movie.id == 0).first(),  # booking, seats
+    lambda db: db.query(Seat.label, Seat.row, Seat.number, Seat.status)
+    .filter(Seat.movie_id == 0)
+    .order_by(Seat.row, Seat.number)
+    .all(),
+    lambda db: db.query(Booking.user_id, Booking.movie_id)
+    .filter(Booking.user_id == 0)
+    .all(),
+    lambda db: availability(db, 0),
+    lambda db: available_seats(db, 0),
+    lambda db: latest_entry(db, 0, 0),
+    lambda db: playing_at(db, 0, datetime.min, datetime.max),
+    lambda db: next_showings(db, 0, datetime.min, 10),
+)
+
+
+def open_pool(engine, count: int) -> int:
+    """Open up to `count` pool connections at once and hand them back, so the
+    first requests find them connected and configured."""
+    size = getattr(engine.pool, "size", None)
+    count = min(count, size()) if size else min(count, 1)
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def open_async_pool(engine, count: int) -> int:
+    size = getattr(engine.sync_engine.pool, "size", None)
+    count = min(count, size()) if size else min(count, 1)
+    connections = []
+    try:
+        for _ in range(count):
+            connection = await engine.connect()
+            connections.append(connection)
+            await connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
+
+
+def warm_up(engine, session_factory, connections: int = WARMUP_CONNECTIONS) -> dict:
+    """Pre-open pool connections, prime the first catalog page and compile
+    the hot queries. Returns what was done and how long it took."""
+    started = time.perf_counter()
+    opened = open_pool(engine, connections)
+    with session_factory() as db:
+        page = PageParams(limit=DEFAULT_PAGE_SIZE, cursor=None, fields=None)
+        _, cache_status = catalog_page(db, page, MovieFilters(sort="id"))
+        for read in HOT_READS:
+            read(db)
+    return {
+        "connections": opened,
+        "catalog_primed": cache_status == "MISS",
+        "queries": len(HOT_READS),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+class AppContext:
+    """Starts and stops one worker process.
+
+    `start` brings the schema up to date, reloads the per-process state,
+    warms up and starts the background workers. `stop` lets the workers
+    finish the pass they are in and the booking pipeline commit what is
+    queued (up to `drain_seconds`), then releases the hashing pool, the
+    shared-state backend and every pooled connection.
+    """
+
+    def __init__(
+        self,
+        engine,
+        session_factory,
+        async_engine=None,
+        drain_seconds: float = SHUTDOWN_DRAIN_SECONDS,
+    ):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.async_engine = async_engine
+        self.drain_seconds = drain_seconds
+        self.status = "stopped"
+        self.warmup: dict = {}
+        self._stopping: asyncio.Event | None = None
+        self._workers: list[asyncio.Task] = []
+        self._relay: asyncio.Task | None = None
+
+    async def start(self):
+        self.status = "starting"
+        # Bring the schema up to date; set AUTO_MIGRATE=false when several
+        # workers share a database and run `python -m app.migrations` once
+        if AUTO_MIGRATE:
+            run_migrations(self.engine)
+        # Pick up holds and waitlists left pending when the process last stopped
+        with self.session_factory() as db:
+            load_active_holds(db)
+            load_waitlists(db)
+            search_index.load(db, catalog_cache.version())
+        if WARMUP_ENABLED:
+            self.warmup = await asyncio.to_thread(
+                warm_up, self.engine, self.session_factory
+            )
+            if self.async_engine is not None:
+                self.warmup["async_connections"] = await open_async_pool(
+                    self.async_engine, WARMUP_CONNECTIONS
+                )
+            logger.info("Warm-up done: %s", self.warmup)
+
+        self._stopping = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(run_hold_sweeper(self.session_factory, self._stopping)),
+            asyncio.create_task(
+                run_waitlist_worker(self.session_factory, self._stopping)
+            ),
+        ]
+        # Availability updates are fanned out to SSE subscribers on this loop
+        feed_hub.start(asyncio.get_running_loop())
+        self._relay = asyncio.create_task(feed_broker.run())
+        if BOOKING_PIPELINE_ENABLED:
+            booking_pipeline.start(self.session_factory)
+        self.status = "ready"
+
+    async def stop(self):
+        """Safe to call after a `start` that failed part way."""
+        self.status = "draining"
+        if self._relay is not None:
+            self._relay.cancel()
+        if self._stopping is not None:
+            self._stopping.set()
+        # Queued bookings are committed before the pools close
+        draining = [*self._workers, asyncio.create_task(booking_pipeline.stop())]
+        _, pending = await asyncio.wait(draining, timeout=self.drain_seconds)
+        if pending:
+            logger.warning("%s background tasks did not drain in time", len(pending))
+        for task in (self._relay, *pending):
+            if task is None:
+                continue
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+        hash_pool.shutdown()
+        close_state_backend()
+        self.engine.dispose()
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+        self.status = "stopped"
+
+    def stats(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "status": self.status,
+            "state_backend": backend_name(),
+            "warmup": self.warmup,
+        }
+
+
+app_context = AppContext(engine, SessionLocal, async_engine)
@@ -1,12 +1,103 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./movie.db"
+from app.utils.metrics import instrument_engine
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+from app.config import (
+    DATABASE_MODE,
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+)
+
+# INSERT constructs that support ON CONFLICT upserts
+DIALECT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+SQLITE_PRAGMAS = (
+    f"journal_mode={SQLITE_JOURNAL_MODE}",
+    f"synchronous={SQLITE_SYNCHRONOUS}",
+    f"busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+    f"cache_size={SQLITE_CACHE_SIZE}",
+    f"mmap_size={SQLITE_MMAP_SIZE}",
+)
+
+
+def engine_options(url: str) -> dict:
+    """Pool settings for `url`; in-memory SQLite keeps its single-connection pool."""
+    url = make_url(url)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if url.get_backend_name() == "sqlite":
+        if url.get_driver_name() == "pysqlite":
+            options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLITE_PRAGMAS to every new connection so readers never block on writers."""
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+def create_db_engine(url: str):
+    engine = create_engine(url, **engine_options(url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", set_sqlite_pragmas)
+    instrument_engine(engine)
+    return engine
+
+
+def pool_stats(engine) -> dict:
+    """Connection pool counters, for QueuePool-style pools that expose them."""
+    pool = engine.pool
+    stats = {"url": engine.url.render_as_string(), "pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    stats["status"] = pool.status()
+    return stats
+
+
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async mode (DATABASE_MODE=async) needs an async driver such as aiosqlite,
+# so the async engine is only built when it has been asked for.
+async_engine = None
+AsyncSessionLocal = None
+if DATABASE_MODE == "async":
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL)
+    )
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
 
 # Dependency
 def get_db():
@@ -15,3 +106,19 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async Dependency
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_sync_handler(db, handler, **kwargs):
+    """Run a sync route handler against an AsyncSession.
+
+    The handler's ORM code runs on the session's greenlet bridge, so every
+    database round trip is awaited on the event loop rather than blocking a
+    threadpool slot, and both modes share a single implementation.
+    """
+    return await db.run_sync(lambda session: handler(db=session, **kwargs))
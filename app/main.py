@@ -1,20 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.database import engine
-from app.models import booking, movie, user
-from app.routes import adminRoute, authRoute, userRoute
+from app.config import DATABASE_MODE, METRICS_ENABLED
+from app.context import app_context
+from app.routes import adminRoute, authRoute, metricsRoute, userRoute
+from app.utils.idempotency import IdempotencyMiddleware
+from app.utils.metrics import MetricsMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Migrations, warm-up and background workers; see app.context
+    try:
+        await app_context.start()
+        yield
+    finally:
+        await app_context.stop()
 
-# Create All The Databases tables
-booking.Base.metadata.create_all(bind=engine)
-movie.Base.metadata.create_all(bind=engine)
-user.Base.metadata.create_all(bind=engine)
 
 # Creating the app
 app = FastAPI(
     title="Movie Ticket Booking API 🎬",
     description="An API for booking movie tickets with JWT authentication and role-based access control.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+# Added first so it runs inside the metrics middleware and replays are timed
+app.add_middleware(IdempotencyMiddleware)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metricsRoute.router)  # Prometheus Metrics
+
 app.include_router(authRoute.router)  # Auth Routes
+if DATABASE_MODE == "async":
+    from app.routes import asyncAdminRoute, asyncUserRoute
+
+    # Registered first so they take precedence over the sync handlers
+    app.include_router(asyncAdminRoute.router)  # Async Admin Routes
+    app.include_router(asyncUserRoute.router)  # Async User Routes
 app.include_router(adminRoute.router)  # Admin Routes
 app.include_router(userRoute.router)  # User Routes
@@ -0,0 +1,224 @@
+"""Versioned schema migrations, applied at startup or with `python -m app.migrations`.
+
+The models are the source of truth: migration 1 creates any missing table
+from the current metadata, so a fresh database is complete after it and the
+later migrations find nothing to do. Those later migrations bring databases
+created by older releases up to date, and must therefore be idempotent.
+
+To change the schema, update the model and append a migration that applies
+the same change to an existing database.
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    inspect,
+    select,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import visitors
+
+from app.database import Base
+from app.models import (  # noqa: F401
+    auditorium,
+    booking,
+    film,
+    hold,
+    movie,
+    occupancy,
+    refresh_token,
+    seat,
+    theater,
+    user,
+    waitlist,
+)
+
+logger = logging.getLogger(__name__)
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+MIGRATIONS = []
+
+
+def migration(version: int, name: str):
+    def register(upgrade):
+        MIGRATIONS.append((version, name, upgrade))
+        return upgrade
+
+    return register
+
+
+def add_column_if_missing(conn: Connection, table_name: str, column: Column):
+    if column.name in {c["name"] for c in inspect(conn).get_columns(table_name)}:
+        return
+    column_type = column.type.compile(dialect=conn.dialect)
+    ddl = f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}"
+    if column.foreign_keys:
+        target = next(iter(column.foreign_keys)).target_fullname.split(".")
+        ddl += f" REFERENCES {target[0]} ({target[1]})"
+    conn.exec_driver_sql(ddl)
+
+
+def index_columns(index: Index) -> set[str]:
+    """Names of the columns an index covers or filters on."""
+    names = {column.name for column in index.columns}
+    for options in index.dialect_options.values():
+        if options.get("where") is not None:
+            names |= {
+                element.name
+                for element in visitors.iterate(options["where"])
+                if isinstance(element, Column)
+            }
+    return names
+
+
+def create_missing_indexes(conn: Connection, table: Table):
+    """Create every index the model declares that the database lacks.
+
+    Indexes on columns the table does not have yet are left to the later
+    migration that adds those columns.
+    """
+    schema = inspect(conn)
+    existing = {index["name"] for index in schema.get_indexes(table.name)}
+    columns = {column["name"] for column in schema.get_columns(table.name)}
+    for index in table.indexes:
+        if index.name not in existing and index_columns(index) <= columns:
+            index.create(conn)
+
+
+@migration(1, "create tables")
+def create_tables(conn: Connection):
+    Base.metadata.create_all(conn)
+
+
+@migration(2, "add movies.auditorium_id")
+def add_movie_auditorium(conn: Connection):
+    add_column_if_missing(
+        conn,
+        "movies",
+        Column("auditorium_id", Integer, ForeignKey("auditoriums.id")),
+    )
+
+
+@migration(3, "add unique and composite indexes for hot queries")
+def add_hot_query_indexes(conn: Connection):
+    # Fails if existing rows already break a new unique index (duplicate
+    # bookings or movies); those must be cleaned up by hand first.
+    for table in Base.metadata.sorted_tables:
+        create_missing_indexes(conn, table)
+
+
+@migration(4, "add refresh_tokens")
+def add_refresh_tokens(conn: Connection):
+    refresh_token.RefreshToken.__table__.create(conn, checkfirst=True)
+    create_missing_indexes(conn, refresh_token.RefreshToken.__table__)
+
+
+@migration(5, "add waitlist_entries")
+def add_waitlist(conn: Connection):
+    waitlist.WaitlistEntry.__table__.create(conn, checkfirst=True)
+    create_missing_indexes(conn, waitlist.WaitlistEntry.__table__)
+
+
+@migration(6, "add occupancy counters and hourly booking rollup")
+def add_occupancy(conn: Connection):
+    from app.utils.analytics import reconcile_occupancy
+
+    for model in (occupancy.MovieOccupancy, occupancy.HourlyBookings):
+        table = model.__table__
+        table.create(conn, checkfirst=True)
+        create_missing_indexes(conn, table)
+    # Existing bookings predate the counters
+    reconcile_occupancy(conn)
+
+
+@migration(7, "add films, theaters and screen schedules")
+def add_schedules(conn: Connection):
+    # Existing shows keep film_id NULL: they have no known running time
+    for model in (theater.Theater, film.Film):
+        model.__table__.create(conn, checkfirst=True)
+    add_column_if_missing(
+        conn, "auditoriums", Column("theater_id", Integer, ForeignKey("theaters.id"))
+    )
+    add_column_if_missing(
+        conn, "movies", Column("film_id", Integer, ForeignKey("films.id"))
+    )
+    add_column_if_missing(conn, "movies", Column("ends_at", DateTime))
+    create_missing_indexes(conn, auditorium.Auditorium.__table__)
+    create_missing_indexes(conn, movie.Movie.__table__)
+
+
+@migration(8, "key the hourly booking rollup by show")
+def split_hourly_bookings(conn: Connection):
+    columns = {c["name"] for c in inspect(conn).get_columns("booking_hourly")}
+    if "movie_id" in columns:
+        return
+    # The old rows cannot be attributed to shows; they are kept under show 0.
+    # The rollup holds one row per hour, so it is rebuilt in memory.
+    hourly = Table(
+        "booking_hourly",
+        MetaData(),
+        Column("hour", DateTime, primary_key=True),
+        Column("booked", Integer),
+        Column("cancelled", Integer),
+    )
+    rows = [{**row._mapping, "movie_id": 0} for row in conn.execute(select(hourly))]
+    table = occupancy.HourlyBookings.__table__
+    table.drop(conn)
+    table.create(conn)
+    if rows:
+        conn.execute(table.insert(), rows)
+
+
+@migration(9, "leave scheduled shows out of the movie title key")
+def narrow_movie_title_key(conn: Connection):
+    conn.exec_driver_sql("DROP INDEX IF EXISTS uq_movies_title_showtime")
+    create_missing_indexes(conn, movie.Movie.__table__)
+
+
+def applied_versions(conn: Connection) -> set[int]:
+    schema_migrations.create(conn, checkfirst=True)
+    versions = conn.execute(select(schema_migrations.c.version))
+    return {version for (version,) in versions}
+
+
+def run_migrations(engine) -> list[int]:
+    """Apply pending migrations in order, one transaction each."""
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    ran = []
+    for version, name, upgrade in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+        logger.info("Applying migration %s: %s", version, name)
+        with engine.begin() as conn:
+            upgrade(conn)
+            conn.execute(
+                schema_migrations.insert().values(
+                    version=version, name=name, applied_at=datetime.utcnow()
+                )
+            )
+        ran.append(version)
+    return ran
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    applied = run_migrations(engine)
+    print(f"Applied migrations: {applied}" if applied else "Database is up to date")
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.database import Base
+
+
+class Auditorium(Base):
+    """A screen's seat layout, optionally part of a theater."""
+
+    __tablename__ = "auditoriums"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True)
+    rows = Column(Integer, nullable=False)
+    seats_per_row = Column(Integer, nullable=False)
+    theater_id = Column(Integer, ForeignKey("theaters.id"), nullable=True, index=True)
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Also serves lookups by user_id alone (booking history)
+        Index("uq_bookings_user_movie", "user_id", "movie_id", unique=True),
+        Index("ix_bookings_movie_id", "movie_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     movie_id = Column(Integer, ForeignKey("movies.id"))
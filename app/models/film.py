@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+
+class Film(Base):
+    """A film, described once however many showtimes it has."""
+
+    __tablename__ = "films"
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, nullable=False, index=True)
+    description = Column(String)
+    duration_minutes = Column(Integer, nullable=False)
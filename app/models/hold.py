@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.database import Base
+
+HOLD_ACTIVE = "active"
+HOLD_CONFIRMED = "confirmed"
+HOLD_RELEASED = "released"
+HOLD_EXPIRED = "expired"
+
+
+class SeatHold(Base):
+    __tablename__ = "seat_holds"
+    __table_args__ = (Index("ix_seat_holds_status_expires_at", "status", "expires_at"),)
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    movie_id = Column(Integer, ForeignKey("movies.id"), nullable=False)
+    status = Column(String, nullable=False, default=HOLD_ACTIVE)
+    expires_at = Column(DateTime, nullable=False)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)
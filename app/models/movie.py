@@ -1,10 +1,32 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from app.database import Base
 
 
 class Movie(Base):
+    """One showing. Shows scheduled from a film have `film_id` and `ends_at`,
+    and keep a copy of the film's title for listings and search."""
+
     __tablename__ = "movies"
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(String)
-    showtime = Column(DateTime)
+    showtime = Column(DateTime, index=True)
+    auditorium_id = Column(Integer, ForeignKey("auditoriums.id"), nullable=True)
+    film_id = Column(Integer, ForeignKey("films.id"), nullable=True)
+    ends_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Scheduled shows copy their film's title, and one film may start on
+        # several screens at once; they are kept apart by screen overlap checks
+        Index(
+            "uq_movies_title_showtime",
+            "title",
+            "showtime",
+            unique=True,
+            sqlite_where=film_id.is_(None),
+            postgresql_where=film_id.is_(None),
+        ),
+        # A screen's schedule and a film's showings are range scans of these
+        Index("ix_movies_screen_start", "auditorium_id", "showtime"),
+        Index("ix_movies_film_start", "film_id", "showtime"),
+    )
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from app.database import Base
+
+
+class MovieOccupancy(Base):
+    """Bookings and tickets sold per show, kept in step with `bookings`.
+
+    `tickets` counts booked seats for reserved-seating shows and one per
+    booking otherwise.
+    """
+
+    __tablename__ = "movie_occupancy"
+    # Top movies is a backwards walk of this index
+    __table_args__ = (Index("ix_movie_occupancy_tickets", "tickets", "movie_id"),)
+    movie_id = Column(Integer, ForeignKey("movies.id"), primary_key=True)
+    bookings = Column(Integer, nullable=False, default=0)
+    tickets = Column(Integer, nullable=False, default=0)
+
+
+class HourlyBookings(Base):
+    """Bookings made and cancelled per show and clock hour (UTC).
+
+    Keyed by show so concurrent bookings of different shows never update the
+    same row; totals per hour are summed at read time. There is no foreign
+    key: the history outlives deleted shows. Rows carried over from the
+    older, global rollup have movie_id 0.
+    """
+
+    __tablename__ = "booking_hourly"
+    hour = Column(DateTime, primary_key=True)
+    movie_id = Column(Integer, primary_key=True)
+    booked = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
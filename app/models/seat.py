@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.database import Base
+
+SEAT_AVAILABLE = "available"
+SEAT_HELD = "held"
+SEAT_BOOKED = "booked"
+
+
+class Seat(Base):
+    __tablename__ = "seats"
+    __table_args__ = (
+        Index("uq_seats_movie_label", "movie_id", "label", unique=True),
+        Index("ix_seats_movie_status", "movie_id", "status"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    movie_id = Column(Integer, ForeignKey("movies.id"), nullable=False)
+    label = Column(String, nullable=False)
+    row = Column(Integer, nullable=False)
+    number = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default=SEAT_AVAILABLE)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True, index=True)
+    hold_id = Column(Integer, ForeignKey("seat_holds.id"), nullable=True, index=True)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+
+class Theater(Base):
+    """A cinema; its screens are the auditoriums with its `theater_id`."""
+
+    __tablename__ = "theaters"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
+from app.database import Base
+
+WAITLIST_WAITING = "waiting"
+WAITLIST_PROMOTED = "promoted"
+WAITLIST_LEFT = "left"
+
+
+class WaitlistEntry(Base):
+    """A user queued for a sold-out show; the id orders the queue (FIFO)."""
+
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        # Head of a show's queue and a user's position are index range scans
+        Index("ix_waitlist_movie_status_id", "movie_id", "status", "id"),
+        # One waiting entry per user and show; past entries are kept
+        Index(
+            "uq_waitlist_waiting_user_movie",
+            "user_id",
+            "movie_id",
+            unique=True,
+            sqlite_where=text("status = 'waiting'"),
+            postgresql_where=text("status = 'waiting'"),
+        ),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    movie_id = Column(Integer, ForeignKey("movies.id"), nullable=False)
+    quantity = Column(Integer, nullable=False, default=1)
+    status = Column(String, nullable=False, default=WAITLIST_WAITING)
+    created_at = Column(DateTime, nullable=False)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)
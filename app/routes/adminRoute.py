@@ -1,34 +1,157 @@
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import Annotated, List
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.config import BULK_IMPORT_CHUNK_SIZE
+from app.context import app_context
+from app.database import get_db, engine, async_engine, pool_stats
 from app.models.movie import Movie
 from app.models.booking import Booking
-from app.schemas.movieSchema import MovieCreate, MovieResponse, ViewMovieResponse
-from app.schemas.bookingSchema import ViewBooking
-from app.utils.exceptions import MOVIE_NOT_FOUND_ERROR, INVALID_MOVIE_DATA
+from app.models.auditorium import Auditorium
+from app.models.film import Film
+from app.models.theater import Theater
+from app.models.seat import Seat
+from app.models.user import User
+from app.schemas.movieSchema import (
+    BulkImportReport,
+    MovieCreate,
+    MovieResponse,
+    ViewMovieResponse,
+)
+from app.schemas.bookingSchema import (
+    AdminBatchBookingCreate,
+    AdminBatchCancel,
+    BatchResponse,
+    ViewBooking,
+)
+from app.schemas.seatSchema import AuditoriumCreate, AuditoriumResponse
+from app.schemas.scheduleSchema import (
+    FilmCreate,
+    FilmResponse,
+    ShowtimeCreate,
+    ShowtimeView,
+    TheaterCreate,
+    TheaterResponse,
+)
+from app.schemas.analyticsSchema import (
+    DailyFillRate,
+    HourlyBookingCount,
+    ReconcileReport,
+    TopMovie,
+)
+from app.utils.exceptions import (
+    MOVIE_NOT_FOUND_ERROR,
+    MOVIE_ALREADY_EXISTS_ERROR,
+    INVALID_MOVIE_DATA,
+    AUDITORIUM_NOT_FOUND_ERROR,
+    AUDITORIUM_ALREADY_EXISTS_ERROR,
+    FILM_NOT_FOUND_ERROR,
+    THEATER_ALREADY_EXISTS_ERROR,
+    THEATER_NOT_FOUND_ERROR,
+    USER_NOT_FOUND_ERROR,
+)
 from app.utils.dependencies import is_admin
+from app.utils.bulk import MovieImporter, iter_row_batches
+from app.utils.batch import book_batch, cancel_batch, changed_movies, summarize
+from app.utils.feed import feed_hub, notify_availability
+from app.utils.waitlist import promotion_queue, request_promotion
+from app.utils.cache import catalog_cache
+from app.utils.search import search_index
+from app.utils.hashing import hash_pool
+from app.utils.pipeline import booking_pipeline
+from app.utils.holds import hold_stats
+from app.utils.tokens import token_cache
+from app.utils.refresh import revoke_user_refresh_tokens
+from app.utils.ratelimit import login_limiter
+from app.utils.inventory import build_seat_map, replace_seat_map
+from app.utils.schedule import check_screen_free, lock_screen, schedule_show, show_end
+from app.utils.analytics import (
+    bookings_per_hour,
+    fill_rate_by_day,
+    forget_movie,
+    reconcile_occupancy,
+    top_movies,
+)
+from app.utils.export import (
+    csv_chunks,
+    gzip_chunks,
+    iter_booking_batches,
+    ndjson_chunks,
+)
+from app.utils.pagination import (
+    BookingFilters,
+    MovieFilters,
+    PageParams,
+    paginate,
+    parse_fields,
+)
+from app.utils.serialization import json_rows_response, seconds_datetime
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+MOVIE_COLUMNS = {
+    "id": Movie.id,
+    "title": Movie.title,
+    "description": Movie.description,
+    "showtime": Movie.showtime,
+    "auditorium_id": Movie.auditorium_id,
+    "film_id": Movie.film_id,
+}
+BOOKING_COLUMNS = {
+    "id": Booking.id,
+    "user_id": Booking.user_id,
+    "movie_id": Booking.movie_id,
+}
+
+
+def flush_movie(db: Session):
+    """Flush pending movie changes, mapping a (title, showtime) clash to a 400."""
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise MOVIE_ALREADY_EXISTS_ERROR
+
+
+def claim_screen(
+    db: Session,
+    auditorium_id: int | None,
+    start: datetime,
+    end: datetime | None = None,
+    exclude_id: int | None = None,
+):
+    """Lock a screen and check that it is free from `start` to `end`,
+    treating `None` as general admission. Returns the auditorium."""
+    if auditorium_id is None:
+        return None
+    auditorium = lock_screen(db, auditorium_id)
+    if not auditorium:
+        raise AUDITORIUM_NOT_FOUND_ERROR
+    check_screen_free(db, auditorium_id, start, end, exclude_id)
+    return auditorium
+
 
 @router.get(
     "/movies", status_code=status.HTTP_200_OK
 )
-def get_movies(db: Annotated[Session, Depends(get_db)], user: dict = Depends(is_admin)):
-    """Retrieve a list of all movies available in the database."""
-    movies = db.query(Movie).all()
-    return [
-        {
-            "id": movie.id,
-            "title": movie.title,
-            "description": movie.description,
-            "showtime": movie.showtime.strftime("%Y-%m-%d %H:%M:%S")  
-        }
-        for movie in movies
-    ]
+def get_movies(
+    db: Annotated[Session, Depends(get_db)],
+    page: Annotated[PageParams, Depends()],
+    filters: Annotated[MovieFilters, Depends()],
+    user: dict = Depends(is_admin),
+):
+    """Retrieve one page of movies, optionally filtered and projected."""
+    fields = parse_fields(
+        page.fields, MOVIE_COLUMNS, ("id", "title", "description", "showtime")
+    )
+    movies, next_cursor = paginate(
+        db, MOVIE_COLUMNS, fields, filters.sort_columns(), page, filters.clauses()
+    )
+    return json_rows_response(movies, next_cursor, format_datetime=seconds_datetime)
 
 
 @router.post(
@@ -42,16 +165,45 @@ def add_movie(
     """Add a new movie to the database."""
     if not request.title or not request.description or not request.showtime:
         return INVALID_MOVIE_DATA
+    auditorium = claim_screen(db, request.auditorium_id, request.showtime)
     new_movie = Movie(
         title=request.title, description=request.description, 
-        showtime=request.showtime
+        showtime=request.showtime, auditorium_id=request.auditorium_id
     )
     db.add(new_movie)
+    flush_movie(db)
+    if auditorium:
+        build_seat_map(db, new_movie.id, auditorium)
     db.commit()
     db.refresh(new_movie)
+    search_index.upsert(new_movie, catalog_cache.invalidate())
     return {"message": "Movie added successfully", "movie": new_movie}
 
 
+@router.post(
+    "/movies/bulk", response_model=BulkImportReport, status_code=status.HTTP_200_OK
+)
+async def bulk_import_movies(
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+    on_conflict: str = Query("update", pattern="^(update|skip|error)$"),
+    user: dict = Depends(is_admin),
+):
+    """Create or update many movies from a JSON array, NDJSON or CSV upload.
+
+    Rows are matched on (title, showtime). The body is consumed as it
+    streams in and written one chunk per transaction, so rows from chunks
+    that were already committed stay in place if a later row fails.
+    """
+    importer = await run_in_threadpool(MovieImporter, db, on_conflict)
+    async for batch in iter_row_batches(request, BULK_IMPORT_CHUNK_SIZE):
+        await run_in_threadpool(importer.import_batch, batch)
+    if importer.written:
+        version = catalog_cache.invalidate()
+        await run_in_threadpool(search_index.refresh, db, importer.movie_ids, version)
+    return importer.report()
+
+
 @router.put("/movies/{id}", response_model=MovieResponse)
 def update_movie(
     id: int,
@@ -64,10 +216,28 @@ def update_movie(
     if not existing_movie:
         raise MOVIE_NOT_FOUND_ERROR
 
+    # A PUT that leaves out auditorium_id keeps the show's seating as it is
+    moved = "auditorium_id" in request.model_fields_set and (
+        request.auditorium_id != existing_movie.auditorium_id
+    )
+    auditorium_id = request.auditorium_id if moved else existing_movie.auditorium_id
+    film = existing_movie.film_id and db.get(Film, existing_movie.film_id)
+    ends_at = show_end(film, request.showtime)
+    if moved or request.showtime != existing_movie.showtime:
+        auditorium = claim_screen(
+            db, auditorium_id, request.showtime, ends_at, exclude_id=id
+        )
+    if moved:
+        replace_seat_map(db, existing_movie, auditorium)
+        existing_movie.auditorium_id = request.auditorium_id
+
     existing_movie.title = request.title
     existing_movie.description = request.description
     existing_movie.showtime = request.showtime
+    existing_movie.ends_at = ends_at
+    flush_movie(db)
     db.commit()
+    search_index.upsert(existing_movie, catalog_cache.invalidate())
     return {"message": "Movie Updated Successfully", "movie": existing_movie}
 
 
@@ -79,14 +249,317 @@ def delete_movie(
     existing_movie = db.query(Movie).filter(Movie.id == id).first()
     if not existing_movie:
         raise MOVIE_NOT_FOUND_ERROR
+    db.query(Seat).filter(Seat.movie_id == id).delete(synchronize_session=False)
+    forget_movie(db, id)
     db.delete(existing_movie)
     db.commit()
+    search_index.remove(id, catalog_cache.invalidate())
     return {"message": "Movie deleted successfully", "movie": existing_movie}
 
 
-@router.get("/bookings", response_model=List[ViewBooking])
+@router.get(
+    "/bookings", response_model=List[ViewBooking], response_model_exclude_unset=True
+)
 def get_bookings(
+    db: Annotated[Session, Depends(get_db)],
+    page: Annotated[PageParams, Depends()],
+    filters: Annotated[BookingFilters, Depends()],
+    user: dict = Depends(is_admin),
+):
+    """Retrieve one page of movie bookings, optionally filtered and projected."""
+    fields = parse_fields(page.fields, BOOKING_COLUMNS, ("user_id", "movie_id"))
+    bookings, next_cursor = paginate(
+        db, BOOKING_COLUMNS, fields, (Booking.id,), page, filters.clauses()
+    )
+    return json_rows_response(bookings, next_cursor)
+
+
+@router.post(
+    "/bookings/batch", response_model=BatchResponse, status_code=status.HTTP_200_OK
+)
+def book_tickets_batch(
+    request: AdminBatchBookingCreate,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_admin),
+):
+    """Book tickets on behalf of many users in one transaction."""
+    results = book_batch(
+        db, [item.model_dump() for item in request.items], check_users=True
+    )
+    db.commit()
+    notify_availability(db, changed_movies(results))
+    return summarize(results)
+
+
+@router.post(
+    "/bookings/batch/cancel",
+    response_model=BatchResponse,
+    status_code=status.HTTP_200_OK,
+)
+def cancel_bookings_batch(
+    request: AdminBatchCancel,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_admin),
+):
+    """Cancel bookings for many users in one transaction."""
+    results = cancel_batch(db, [item.model_dump() for item in request.items])
+    db.commit()
+    request_promotion(changed_movies(results))
+    notify_availability(db, changed_movies(results))
+    return summarize(results)
+
+
+@router.get("/bookings/export", response_class=StreamingResponse)
+def export_bookings(
+    db: Annotated[Session, Depends(get_db)],
+    filters: Annotated[BookingFilters, Depends()],
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    user: dict = Depends(is_admin),
+):
+    """Stream every booking as NDJSON or CSV in constant memory."""
+    batches = iter_booking_batches(db.get_bind(), filters.clauses())
+    if format == "csv":
+        chunks, media_type = csv_chunks(batches), "text/csv"
+    else:
+        chunks, media_type = ndjson_chunks(batches), "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="bookings.{format}"'}
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+@router.post(
+    "/auditoriums",
+    response_model=AuditoriumResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def add_auditorium(
+    request: AuditoriumCreate,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_admin),
+):
+    """Add an auditorium seat layout that shows can be scheduled in.
+
+    Set `theater_id` to make it one of that theater's screens.
+    """
+    existing = db.query(Auditorium).filter(Auditorium.name == request.name).first()
+    if existing:
+        raise AUDITORIUM_ALREADY_EXISTS_ERROR
+    if request.theater_id is not None and not db.get(Theater, request.theater_id):
+        raise THEATER_NOT_FOUND_ERROR
+    auditorium = Auditorium(
+        name=request.name,
+        rows=request.rows,
+        seats_per_row=request.seats_per_row,
+        theater_id=request.theater_id,
+    )
+    db.add(auditorium)
+    db.commit()
+    db.refresh(auditorium)
+    return auditorium
+
+
+@router.get("/auditoriums", response_model=List[AuditoriumResponse])
+def get_auditoriums(
     db: Annotated[Session, Depends(get_db)], user: dict = Depends(is_admin)
 ):
-    """Retrieve a list of all movie bookings."""
-    return db.query(Booking).all()
+    """Retrieve all auditorium layouts."""
+    return db.query(Auditorium).all()
+
+
+@router.post(
+    "/theaters", response_model=TheaterResponse, status_code=status.HTTP_201_CREATED
+)
+def add_theater(
+    request: TheaterCreate,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_admin),
+):
+    """Add a theater; its screens are auditoriums created with its id."""
+    if db.query(Theater.id).filter(Theater.name == request.name).first():
+        raise THEATER_ALREADY_EXISTS_ERROR
+    theater = Theater(name=request.name)
+    db.add(theater)
+    db.commit()
+    db.refresh(theater)
+    return theater
+
+
+@router.post("/films", response_model=FilmResponse, status_code=status.HTTP_201_CREATED)
+def add_film(
+    request: FilmCreate,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_admin),
+):
+    """Add a film once, then schedule as many showtimes of it as needed."""
+    film = Film(**request.model_dump())
+    db.add(film)
+    db.commit()
+    db.refresh(film)
+    return film
+
+
+@router.post(
+    "/showtimes", response_model=ShowtimeView, status_code=status.HTTP_201_CREATED
+)
+def add_showtime(
+    request: ShowtimeCreate,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_admin),
+):
+    """Schedule a film on a screen; 409 if the screen is busy at that time.
+
+    The showing is bookable like any movie, under the returned id.
+    """
+    film = db.get(Film, request.film_id)
+    if not film:
+        raise FILM_NOT_FOUND_ERROR
+    screen = lock_screen(db, request.auditorium_id)
+    if not screen:
+        raise AUDITORIUM_NOT_FOUND_ERROR
+    show = schedule_show(db, film, screen, request.showtime)
+    flush_movie(db)
+    build_seat_map(db, show.id, screen)
+    db.commit()
+    search_index.upsert(show, catalog_cache.invalidate())
+    return {
+        "id": show.id,
+        "film_id": film.id,
+        "title": show.title,
+        "auditorium_id": screen.id,
+        "screen": screen.name,
+        "showtime": show.showtime,
+        "ends_at": show.ends_at,
+    }
+
+
+@router.post("/users/{user_id}/revoke-sessions", status_code=status.HTTP_200_OK)
+def revoke_user_sessions(
+    user_id: int, db: Annotated[Session, Depends(get_db)], user: dict = Depends(is_admin)
+):
+    """Sign a user out everywhere: revoke their refresh tokens and reject
+    every access token issued to them so far."""
+    if db.get(User, user_id) is None:
+        raise USER_NOT_FOUND_ERROR
+    revoked = revoke_user_refresh_tokens(db, user_id)
+    db.commit()
+    token_cache.revoke_user(user_id)
+    return {"user_id": user_id, "revoked_refresh_tokens": revoked}
+
+
+@router.get("/analytics/top-movies", response_model=List[TopMovie])
+def get_top_movies(
+    db: Annotated[Session, Depends(get_db)],
+    limit: int = Query(10, ge=1, le=100),
+    showtime_from: datetime | None = None,
+    showtime_to: datetime | None = None,
+    user: dict = Depends(is_admin),
+):
+    """Shows with the most tickets sold, read from the occupancy counters."""
+    return top_movies(db, limit, showtime_from, showtime_to)
+
+
+@router.get("/analytics/fill-rate", response_model=List[DailyFillRate])
+def get_fill_rate(
+    db: Annotated[Session, Depends(get_db)],
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    user: dict = Depends(is_admin),
+):
+    """Tickets sold against seat capacity per showtime day."""
+    return fill_rate_by_day(db, date_from, date_to)
+
+
+@router.get("/analytics/bookings-per-hour", response_model=List[HourlyBookingCount])
+def get_bookings_per_hour(
+    db: Annotated[Session, Depends(get_db)],
+    since: datetime | None = None,
+    until: datetime | None = None,
+    user: dict = Depends(is_admin),
+):
+    """Bookings made and cancelled per hour, for the last day by default."""
+    if since is None:
+        since = datetime.utcnow() - timedelta(days=1)
+    return bookings_per_hour(db, since, until)
+
+
+@router.post("/analytics/reconcile", response_model=ReconcileReport)
+def reconcile_analytics(
+    db: Annotated[Session, Depends(get_db)], user: dict = Depends(is_admin)
+):
+    """Recount the per-show occupancy counters from the bookings themselves."""
+    report = reconcile_occupancy(db)
+    db.commit()
+    return report
+
+
+@router.get("/stats/hashing", status_code=status.HTTP_200_OK)
+def get_hashing_stats(user: dict = Depends(is_admin)):
+    """Report queue depth and latency of the password hashing pool."""
+    return hash_pool.stats()
+
+
+@router.get("/stats/booking-pipeline", status_code=status.HTTP_200_OK)
+def get_booking_pipeline_stats(user: dict = Depends(is_admin)):
+    """Report queue depth, batch sizes and commit time of the booking pipeline."""
+    return booking_pipeline.stats()
+
+
+@router.get("/stats/catalog-cache", status_code=status.HTTP_200_OK)
+def get_catalog_cache_stats(user: dict = Depends(is_admin)):
+    """Report catalog cache hits, misses and the current catalog version."""
+    return catalog_cache.stats()
+
+
+@router.get("/stats/token-cache", status_code=status.HTTP_200_OK)
+def get_token_cache_stats(user: dict = Depends(is_admin)):
+    """Report verified-token cache hits, misses and revocations."""
+    return token_cache.stats()
+
+
+@router.get("/stats/login-throttle", status_code=status.HTTP_200_OK)
+def get_login_throttle_stats(user: dict = Depends(is_admin)):
+    """Report how many login attempts were checked, throttled and failed."""
+    return login_limiter.stats()
+
+
+@router.get("/stats/feed", status_code=status.HTTP_200_OK)
+def get_feed_stats(user: dict = Depends(is_admin)):
+    """Report live availability feed subscribers and delivered updates."""
+    return feed_hub.stats()
+
+
+@router.get("/stats/waitlist", status_code=status.HTTP_200_OK)
+def get_waitlist_stats(user: dict = Depends(is_admin)):
+    """Report waitlist joins, departures, promotions and shows pending a pass."""
+    return promotion_queue.snapshot()
+
+
+@router.get("/stats/search", status_code=status.HTTP_200_OK)
+def get_search_stats(user: dict = Depends(is_admin)):
+    """Report search index size, queries served and rebuilds."""
+    return search_index.stats()
+
+
+@router.get("/stats/db-pool", status_code=status.HTTP_200_OK)
+def get_db_pool_stats(user: dict = Depends(is_admin)):
+    """Report connection pool usage for the sync (and async) database engines."""
+    stats = {"sync": pool_stats(engine)}
+    if async_engine is not None:
+        stats["async"] = pool_stats(async_engine.sync_engine)
+    return stats
+
+
+@router.get("/stats/app", status_code=status.HTTP_200_OK)
+def get_app_stats(user: dict = Depends(is_admin)):
+    """Report this worker's process id, lifecycle status, shared-state backend
+    and what startup warm-up did."""
+    return app_context.stats()
+
+
+@router.get("/stats/holds", status_code=status.HTTP_200_OK)
+def get_hold_stats(user: dict = Depends(is_admin)):
+    """Report how many seat holds were created, confirmed, released and expired."""
+    return hold_stats.snapshot()
@@ -0,0 +1,253 @@
+"""Async variants of the admin routes, mounted when DATABASE_MODE=async.
+
+Each handler awaits the matching sync handler from `adminRoute` through
+`run_sync_handler`, so the business logic lives in one place.
+"""
+from fastapi import APIRouter, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List
+from datetime import datetime
+
+from app.database import get_async_db, run_sync_handler
+from app.routes import adminRoute
+from app.schemas.movieSchema import MovieCreate, MovieResponse
+from app.schemas.bookingSchema import (
+    AdminBatchBookingCreate,
+    AdminBatchCancel,
+    BatchResponse,
+    ViewBooking,
+)
+from app.schemas.seatSchema import AuditoriumCreate, AuditoriumResponse
+from app.schemas.scheduleSchema import (
+    FilmCreate,
+    FilmResponse,
+    ShowtimeCreate,
+    ShowtimeView,
+    TheaterCreate,
+    TheaterResponse,
+)
+from app.schemas.analyticsSchema import (
+    DailyFillRate,
+    HourlyBookingCount,
+    ReconcileReport,
+    TopMovie,
+)
+from app.utils.dependencies import is_admin
+from app.utils.pagination import BookingFilters, MovieFilters, PageParams
+
+router = APIRouter(prefix="/admin", tags=["admin"], include_in_schema=False)
+
+
+@router.get("/movies", status_code=status.HTTP_200_OK)
+async def get_movies(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    page: Annotated[PageParams, Depends()],
+    filters: Annotated[MovieFilters, Depends()],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db,
+        adminRoute.get_movies,
+        page=page,
+        filters=filters,
+        user=user,
+    )
+
+
+@router.post(
+    "/movies", response_model=MovieResponse, status_code=status.HTTP_201_CREATED
+)
+async def add_movie(
+    request: MovieCreate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db, adminRoute.add_movie, request=request, user=user
+    )
+
+
+@router.put("/movies/{id}", response_model=MovieResponse)
+async def update_movie(
+    id: int,
+    request: MovieCreate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db, adminRoute.update_movie, id=id, request=request, user=user
+    )
+
+
+@router.delete("/movies/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_movie(
+    id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(db, adminRoute.delete_movie, id=id, user=user)
+
+
+@router.get(
+    "/bookings", response_model=List[ViewBooking], response_model_exclude_unset=True
+)
+async def get_bookings(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    page: Annotated[PageParams, Depends()],
+    filters: Annotated[BookingFilters, Depends()],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db,
+        adminRoute.get_bookings,
+        page=page,
+        filters=filters,
+        user=user,
+    )
+
+
+@router.post(
+    "/bookings/batch", response_model=BatchResponse, status_code=status.HTTP_200_OK
+)
+async def book_tickets_batch(
+    request: AdminBatchBookingCreate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db, adminRoute.book_tickets_batch, request=request, user=user
+    )
+
+
+@router.post(
+    "/bookings/batch/cancel",
+    response_model=BatchResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def cancel_bookings_batch(
+    request: AdminBatchCancel,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db, adminRoute.cancel_bookings_batch, request=request, user=user
+    )
+
+
+@router.post(
+    "/auditoriums",
+    response_model=AuditoriumResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def add_auditorium(
+    request: AuditoriumCreate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db, adminRoute.add_auditorium, request=request, user=user
+    )
+
+
+@router.get("/auditoriums", response_model=List[AuditoriumResponse])
+async def get_auditoriums(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(db, adminRoute.get_auditoriums, user=user)
+
+
+@router.post(
+    "/theaters", response_model=TheaterResponse, status_code=status.HTTP_201_CREATED
+)
+async def add_theater(
+    request: TheaterCreate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db, adminRoute.add_theater, request=request, user=user
+    )
+
+
+@router.post("/films", response_model=FilmResponse, status_code=status.HTTP_201_CREATED)
+async def add_film(
+    request: FilmCreate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(db, adminRoute.add_film, request=request, user=user)
+
+
+@router.post(
+    "/showtimes", response_model=ShowtimeView, status_code=status.HTTP_201_CREATED
+)
+async def add_showtime(
+    request: ShowtimeCreate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db, adminRoute.add_showtime, request=request, user=user
+    )
+
+
+@router.post("/users/{user_id}/revoke-sessions", status_code=status.HTTP_200_OK)
+async def revoke_user_sessions(
+    user_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db, adminRoute.revoke_user_sessions, user_id=user_id, user=user
+    )
+
+
+@router.get("/analytics/top-movies", response_model=List[TopMovie])
+async def get_top_movies(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    limit: int = Query(10, ge=1, le=100),
+    showtime_from: datetime | None = None,
+    showtime_to: datetime | None = None,
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db,
+        adminRoute.get_top_movies,
+        limit=limit,
+        showtime_from=showtime_from,
+        showtime_to=showtime_to,
+        user=user,
+    )
+
+
+@router.get("/analytics/fill-rate", response_model=List[DailyFillRate])
+async def get_fill_rate(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db, adminRoute.get_fill_rate, date_from=date_from, date_to=date_to, user=user
+    )
+
+
+@router.get("/analytics/bookings-per-hour", response_model=List[HourlyBookingCount])
+async def get_bookings_per_hour(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    since: datetime | None = None,
+    until: datetime | None = None,
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(
+        db, adminRoute.get_bookings_per_hour, since=since, until=until, user=user
+    )
+
+
+@router.post("/analytics/reconcile", response_model=ReconcileReport)
+async def reconcile_analytics(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_admin),
+):
+    return await run_sync_handler(db, adminRoute.reconcile_analytics, user=user)
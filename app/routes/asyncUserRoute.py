@@ -0,0 +1,288 @@
+"""Async variants of the user routes, mounted when DATABASE_MODE=async.
+
+Each handler awaits the matching sync handler from `userRoute` through
+`run_sync_handler`, so the business logic lives in one place.
+"""
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List
+from datetime import datetime
+
+from app.database import get_async_db, run_sync_handler
+from app.routes import userRoute
+from app.utils.dependencies import is_authenticated
+from app.schemas.bookingSchema import (
+    ViewAllMovies,
+    BookingDone,
+    BookingResponse,
+    BookingCreate,
+    BatchBookingCreate,
+    BatchCancel,
+    BatchResponse,
+)
+from app.schemas.seatSchema import (
+    SeatMapResponse,
+    HoldCreate,
+    HoldResponse,
+    WaitlistJoin,
+    WaitlistResponse,
+)
+from app.schemas.scheduleSchema import ShowtimeView, TheaterResponse
+from app.utils.pagination import MovieFilters, PageParams
+from app.utils.pipeline import booking_pipeline
+
+router = APIRouter(tags=["user"], include_in_schema=False)
+
+
+@router.get(
+    "/movies",
+    response_model=List[ViewAllMovies],
+    response_model_exclude_unset=True,
+    status_code=status.HTTP_200_OK,
+)
+async def get_movies(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    page: Annotated[PageParams, Depends()],
+    filters: Annotated[MovieFilters, Depends()],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db,
+        userRoute.get_movies,
+        request=request,
+        page=page,
+        filters=filters,
+        user=user,
+    )
+
+
+@router.post(
+    "/movies/{movie_id}/book",
+    response_model=BookingDone,
+    status_code=status.HTTP_201_CREATED,
+)
+async def book_ticket(
+    request: BookingCreate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    # Awaited here: the sync handler would block the event loop waiting on it
+    if booking_pipeline.running:
+        booked = await booking_pipeline.book(
+            user["id"], request.movie_id, request.seats, request.quantity
+        )
+        return userRoute.booking_done(booked)
+    return await run_sync_handler(
+        db, userRoute.book_ticket, request=request, user=user
+    )
+
+
+@router.post(
+    "/bookings/batch", response_model=BatchResponse, status_code=status.HTTP_200_OK
+)
+async def book_tickets_batch(
+    request: BatchBookingCreate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db, userRoute.book_tickets_batch, request=request, user=user
+    )
+
+
+@router.post(
+    "/bookings/batch/cancel",
+    response_model=BatchResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def cancel_bookings_batch(
+    request: BatchCancel,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db, userRoute.cancel_bookings_batch, request=request, user=user
+    )
+
+
+@router.post(
+    "/movies/{movie_id}/hold",
+    response_model=HoldResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def hold_seats(
+    movie_id: int,
+    request: HoldCreate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db, userRoute.hold_seats, movie_id=movie_id, request=request, user=user
+    )
+
+
+@router.post(
+    "/holds/{hold_id}/confirm",
+    response_model=BookingDone,
+    status_code=status.HTTP_201_CREATED,
+)
+async def confirm_seat_hold(
+    hold_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db, userRoute.confirm_seat_hold, hold_id=hold_id, user=user
+    )
+
+
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_seat_hold(
+    hold_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db, userRoute.release_seat_hold, hold_id=hold_id, user=user
+    )
+
+
+@router.delete("/movies/{movie_id}/cancel", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_booking(
+    movie_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db, userRoute.cancel_booking, movie_id=movie_id, user=user
+    )
+
+
+@router.get("/theaters", response_model=List[TheaterResponse])
+async def get_theaters(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(db, userRoute.get_theaters, user=user)
+
+
+@router.get("/theaters/{theater_id}/showtimes", response_model=List[ShowtimeView])
+async def get_theater_showtimes(
+    theater_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    showtime_from: datetime | None = None,
+    showtime_to: datetime | None = None,
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db,
+        userRoute.get_theater_showtimes,
+        theater_id=theater_id,
+        showtime_from=showtime_from,
+        showtime_to=showtime_to,
+        user=user,
+    )
+
+
+@router.get("/films/{film_id}/showtimes", response_model=List[ShowtimeView])
+async def get_film_showtimes(
+    film_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    showtime_from: datetime | None = None,
+    limit: int = Query(10, ge=1, le=100),
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db,
+        userRoute.get_film_showtimes,
+        film_id=film_id,
+        showtime_from=showtime_from,
+        limit=limit,
+        user=user,
+    )
+
+
+@router.get(
+    "/movies/history",
+    response_model=List[BookingResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_booking_history(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(db, userRoute.get_booking_history, user=user)
+
+
+@router.get(
+    "/movies/{movie_id}/seats",
+    response_model=SeatMapResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_seat_map(
+    movie_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db, userRoute.get_seat_map, movie_id=movie_id, user=user
+    )
+
+
+@router.post(
+    "/movies/{movie_id}/waitlist",
+    response_model=WaitlistResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def join_movie_waitlist(
+    movie_id: int,
+    request: WaitlistJoin,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db,
+        userRoute.join_movie_waitlist,
+        movie_id=movie_id,
+        request=request,
+        user=user,
+    )
+
+
+@router.get(
+    "/movies/{movie_id}/waitlist",
+    response_model=WaitlistResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_waitlist_entry(
+    movie_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db, userRoute.get_waitlist_entry, movie_id=movie_id, user=user
+    )
+
+
+@router.delete("/movies/{movie_id}/waitlist", status_code=status.HTTP_204_NO_CONTENT)
+async def leave_movie_waitlist(
+    movie_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db, userRoute.leave_movie_waitlist, movie_id=movie_id, user=user
+    )
+
+
+@router.get("/movies/{movie_id}/availability/stream", response_class=StreamingResponse)
+async def stream_availability(
+    movie_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: dict = Depends(is_authenticated),
+):
+    return await run_sync_handler(
+        db, userRoute.stream_availability, movie_id=movie_id, user=user
+    )
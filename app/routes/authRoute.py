@@ -1,18 +1,48 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
 from sqlalchemy.orm import Session
 from typing import Annotated
 
+from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
 from app.database import get_db
 from app.models.user import User
-from app.schemas.authSchema import CreateUserRequest, LoginResponse
-from app.utils.security import authenticate_user, create_access_token, create_hash
+from app.schemas.authSchema import CreateUserRequest, LoginResponse, RefreshRequest
+from app.utils.security import (
+    authenticate_user,
+    create_access_token,
+    create_hash_async,
+    get_current_user,
+    oauth2_bearer,
+)
+from app.utils.tokens import token_cache
+from app.utils.refresh import (
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+from app.utils.ratelimit import client_ip, login_limiter
 from app.utils.exceptions import USERNAME_ALREADY_EXISTS_ERROR, INVALID_CREDS
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def token_response(message: str, user: User, refresh_token: str) -> dict:
+    token = create_access_token(
+        str(user.username),
+        user.id,
+        user.is_admin,
+        timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {
+        "message": message,
+        "access_token": token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "refresh_token": refresh_token,
+    }
+
+
 @router.post("/register", status_code=status.HTTP_201_CREATED)
 async def create_user(
     request: CreateUserRequest, db: Annotated[Session, Depends(get_db)]
@@ -22,7 +52,7 @@ async def create_user(
     if existing_user:
         raise USERNAME_ALREADY_EXISTS_ERROR
 
-    hashed_password = create_hash(request.password)
+    hashed_password = await create_hash_async(request.password)
     user = User(
         username=request.username,
         hashed_password=hashed_password,
@@ -35,19 +65,56 @@ async def create_user(
 
 @router.post("/login", response_model=LoginResponse, status_code=status.HTTP_200_OK)
 async def login_for_access_token(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Annotated[Session, Depends(get_db)],
 ):
-    """Authenticate a user and return an access token if credentials are valid."""
-    user = authenticate_user(form_data.username, form_data.password, db)
+    """Authenticate a user and return an access token if credentials are valid.
+
+    Attempts are throttled per client IP and username before the database
+    or the password hash is touched.
+    """
+    await login_limiter.check_async(client_ip(request), form_data.username)
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
+        await login_limiter.record_failure_async(form_data.username)
         raise INVALID_CREDS
+    await login_limiter.record_success_async(form_data.username)
 
-    token = create_access_token(
-        str(user.username), user.id, user.is_admin, timedelta(minutes=20)
+    response = token_response(
+        "Logged In Successfully", user, issue_refresh_token(db, user.id)
     )
-    return {
-        "message": "Logged In Successfully",
-        "access_token": token,
-        "token_type": "bearer",
-    }
+    db.commit()
+    return response
+
+
+@router.post("/refresh", response_model=LoginResponse, status_code=status.HTTP_200_OK)
+def refresh_access_token(
+    request: RefreshRequest, db: Annotated[Session, Depends(get_db)]
+):
+    """Exchange a refresh token for a new access token and refresh token.
+
+    One indexed lookup and no password hashing; the old refresh token stops
+    working, and replaying it revokes the whole login session.
+    """
+    user, refresh_token = rotate_refresh_token(db, request.refresh_token)
+    response = token_response("Token Refreshed", user, refresh_token)
+    db.commit()
+    return response
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    token: Annotated[str, Depends(oauth2_bearer)],
+    db: Annotated[Session, Depends(get_db)],
+    request: RefreshRequest | None = None,
+    user: dict = Depends(get_current_user),
+):
+    """Revoke the caller's access token, and its refresh token if one is sent.
+
+    A refresh token that belongs to another user is left alone.
+    """
+    token_cache.revoke_token(token)
+    if request is not None:
+        revoke_refresh_token(db, request.refresh_token, user["id"])
+        db.commit()
@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, status, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Annotated, List
+from datetime import datetime, timedelta
 
 from app.models.movie import Movie
 from app.models.booking import Booking
-from app.database import get_db
+from app.models.seat import Seat, SEAT_AVAILABLE
+from app.models.hold import SeatHold
+from app.models.film import Film
+from app.models.theater import Theater
+from app.config import SEARCH_MAX_RESULTS
+from app.database import SessionLocal, get_db
 from app.utils.exceptions import (
     BOOKING_NOT_FOUND_ERROR,
     MOVIE_NOT_FOUND_ERROR,
-    BOOKING_ALREADY_EXISTS_ERROR,
+    HOLD_NOT_FOUND_ERROR,
+    WAITLIST_ENTRY_NOT_FOUND_ERROR,
+    FILM_NOT_FOUND_ERROR,
+    THEATER_NOT_FOUND_ERROR,
 )
 from app.utils.dependencies import is_authenticated
 from app.schemas.bookingSchema import (
@@ -16,19 +26,137 @@ from app.schemas.bookingSchema import (
     BookingDone,
     BookingResponse,
     BookingCreate,
+    BatchBookingCreate,
+    BatchCancel,
+    BatchResponse,
+)
+from app.schemas.movieSchema import MovieSearchResult
+from app.schemas.scheduleSchema import ShowtimeView, TheaterResponse
+from app.schemas.seatSchema import (
+    SeatMapResponse,
+    HoldCreate,
+    HoldResponse,
+    WaitlistJoin,
+    WaitlistResponse,
+)
+from app.utils.inventory import book_seats, remove_booking
+from app.utils.batch import book_batch, cancel_batch, changed_movies, summarize
+from app.utils.pipeline import booking_pipeline
+from app.utils.feed import (
+    availability,
+    event_stream,
+    feed_broker,
+    feed_hub,
+    notify_availability,
+)
+from app.utils.pagination import NEXT_CURSOR_HEADER, MovieFilters, PageParams
+from app.utils.cache import cached_json_response, catalog_cache
+from app.utils.catalog import catalog_page
+from app.utils.schedule import next_showings, playing_at
+from app.utils.search import search_index
+from app.utils.serialization import json_rows_response
+from app.utils.holds import (
+    create_hold,
+    confirm_hold,
+    release_hold,
+    track_hold,
+    hold_stats,
+)
+from app.utils.waitlist import (
+    join_waitlist,
+    latest_entry,
+    leave_waitlist,
+    request_promotion,
+    waitlist_position,
 )
 
 router = APIRouter(tags=["user"])
 
 
 @router.get(
-    "/movies", response_model=List[ViewAllMovies], status_code=status.HTTP_200_OK
+    "/movies",
+    response_model=List[ViewAllMovies],
+    response_model_exclude_unset=True,
+    status_code=status.HTTP_200_OK,
 )
 def get_movies(
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+    page: Annotated[PageParams, Depends()],
+    filters: Annotated[MovieFilters, Depends()],
+    user: dict = Depends(is_authenticated),
+):
+    """Retrieve one page of available movies, optionally filtered and projected.
+
+    Pages are served from the catalog cache as pre-serialized JSON; the
+    database is only queried after an admin change invalidates it.
+    """
+    cached, cache_status = catalog_page(db, page, filters)
+    headers = {NEXT_CURSOR_HEADER: cached.next_cursor} if cached.next_cursor else {}
+    return cached_json_response(cached, request, cache_status, headers)
+
+
+@router.get(
+    "/movies/search",
+    response_model=List[MovieSearchResult],
+    status_code=status.HTTP_200_OK,
+)
+def search_movies(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_RESULTS),
+    user: dict = Depends(is_authenticated),
+):
+    """Search titles and descriptions, best matches first.
+
+    Every word must match; the last word also matches as a prefix and
+    longer words tolerate typos. Served from an in-memory index, so the
+    database is not queried.
+    """
+    search_index.ensure_fresh(catalog_cache.version(), SessionLocal)
+    return search_index.search(q, limit)
+
+
+@router.get("/theaters", response_model=List[TheaterResponse])
+def get_theaters(
     db: Annotated[Session, Depends(get_db)], user: dict = Depends(is_authenticated)
 ):
-    """Retrieve all available movies."""
-    return db.query(Movie).all()
+    """Retrieve all theaters."""
+    return db.query(Theater).order_by(Theater.name).all()
+
+
+@router.get("/theaters/{theater_id}/showtimes", response_model=List[ShowtimeView])
+def get_theater_showtimes(
+    theater_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    showtime_from: datetime | None = None,
+    showtime_to: datetime | None = None,
+    user: dict = Depends(is_authenticated),
+):
+    """What's playing at a theater, by start time.
+
+    Defaults to the rest of today: from now until midnight.
+    """
+    if not db.get(Theater, theater_id):
+        raise THEATER_NOT_FOUND_ERROR
+    showtime_from = showtime_from or datetime.now()
+    if showtime_to is None:
+        next_day = showtime_from + timedelta(days=1)
+        showtime_to = next_day.replace(hour=0, minute=0, second=0, microsecond=0)
+    return playing_at(db, theater_id, showtime_from, showtime_to)
+
+
+@router.get("/films/{film_id}/showtimes", response_model=List[ShowtimeView])
+def get_film_showtimes(
+    film_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    showtime_from: datetime | None = None,
+    limit: int = Query(10, ge=1, le=100),
+    user: dict = Depends(is_authenticated),
+):
+    """The next showings of a film, from now unless `showtime_from` is given."""
+    if not db.get(Film, film_id):
+        raise FILM_NOT_FOUND_ERROR
+    return next_showings(db, film_id, showtime_from or datetime.now(), limit)
 
 
 @router.post(
@@ -41,24 +169,141 @@ def book_ticket(
     db: Annotated[Session, Depends(get_db)],
     user: dict = Depends(is_authenticated),
 ):
-    """Book a ticket for a selected movie."""
+    """Book one or more seats for a selected movie."""
+    if booking_pipeline.running:
+        booked = booking_pipeline.book_from_thread(
+            user["id"], request.movie_id, request.seats, request.quantity
+        )
+        return booking_done(booked)
+
     movie = db.query(Movie).filter(Movie.id == request.movie_id).first()
     if not movie:
         raise MOVIE_NOT_FOUND_ERROR
 
-    existing_booking = (
-        db.query(Booking)
-        .filter(Booking.movie_id == request.movie_id, Booking.user_id == user["id"])
-        .first()
+    booking, seats = book_seats(
+        db, user["id"], movie, labels=request.seats, quantity=request.quantity
     )
-    if existing_booking:
-        raise BOOKING_ALREADY_EXISTS_ERROR
+    db.commit()
+    db.refresh(booking)
+    notify_availability(db, [booking.movie_id])
+    return {"message": "Ticket booked successfully", "booking": booking, "seats": seats}
+
+
+def booking_done(booked: dict) -> dict:
+    """The response for a booking committed by the booking pipeline."""
+    return {
+        "message": "Ticket booked successfully",
+        "booking": booked,
+        "seats": booked["seats"],
+    }
+
+
+@router.post(
+    "/bookings/batch", response_model=BatchResponse, status_code=status.HTTP_200_OK
+)
+def book_tickets_batch(
+    request: BatchBookingCreate,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_authenticated),
+):
+    """Book several movies in one transaction, reporting the outcome per item."""
+    items = [{**item.model_dump(), "user_id": user["id"]} for item in request.items]
+    results = book_batch(db, items)
+    db.commit()
+    notify_availability(db, changed_movies(results))
+    return summarize(results)
+
+
+@router.post(
+    "/bookings/batch/cancel",
+    response_model=BatchResponse,
+    status_code=status.HTTP_200_OK,
+)
+def cancel_bookings_batch(
+    request: BatchCancel,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_authenticated),
+):
+    """Cancel bookings for several movies in one transaction."""
+    items = [{"user_id": user["id"], "movie_id": id} for id in request.movie_ids]
+    results = cancel_batch(db, items)
+    db.commit()
+    request_promotion(changed_movies(results))
+    notify_availability(db, changed_movies(results))
+    return summarize(results)
+
+
+@router.post(
+    "/movies/{movie_id}/hold",
+    response_model=HoldResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def hold_seats(
+    movie_id: int,
+    request: HoldCreate,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_authenticated),
+):
+    """Temporarily hold seats for a show while the user checks out."""
+    movie = db.query(Movie).filter(Movie.id == movie_id).first()
+    if not movie:
+        raise MOVIE_NOT_FOUND_ERROR
+
+    hold, seats = create_hold(
+        db, user["id"], movie, labels=request.seats, quantity=request.quantity
+    )
+    db.commit()
+    track_hold(hold)
+    notify_availability(db, [movie_id])
+    return {
+        "hold_id": hold.id,
+        "movie_id": movie_id,
+        "seats": seats,
+        "expires_at": hold.expires_at,
+    }
+
 
-    booking = Booking(user_id=user["id"], movie_id=request.movie_id)
-    db.add(booking)
+def get_user_hold(db: Session, hold_id: int, user: dict) -> SeatHold:
+    hold = db.query(SeatHold).filter(SeatHold.id == hold_id).first()
+    if not hold or hold.user_id != user["id"]:
+        raise HOLD_NOT_FOUND_ERROR
+    return hold
+
+
+@router.post(
+    "/holds/{hold_id}/confirm",
+    response_model=BookingDone,
+    status_code=status.HTTP_201_CREATED,
+)
+def confirm_seat_hold(
+    hold_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_authenticated),
+):
+    """Confirm a seat hold, turning it into a booking."""
+    hold = get_user_hold(db, hold_id, user)
+    booking, seats = confirm_hold(db, hold)
     db.commit()
     db.refresh(booking)
-    return {"message": "Ticket booked successfully", "booking": booking}
+    hold_stats.incr("confirmed")
+    notify_availability(db, [booking.movie_id])
+    return {"message": "Ticket booked successfully", "booking": booking, "seats": seats}
+
+
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+def release_seat_hold(
+    hold_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_authenticated),
+):
+    """Release a seat hold before it expires."""
+    hold = get_user_hold(db, hold_id, user)
+    movie_id = hold.movie_id
+    release_hold(db, hold)
+    db.commit()
+    hold_stats.incr("released")
+    request_promotion([movie_id])
+    notify_availability(db, [movie_id])
 
 
 @router.delete("/movies/{movie_id}/cancel", status_code=status.HTTP_204_NO_CONTENT)
@@ -76,8 +321,10 @@ def cancel_booking(
     if not booking:
         raise BOOKING_NOT_FOUND_ERROR
 
-    db.delete(booking)
+    remove_booking(db, booking)
     db.commit()
+    request_promotion([movie_id])
+    notify_availability(db, [movie_id])
     return {"message": "Booking cancelled successfully"}
 
 
@@ -90,4 +337,132 @@ def get_booking_history(
     db: Annotated[Session, Depends(get_db)], user: dict = Depends(is_authenticated)
 ):
     """Retrieve all past bookings for the current user."""
-    return db.query(Booking).filter(Booking.user_id == user["id"]).all()
+    rows = db.query(Booking.user_id, Booking.movie_id).filter(
+        Booking.user_id == user["id"]
+    )
+    return json_rows_response([dict(row._mapping) for row in rows])
+
+
+@router.get(
+    "/movies/{movie_id}/seats",
+    response_model=SeatMapResponse,
+    status_code=status.HTTP_200_OK,
+)
+def get_seat_map(
+    movie_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_authenticated),
+):
+    """Retrieve the seat map and per-seat availability for a show."""
+    movie = db.query(Movie).filter(Movie.id == movie_id).first()
+    if not movie:
+        raise MOVIE_NOT_FOUND_ERROR
+
+    seats = [
+        {"label": label, "row": row, "number": number, "status": seat_status}
+        for label, row, number, seat_status in db.query(
+            Seat.label, Seat.row, Seat.number, Seat.status
+        )
+        .filter(Seat.movie_id == movie_id)
+        .order_by(Seat.row, Seat.number)
+    ]
+    return {
+        "movie_id": movie.id,
+        "auditorium_id": movie.auditorium_id,
+        "available": sum(seat["status"] == SEAT_AVAILABLE for seat in seats),
+        "seats": seats,
+    }
+
+
+def waitlist_view(db: Session, entry) -> dict:
+    return {
+        "id": entry.id,
+        "movie_id": entry.movie_id,
+        "quantity": entry.quantity,
+        "status": entry.status,
+        "position": waitlist_position(db, entry),
+        "booking_id": entry.booking_id,
+    }
+
+
+@router.post(
+    "/movies/{movie_id}/waitlist",
+    response_model=WaitlistResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def join_movie_waitlist(
+    movie_id: int,
+    request: WaitlistJoin,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_authenticated),
+):
+    """Join the waitlist for a sold-out show instead of retrying the booking.
+
+    Seats freed by cancellations are booked for waiting users in the order
+    they joined.
+    """
+    movie = db.get(Movie, movie_id)
+    if not movie:
+        raise MOVIE_NOT_FOUND_ERROR
+
+    entry = join_waitlist(db, user["id"], movie, request.quantity)
+    db.commit()
+    return waitlist_view(db, entry)
+
+
+@router.get(
+    "/movies/{movie_id}/waitlist",
+    response_model=WaitlistResponse,
+    status_code=status.HTTP_200_OK,
+)
+def get_waitlist_entry(
+    movie_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_authenticated),
+):
+    """Check your place in a show's waitlist, or the booking it turned into."""
+    entry = latest_entry(db, user["id"], movie_id)
+    if not entry:
+        raise WAITLIST_ENTRY_NOT_FOUND_ERROR
+    return waitlist_view(db, entry)
+
+
+@router.delete("/movies/{movie_id}/waitlist", status_code=status.HTTP_204_NO_CONTENT)
+def leave_movie_waitlist(
+    movie_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_authenticated),
+):
+    """Leave a show's waitlist."""
+    entry = latest_entry(db, user["id"], movie_id)
+    if not entry or not leave_waitlist(db, entry):
+        raise WAITLIST_ENTRY_NOT_FOUND_ERROR
+    db.commit()
+
+
+@router.get("/movies/{movie_id}/availability/stream", response_class=StreamingResponse)
+def stream_availability(
+    movie_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    user: dict = Depends(is_authenticated),
+):
+    """Server-Sent Events feed of a show's availability, instead of polling.
+
+    Sends the current availability, then an `availability` event whenever
+    bookings, cancellations or holds change it.
+    """
+    if db.get(Movie, movie_id) is None:
+        raise MOVIE_NOT_FOUND_ERROR
+    # Subscribe before reading so no change slips between snapshot and feed
+    subscriber = feed_hub.subscribe(movie_id)
+    try:
+        feed_broker.watch(movie_id)
+        snapshot = availability(db, movie_id)
+    except Exception:
+        feed_hub.unsubscribe(subscriber)
+        raise
+    return StreamingResponse(
+        event_stream(subscriber, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Optional
+
+
+class TopMovie(BaseModel):
+    movie_id: int
+    title: str
+    showtime: Optional[datetime] = None
+    bookings: int
+    tickets: int
+    capacity: Optional[int] = None
+    fill_rate: Optional[float] = None
+
+
+class DailyFillRate(BaseModel):
+    day: date
+    shows: int
+    tickets: int
+    capacity: Optional[int] = None
+    fill_rate: Optional[float] = None
+
+
+class HourlyBookingCount(BaseModel):
+    hour: datetime
+    booked: int
+    cancelled: int
+
+
+class ReconcileReport(BaseModel):
+    shows: int
+    corrected: int
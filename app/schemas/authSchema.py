@@ -12,3 +12,9 @@ class LoginResponse(BaseModel):
     message: str
     access_token: str
     token_type: str
+    expires_in: int
+    refresh_token: str
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
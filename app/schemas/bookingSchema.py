@@ -1,9 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List, Optional
+
+from app.config import MAX_BATCH_SIZE, MAX_SEATS_PER_BOOKING
 
 class ViewBooking(BaseModel):
-    user_id: int
-    movie_id: int
+    id: Optional[int] = None
+    user_id: Optional[int] = None
+    movie_id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -11,6 +15,8 @@ class ViewBooking(BaseModel):
 
 class BookingCreate(BaseModel):
     movie_id: int
+    seats: Optional[List[str]] = Field(default=None, max_length=MAX_SEATS_PER_BOOKING)
+    quantity: int = Field(default=1, ge=1, le=MAX_SEATS_PER_BOOKING)
 
 
 class BookingResponse(BaseModel):
@@ -22,10 +28,55 @@ class BookingResponse(BaseModel):
 
 
 class ViewAllMovies(BaseModel):
-    title: str
-    showtime: datetime
+    id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    showtime: Optional[datetime] = None
+    film_id: Optional[int] = None
 
 
 class BookingDone(BaseModel):
     message: str
     booking: BookingResponse
+    seats: List[str] = []
+
+
+class BatchBookingCreate(BaseModel):
+    items: List[BookingCreate] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class AdminBookingCreate(BookingCreate):
+    user_id: int
+
+
+class AdminBatchBookingCreate(BaseModel):
+    items: List[AdminBookingCreate] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BatchCancel(BaseModel):
+    movie_ids: List[int] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BookingKey(BaseModel):
+    user_id: int
+    movie_id: int
+
+
+class AdminBatchCancel(BaseModel):
+    items: List[BookingKey] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    user_id: int
+    movie_id: int
+    status: str
+    booking_id: Optional[int] = None
+    seats: List[str] = []
+    detail: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Optional
 
 class ViewMovieResponse(BaseModel):
     title: str
@@ -14,8 +15,28 @@ class MovieCreate(BaseModel):
     title: str
     description: str
     showtime: datetime
+    auditorium_id: Optional[int] = None
 
 
 class MovieResponse(BaseModel):
     message: str
     movie: MovieCreate
+
+
+class MovieSearchResult(BaseModel):
+    id: int
+    title: str
+    showtime: Optional[datetime] = None
+    score: float
+
+
+class RowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class BulkImportReport(BaseModel):
+    received: int
+    written: int
+    failed: int
+    errors: List[RowError]
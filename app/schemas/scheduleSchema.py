@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+from app.config import MAX_FILM_MINUTES
+
+
+class FilmCreate(BaseModel):
+    title: str = Field(min_length=1)
+    description: Optional[str] = None
+    duration_minutes: int = Field(ge=1, le=MAX_FILM_MINUTES)
+
+
+class FilmResponse(FilmCreate):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class TheaterCreate(BaseModel):
+    name: str = Field(min_length=1)
+
+
+class TheaterResponse(TheaterCreate):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class ShowtimeCreate(BaseModel):
+    film_id: int
+    auditorium_id: int
+    showtime: datetime
+
+
+class ShowtimeView(BaseModel):
+    id: int
+    film_id: Optional[int] = None
+    title: Optional[str] = None
+    auditorium_id: Optional[int] = None
+    screen: Optional[str] = None
+    showtime: datetime
+    ends_at: Optional[datetime] = None
@@ -0,0 +1,62 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+from app.config import MAX_SEATS_PER_BOOKING
+
+
+class AuditoriumCreate(BaseModel):
+    name: str
+    rows: int = Field(ge=1, le=100)
+    seats_per_row: int = Field(ge=1, le=100)
+    theater_id: Optional[int] = None
+
+
+class AuditoriumResponse(BaseModel):
+    id: int
+    name: str
+    rows: int
+    seats_per_row: int
+    theater_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SeatView(BaseModel):
+    label: str
+    row: int
+    number: int
+    status: str
+
+
+class SeatMapResponse(BaseModel):
+    movie_id: int
+    auditorium_id: Optional[int]
+    available: int
+    seats: List[SeatView]
+
+
+class HoldCreate(BaseModel):
+    seats: Optional[List[str]] = Field(default=None, max_length=MAX_SEATS_PER_BOOKING)
+    quantity: int = Field(default=1, ge=1, le=MAX_SEATS_PER_BOOKING)
+
+
+class HoldResponse(BaseModel):
+    hold_id: int
+    movie_id: int
+    seats: List[str]
+    expires_at: datetime
+
+
+class WaitlistJoin(BaseModel):
+    quantity: int = Field(default=1, ge=1, le=MAX_SEATS_PER_BOOKING)
+
+
+class WaitlistResponse(BaseModel):
+    id: int
+    movie_id: int
+    quantity: int
+    status: str
+    position: Optional[int] = None
+    booking_id: Optional[int] = None
@@ -0,0 +1,261 @@
+"""Occupancy counters and the analytics built on them.
+
+Every booking write calls `record_bookings` in its own transaction, so
+`movie_occupancy` and `booking_hourly` commit or roll back together with
+the bookings they count. Both are keyed by show, so the writes only
+contend where the bookings themselves do. Analytics read those tables (joined to movies and
+auditoriums for titles and capacity) and never scan `bookings`.
+
+`reconcile_occupancy` rebuilds the per-show counters from the bookings and
+seats, e.g. after manual data fixes: `python -m app.utils.analytics`.
+"""
+import logging
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import case, delete, func, select
+
+from app.database import DIALECT_INSERTS
+from app.models.auditorium import Auditorium
+from app.models.booking import Booking
+from app.models.movie import Movie
+from app.models.occupancy import HourlyBookings, MovieOccupancy
+from app.models.seat import Seat, SEAT_BOOKED
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_CHUNK_SIZE = 500
+
+
+def current_hour(now: datetime | None = None) -> datetime:
+    return (now or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+
+
+def _increment(db, model, keys: list[str], rows: list[dict]):
+    """Add each row's values onto the existing counters, inserting missing ones."""
+    insert = DIALECT_INSERTS[db.get_bind().dialect.name](model)
+    columns = [name for name in rows[0] if name not in keys]
+    statement = insert.on_conflict_do_update(
+        index_elements=keys,
+        set_={
+            name: getattr(model, name) + getattr(insert.excluded, name)
+            for name in columns
+        },
+    )
+    db.execute(statement, rows)
+
+
+def record_bookings(db, changes):
+    """Apply `(movie_id, bookings, tickets)` deltas to the counters.
+
+    Positive deltas are new bookings, negative ones cancellations. Call
+    within the transaction that wrote the bookings; the caller commits.
+    """
+    bookings, tickets = Counter(), Counter()
+    for movie_id, booking_delta, ticket_delta in changes:
+        bookings[movie_id] += booking_delta
+        tickets[movie_id] += ticket_delta
+    if not bookings:
+        return
+    _increment(
+        db,
+        MovieOccupancy,
+        ["movie_id"],
+        [
+            {
+                "movie_id": movie_id,
+                "bookings": bookings[movie_id],
+                "tickets": tickets[movie_id],
+            }
+            for movie_id in sorted(bookings)
+        ],
+    )
+    # One row per show and hour, like the occupancy counters, so bookings of
+    # different shows do not queue behind a single row for the hour
+    hour = current_hour()
+    _increment(
+        db,
+        HourlyBookings,
+        ["hour", "movie_id"],
+        [
+            {
+                "hour": hour,
+                "movie_id": movie_id,
+                "booked": max(bookings[movie_id], 0),
+                "cancelled": max(-bookings[movie_id], 0),
+            }
+            for movie_id in sorted(bookings)
+        ],
+    )
+
+
+def forget_movie(db, movie_id: int):
+    """Drop a deleted show's counters. The caller commits."""
+    db.execute(delete(MovieOccupancy).where(MovieOccupancy.movie_id == movie_id))
+
+
+def _capacity():
+    return Auditorium.rows * Auditorium.seats_per_row
+
+
+def _fill_rate(tickets: int, capacity: int | None) -> float | None:
+    return round(tickets / capacity, 4) if capacity else None
+
+
+def top_movies(
+    db,
+    limit: int = 10,
+    showtime_from: datetime | None = None,
+    showtime_to: datetime | None = None,
+) -> list[dict]:
+    """Shows with the most tickets sold, optionally within a showtime range."""
+    query = (
+        select(
+            MovieOccupancy.movie_id,
+            Movie.title,
+            Movie.showtime,
+            MovieOccupancy.bookings,
+            MovieOccupancy.tickets,
+            _capacity().label("capacity"),
+        )
+        .join(Movie, Movie.id == MovieOccupancy.movie_id)
+        .outerjoin(Auditorium, Auditorium.id == Movie.auditorium_id)
+        .where(MovieOccupancy.tickets > 0)
+        .order_by(MovieOccupancy.tickets.desc(), MovieOccupancy.movie_id.desc())
+        .limit(limit)
+    )
+    if showtime_from is not None:
+        query = query.where(Movie.showtime >= showtime_from)
+    if showtime_to is not None:
+        query = query.where(Movie.showtime < showtime_to)
+    return [
+        {**row._mapping, "fill_rate": _fill_rate(row.tickets, row.capacity)}
+        for row in db.execute(query)
+    ]
+
+
+def fill_rate_by_day(
+    db, date_from: datetime | None = None, date_to: datetime | None = None
+) -> list[dict]:
+    """Shows, tickets and seat capacity per showtime day.
+
+    The fill rate only covers reserved-seating shows, the ones with a capacity.
+    """
+    day = func.date(Movie.showtime)
+    tickets = func.coalesce(MovieOccupancy.tickets, 0)
+    seated = Movie.auditorium_id.is_not(None)
+    query = (
+        select(
+            day.label("day"),
+            func.count(Movie.id).label("shows"),
+            func.sum(tickets).label("tickets"),
+            func.sum(case((seated, tickets), else_=0)).label("seated_tickets"),
+            func.sum(_capacity()).label("capacity"),
+        )
+        .outerjoin(MovieOccupancy, MovieOccupancy.movie_id == Movie.id)
+        .outerjoin(Auditorium, Auditorium.id == Movie.auditorium_id)
+        .group_by(day)
+        .order_by(day)
+    )
+    if date_from is not None:
+        query = query.where(Movie.showtime >= date_from)
+    if date_to is not None:
+        query = query.where(Movie.showtime < date_to)
+    return [
+        {
+            "day": row.day,
+            "shows": row.shows,
+            "tickets": row.tickets,
+            "capacity": row.capacity,
+            "fill_rate": _fill_rate(row.seated_tickets, row.capacity),
+        }
+        for row in db.execute(query)
+    ]
+
+
+def bookings_per_hour(db, since: datetime, until: datetime | None = None) -> list[dict]:
+    """Bookings made and cancelled per hour from `since` (inclusive)."""
+    query = (
+        select(
+            HourlyBookings.hour,
+            func.sum(HourlyBookings.booked).label("booked"),
+            func.sum(HourlyBookings.cancelled).label("cancelled"),
+        )
+        .where(HourlyBookings.hour >= current_hour(since))
+        .group_by(HourlyBookings.hour)
+        .order_by(HourlyBookings.hour)
+    )
+    if until is not None:
+        query = query.where(HourlyBookings.hour < until)
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def _chunks(items: list, size: int = RECONCILE_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def reconcile_occupancy(db) -> dict:
+    """Recount every show's counters from `bookings` and `seats`.
+
+    Only rows that disagree are rewritten. Works on a Session or a
+    Connection; the caller commits. Bookings made while it runs may be
+    missed, so run it when traffic is low. The hourly rollup has no source
+    to rebuild from and is left alone.
+    """
+    expected = {}
+    booked_seats = dict(
+        db.execute(
+            select(Seat.movie_id, func.count(Seat.id))
+            .where(Seat.status == SEAT_BOOKED)
+            .group_by(Seat.movie_id)
+        ).all()
+    )
+    for movie_id, auditorium_id, count in db.execute(
+        select(Booking.movie_id, Movie.auditorium_id, func.count(Booking.id))
+        .join(Movie, Movie.id == Booking.movie_id)
+        .group_by(Booking.movie_id, Movie.auditorium_id)
+    ):
+        tickets = booked_seats.get(movie_id, 0) if auditorium_id else count
+        expected[movie_id] = (count, tickets)
+
+    current = {
+        movie_id: (bookings, tickets)
+        for movie_id, bookings, tickets in db.execute(
+            select(
+                MovieOccupancy.movie_id,
+                MovieOccupancy.bookings,
+                MovieOccupancy.tickets,
+            )
+        )
+    }
+    stale = sorted(
+        movie_id
+        for movie_id in current.keys() | expected.keys()
+        if current.get(movie_id) != expected.get(movie_id)
+    )
+    for chunk in _chunks(stale):
+        db.execute(delete(MovieOccupancy).where(MovieOccupancy.movie_id.in_(chunk)))
+    rows = [
+        {
+            "movie_id": movie_id,
+            "bookings": expected[movie_id][0],
+            "tickets": expected[movie_id][1],
+        }
+        for movie_id in stale
+        if movie_id in expected
+    ]
+    if rows:
+        db.execute(MovieOccupancy.__table__.insert(), rows)
+    if stale:
+        logger.info("Reconciled occupancy counters of %s shows", len(stale))
+    return {"shows": len(expected), "corrected": len(stale)}
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    with engine.begin() as conn:
+        report = reconcile_occupancy(conn)
+    print(f"Checked {report['shows']} shows, corrected {report['corrected']}")
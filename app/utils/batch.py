@@ -0,0 +1,233 @@
+from sqlalchemy import delete, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking
+from app.models.movie import Movie
+from app.models.seat import Seat, SEAT_AVAILABLE, SEAT_BOOKED
+from app.models.user import User
+from app.utils.exceptions import (
+    BOOKING_ALREADY_EXISTS_ERROR,
+    BOOKING_NOT_FOUND_ERROR,
+    MOVIE_NOT_FOUND_ERROR,
+    SEATING_NOT_AVAILABLE_ERROR,
+    SEATS_UNAVAILABLE_ERROR,
+    USER_NOT_FOUND_ERROR,
+    WAITLIST_AHEAD_ERROR,
+)
+from app.utils.analytics import record_bookings
+from app.utils.inventory import claim_seats, shows_with_waiters
+
+BOOKED = "booked"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+# A concurrent request can book the same (user, movie) between our duplicate
+# check and the insert; the batch is then re-planned against fresh data.
+BATCH_ATTEMPTS = 3
+
+
+def _result(index: int, item: dict, status: str, **extra) -> dict:
+    return {
+        "index": index,
+        "user_id": item["user_id"],
+        "movie_id": item["movie_id"],
+        "status": status,
+        **extra,
+    }
+
+
+def _failed(index: int, item: dict, error) -> dict:
+    return _result(index, item, FAILED, detail=error.detail)
+
+
+def _existing_pairs(db: Session, items: list[dict]) -> set[tuple[int, int]]:
+    """Bookings that already exist for any (user_id, movie_id) in the batch."""
+    user_ids = {item["user_id"] for item in items}
+    movie_ids = {item["movie_id"] for item in items}
+    return set(
+        db.query(Booking.user_id, Booking.movie_id).filter(
+            Booking.user_id.in_(user_ids), Booking.movie_id.in_(movie_ids)
+        )
+    )
+
+
+def _plan_bookings(db: Session, items: list[dict], check_users: bool):
+    """Validate a batch with set-based queries; returns (accepted, results)."""
+    movies = dict(
+        db.query(Movie.id, Movie.auditorium_id).filter(
+            Movie.id.in_({item["movie_id"] for item in items})
+        )
+    )
+    users = None
+    if check_users:
+        users = {
+            user_id
+            for (user_id,) in db.query(User.id).filter(
+                User.id.in_({item["user_id"] for item in items})
+            )
+        }
+    taken = _existing_pairs(db, items)
+    queued = shows_with_waiters(db, [id for id, seating in movies.items() if seating])
+
+    accepted, results = [], {}
+    for index, item in enumerate(items):
+        pair = (item["user_id"], item["movie_id"])
+        seated = movies.get(item["movie_id"]) is not None
+        if users is not None and item["user_id"] not in users:
+            results[index] = _failed(index, item, USER_NOT_FOUND_ERROR)
+        elif item["movie_id"] not in movies:
+            results[index] = _failed(index, item, MOVIE_NOT_FOUND_ERROR)
+        elif pair in taken:
+            results[index] = _failed(index, item, BOOKING_ALREADY_EXISTS_ERROR)
+        elif not seated and (item.get("seats") or item.get("quantity", 1) != 1):
+            results[index] = _failed(index, item, SEATING_NOT_AVAILABLE_ERROR)
+        elif item["movie_id"] in queued:
+            results[index] = _failed(index, item, WAITLIST_AHEAD_ERROR)
+        else:
+            taken.add(pair)
+            accepted.append((index, item, seated))
+    return accepted, results
+
+
+def _insert_bookings(db: Session, accepted: list) -> list[int]:
+    """Insert every accepted booking in one statement, returning ids in order.
+
+    Rows are matched back by (user_id, movie_id), which is unique within an
+    accepted batch; asking for RETURNING in parameter order instead would make
+    SQLite fall back to one INSERT per row.
+    """
+    if not accepted:
+        return []
+    statement = insert(Booking).returning(
+        Booking.id, Booking.user_id, Booking.movie_id
+    )
+    rows = db.execute(
+        statement,
+        [
+            {"user_id": item["user_id"], "movie_id": item["movie_id"]}
+            for _, item, _ in accepted
+        ],
+    )
+    ids = {(user_id, movie_id): booking_id for booking_id, user_id, movie_id in rows}
+    return [ids[(item["user_id"], item["movie_id"])] for _, item, _ in accepted]
+
+
+def _labels_by_booking(db: Session, booking_ids: list[int]) -> dict[int, list[str]]:
+    labels = {booking_id: [] for booking_id in booking_ids}
+    for booking_id, label in (
+        db.query(Seat.booking_id, Seat.label)
+        .filter(Seat.booking_id.in_(booking_ids))
+        .order_by(Seat.id)
+    ):
+        labels[booking_id].append(label)
+    return labels
+
+
+def book_batch(db: Session, items: list[dict], check_users: bool = False):
+    """Book many (user, movie) pairs in one transaction. The caller commits.
+
+    Each item holds `user_id`, `movie_id` and optionally `seats`/`quantity`.
+    Validation and duplicate detection are one query each, and all bookings
+    are inserted with a single statement; only reserved-seating items need a
+    per-item seat claim. Items that fail are reported and rolled back
+    individually while the rest of the batch goes through. Returns one
+    result per item, in request order.
+    """
+    for attempt in range(BATCH_ATTEMPTS):
+        accepted, results = _plan_bookings(db, items, check_users)
+        try:
+            booking_ids = _insert_bookings(db, accepted)
+            break
+        except IntegrityError:
+            db.rollback()
+            if attempt == BATCH_ATTEMPTS - 1:
+                raise BOOKING_ALREADY_EXISTS_ERROR
+
+    rejected = []
+    for (index, item, seated), booking_id in zip(accepted, booking_ids):
+        if seated and not claim_seats(
+            db,
+            item["movie_id"],
+            item.get("seats"),
+            item.get("quantity", 1),
+            {Seat.status: SEAT_BOOKED, Seat.booking_id: booking_id},
+        ):
+            rejected.append(booking_id)
+            results[index] = _failed(index, item, SEATS_UNAVAILABLE_ERROR)
+    if rejected:
+        _delete_bookings(db, rejected)
+
+    labels = _labels_by_booking(db, [b for b in booking_ids if b not in rejected])
+    booked = []
+    for (index, item, _), booking_id in zip(accepted, booking_ids):
+        if index not in results:
+            results[index] = _result(
+                index, item, BOOKED, booking_id=booking_id, seats=labels[booking_id]
+            )
+            booked.append((item["movie_id"], 1, len(labels[booking_id]) or 1))
+    record_bookings(db, booked)
+    return [results[index] for index in range(len(items))]
+
+
+def _delete_bookings(db: Session, booking_ids: list[int]) -> dict[int, int]:
+    """Free the bookings' seats, then delete them, one statement each.
+
+    Returns the tickets (seats, or 1 without a seat map) of each booking
+    this call deleted. One a concurrent request deleted first is left out,
+    so its cancellation is only counted once.
+    """
+    seats = dict(
+        db.query(Seat.booking_id, func.count(Seat.id))
+        .filter(Seat.booking_id.in_(booking_ids))
+        .group_by(Seat.booking_id)
+    )
+    db.query(Seat).filter(Seat.booking_id.in_(booking_ids)).update(
+        {Seat.status: SEAT_AVAILABLE, Seat.booking_id: None},
+        synchronize_session=False,
+    )
+    deleted = db.scalars(
+        delete(Booking).where(Booking.id.in_(booking_ids)).returning(Booking.id)
+    )
+    return {booking_id: seats.get(booking_id) or 1 for booking_id in deleted}
+
+
+def cancel_batch(db: Session, items: list[dict]):
+    """Cancel many (user, movie) bookings in one transaction. The caller commits."""
+    found = {}
+    if items:
+        user_ids = {item["user_id"] for item in items}
+        movie_ids = {item["movie_id"] for item in items}
+        found = {
+            (user_id, movie_id): booking_id
+            for booking_id, user_id, movie_id in db.query(
+                Booking.id, Booking.user_id, Booking.movie_id
+            ).filter(Booking.user_id.in_(user_ids), Booking.movie_id.in_(movie_ids))
+        }
+
+    matched = {}
+    for index, item in enumerate(items):
+        booking_id = found.pop((item["user_id"], item["movie_id"]), None)
+        if booking_id is not None:
+            matched[index] = booking_id
+    tickets = _delete_bookings(db, list(matched.values())) if matched else {}
+
+    results, cancelled = [], []
+    for index, item in enumerate(items):
+        booking_id = matched.get(index)
+        if booking_id not in tickets:  # never there, or cancelled concurrently
+            results.append(_failed(index, item, BOOKING_NOT_FOUND_ERROR))
+        else:
+            cancelled.append((item["movie_id"], -1, -tickets[booking_id]))
+            results.append(_result(index, item, CANCELLED, booking_id=booking_id))
+    record_bookings(db, cancelled)
+    return results
+
+
+def changed_movies(results: list[dict]) -> set[int]:
+    return {result["movie_id"] for result in results if result["status"] != FAILED}
+
+
+def summarize(results: list[dict]) -> dict:
+    failed = sum(result["status"] == FAILED for result in results)
+    return {"succeeded": len(results) - failed, "failed": failed, "results": results}
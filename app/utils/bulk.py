@@ -0,0 +1,329 @@
+import csv
+import json
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import DIALECT_INSERTS
+from app.models.auditorium import Auditorium
+from app.models.movie import Movie
+from app.models.seat import Seat
+from app.schemas.movieSchema import MovieCreate
+from app.utils.exceptions import SCREEN_BUSY_ERROR
+from app.utils.inventory import build_seat_map, replace_seat_map
+from app.utils.schedule import check_screen_free, lock_screen
+
+NATURAL_KEY = ("title", "showtime")
+# The natural key only covers shows not scheduled from a film
+UNSCHEDULED = Movie.film_id.is_(None)
+
+
+def _decode(line: bytes):
+    try:
+        return line.decode().rstrip("\r")
+    except UnicodeDecodeError as error:
+        return ValueError(f"Invalid UTF-8: {error.reason}")
+
+
+async def iter_lines(request: Request):
+    """Yield decoded lines from the request body as it arrives; a line that
+    is not UTF-8 is yielded as a ValueError to report as a row error."""
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield _decode(line)
+    if pending:
+        yield _decode(pending)
+
+
+async def iter_ndjson(request: Request):
+    async for line in iter_lines(request):
+        if isinstance(line, ValueError):
+            yield line
+        elif line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                yield ValueError(f"Invalid JSON: {error}")
+
+
+async def iter_csv(request: Request):
+    """Yield CSV records as dicts; quoted fields may span several lines."""
+    header, record = None, ""
+    async for line in iter_lines(request):
+        if isinstance(line, ValueError):
+            yield line
+            record = ""
+            continue
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue  # still inside a quoted field
+        if record.strip():
+            values = next(csv.reader([record]))
+            if header is None:
+                header = [name.strip() for name in values]
+            else:
+                yield {key: value or None for key, value in zip(header, values)}
+        record = ""
+
+
+async def iter_rows(request: Request):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in ("application/x-ndjson", "application/ndjson"):
+        source = iter_ndjson(request)
+    elif content_type == "text/csv":
+        source = iter_csv(request)
+    else:
+        try:
+            body = await request.json()
+        except ValueError as error:
+            body = error
+        rows = body if isinstance(body, list) else [ValueError("Expected a JSON array")]
+
+        async def source_list():
+            for row in rows:
+                yield row
+
+        source = source_list()
+    async for row in source:
+        yield row
+
+
+async def iter_row_batches(request: Request, batch_size: int):
+    """Group incoming rows into numbered batches of `batch_size`."""
+    batch = []
+    number = 0
+    async for row in iter_rows(request):
+        number += 1
+        batch.append((number, row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class MovieImporter:
+    """Validates and upserts movie rows one chunk per transaction.
+
+    Rows are matched on the (title, showtime) natural key. `on_conflict`
+    chooses whether an existing row is updated, skipped, or reported as an
+    error. Updates write every imported column; a row that moves a show to
+    another auditorium rebuilds its seat map, and is rejected once seats
+    are sold, as with PUT /admin/movies/{id}. A row without auditorium_id
+    keeps the show's seating. Like POST /admin/movies, a seated row whose
+    screen already has a show at that time is rejected. Every rejected row
+    is reported with its 1-based row number.
+    """
+
+    def __init__(self, db: Session, on_conflict: str = "update"):
+        self.db = db
+        self.on_conflict = on_conflict
+        self.received = 0
+        self.written = 0
+        self.movie_ids = []
+        self.errors = []
+        self.auditorium_ids = {id for (id,) in db.query(Auditorium.id)}
+
+    def _fail(self, number: int, *messages: str):
+        self.errors.append({"row": number, "errors": list(messages)})
+
+    def _validate(self, batch) -> dict:
+        valid = {}
+        for number, raw in batch:
+            self.received += 1
+            if isinstance(raw, Exception):
+                self._fail(number, str(raw))
+                continue
+            try:
+                movie = MovieCreate.model_validate(raw)
+            except ValidationError as error:
+                self._fail(
+                    number,
+                    *[
+                        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}"
+                        for e in error.errors()
+                    ],
+                )
+                continue
+            if movie.auditorium_id is not None and (
+                movie.auditorium_id not in self.auditorium_ids
+            ):
+                self._fail(number, "auditorium_id: Auditorium not found")
+                continue
+            row = movie.model_dump()
+            row["keep_seating"] = "auditorium_id" not in movie.model_fields_set
+            # Later rows win when a file repeats a natural key
+            valid[(movie.title, movie.showtime)] = (number, row)
+        return valid
+
+    def _existing(self, valid: dict) -> dict:
+        """(id, auditorium_id) of the movies the batch's rows would update."""
+        titles = {title for title, _ in valid}
+        showtimes = {showtime for _, showtime in valid}
+        return {
+            (title, showtime): (movie_id, auditorium_id)
+            for movie_id, title, showtime, auditorium_id in self.db.query(
+                Movie.id, Movie.title, Movie.showtime, Movie.auditorium_id
+            ).filter(
+                Movie.title.in_(titles), Movie.showtime.in_(showtimes), UNSCHEDULED
+            )
+            if (title, showtime) in valid
+        }
+
+    def _split_moves(self, valid: dict, existing: dict, keep: set) -> list:
+        """Take the rows that move an existing show to another auditorium
+        out of `valid`; rows without auditorium_id keep the current one."""
+        moves = []
+        for key, (movie_id, auditorium_id) in existing.items():
+            number, row = valid[key]
+            if key in keep:
+                row["auditorium_id"] = auditorium_id
+            elif row["auditorium_id"] != auditorium_id:
+                moves.append((number, row, movie_id))
+                del valid[key]
+        return moves
+
+    def _move_shows(self, moves: list):
+        """Update moved shows one savepoint each, swapping their seat maps."""
+        statement = self._statement()
+        for number, row, movie_id in moves:
+            auditorium = row["auditorium_id"] and self.db.get(
+                Auditorium, row["auditorium_id"]
+            )
+            try:
+                with self.db.begin_nested():
+                    self._claim_screen(row, movie_id)
+                    replace_seat_map(self.db, self.db.get(Movie, movie_id), auditorium)
+                    written = self.db.execute(statement, [row]).all()
+            except HTTPException as error:
+                self._fail(number, f"auditorium_id: {error.detail}")
+                continue
+            self.written += len(written)
+            self.movie_ids += [movie_id for movie_id, _ in written]
+        self.db.commit()
+
+    def _claim_screen(self, row: dict, movie_id: int | None):
+        """Lock the row's screen and check it is free at the row's showtime;
+        `movie_id` is the show the row updates, if any."""
+        if row["auditorium_id"] is None:
+            return
+        lock_screen(self.db, row["auditorium_id"])
+        check_screen_free(
+            self.db, row["auditorium_id"], row["showtime"], exclude_id=movie_id
+        )
+
+    def _claim_screens(self, valid: dict, existing: dict):
+        """Drop the chunk's seated rows whose screen is busy at their
+        showtime, whether with a stored show or an earlier row of the chunk."""
+        screens = {row["auditorium_id"] for _, row in valid.values()} - {None}
+        # Lock in a fixed order so concurrent imports cannot deadlock
+        for auditorium_id in sorted(screens):
+            lock_screen(self.db, auditorium_id)
+        claimed = set()
+        for key, (number, row) in list(valid.items()):
+            if row["auditorium_id"] is None:
+                continue
+            slot = (row["auditorium_id"], row["showtime"])
+            try:
+                if slot in claimed:
+                    raise SCREEN_BUSY_ERROR
+                check_screen_free(
+                    self.db,
+                    row["auditorium_id"],
+                    row["showtime"],
+                    exclude_id=existing.get(key, (None,))[0],
+                )
+            except HTTPException as error:
+                self._fail(number, f"auditorium_id: {error.detail}")
+                del valid[key]
+                continue
+            claimed.add(slot)
+
+    def _statement(self):
+        insert = DIALECT_INSERTS[self.db.get_bind().dialect.name](Movie)
+        if self.on_conflict == "update":
+            insert = insert.on_conflict_do_update(
+                index_elements=list(NATURAL_KEY),
+                index_where=UNSCHEDULED,
+                set_={
+                    "description": insert.excluded.description,
+                    "auditorium_id": insert.excluded.auditorium_id,
+                },
+            )
+        elif self.on_conflict == "skip":
+            insert = insert.on_conflict_do_nothing(
+                index_elements=list(NATURAL_KEY), index_where=UNSCHEDULED
+            )
+        return insert.returning(Movie.id, Movie.auditorium_id)
+
+    def _build_seat_maps(self, written):
+        seated = {movie_id: aud_id for movie_id, aud_id in written if aud_id}
+        if not seated:
+            return
+        mapped = {
+            movie_id
+            for (movie_id,) in self.db.query(Seat.movie_id)
+            .filter(Seat.movie_id.in_(seated))
+            .distinct()
+        }
+        auditoriums = {
+            auditorium.id: auditorium
+            for auditorium in self.db.query(Auditorium).filter(
+                Auditorium.id.in_(set(seated.values()))
+            )
+        }
+        for movie_id, auditorium_id in seated.items():
+            if movie_id not in mapped:
+                build_seat_map(self.db, movie_id, auditoriums[auditorium_id])
+
+    def import_batch(self, batch):
+        valid = self._validate(batch)
+        keep = {key for key, (_, row) in valid.items() if row.pop("keep_seating")}
+        existing = self._existing(valid) if valid else {}
+        if valid and self.on_conflict == "update":
+            self._move_shows(self._split_moves(valid, existing, keep))
+        self._claim_screens(valid, existing)
+        if not valid:
+            self.db.commit()
+            return
+        rows = [row for _, row in valid.values()]
+        try:
+            written = self.db.execute(self._statement(), rows).all()
+            self._build_seat_maps(written)
+            self.db.commit()
+            self.written += len(written)
+            self.movie_ids += [movie_id for movie_id, _ in written]
+        except IntegrityError:
+            self.db.rollback()
+            self._import_rows_individually(valid, existing)
+
+    def _import_rows_individually(self, valid: dict, existing: dict):
+        """Fallback after a failed chunk: one savepoint per row to find the culprits."""
+        statement = self._statement()
+        for key, (number, row) in valid.items():
+            try:
+                with self.db.begin_nested():
+                    # The chunk's screen locks went with its rollback
+                    self._claim_screen(row, existing.get(key, (None,))[0])
+                    written = self.db.execute(statement, [row]).all()
+                    self._build_seat_maps(written)
+                self.written += len(written)
+                self.movie_ids += [movie_id for movie_id, _ in written]
+            except HTTPException as error:
+                self._fail(number, f"auditorium_id: {error.detail}")
+            except IntegrityError:
+                self._fail(number, "title, showtime: Movie already exists")
+        self.db.commit()
+
+    def report(self) -> dict:
+        return {
+            "received": self.received,
+            "written": self.written,
+            "failed": len(self.errors),
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+        }
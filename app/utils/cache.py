@@ -0,0 +1,105 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from app.config import CATALOG_CACHE_MAX_ENTRIES, CATALOG_CACHE_TTL
+from app.utils.state import make_state_backend
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def build(cls, body: bytes, next_cursor: Optional[str] = None):
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        return cls(body, etag, next_cursor)
+
+    def to_bytes(self) -> bytes:
+        return b"\n".join(
+            [self.etag.encode(), (self.next_cursor or "").encode(), self.body]
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        etag, next_cursor, body = data.split(b"\n", 2)
+        return cls(body, etag.decode(), next_cursor.decode() or None)
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags
+
+
+class CatalogCache:
+    """Versioned cache of pre-serialized movie catalog responses.
+
+    Every admin write bumps the version, so entries from older versions are
+    never read again and simply age out of the backend.
+    """
+
+    VERSION_KEY = "catalog:version"
+
+    def __init__(self, backend, ttl: int = CATALOG_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def version(self) -> int:
+        value = self.backend.get(self.VERSION_KEY)
+        return int(value) if value else 0
+
+    def _key(self, version: int, variant: str) -> str:
+        return f"catalog:{version}:{variant}"
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, variant: str, version: int) -> Optional[CachedResponse]:
+        data = self.backend.get(self._key(version, variant))
+        if data is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return CachedResponse.from_bytes(data)
+
+    def put(self, variant: str, version: int, cached: CachedResponse):
+        """Store under the version read before querying, so rows read during
+        a concurrent invalidation are filed under the old version."""
+        self.backend.set(self._key(version, variant), cached.to_bytes(), ex=self.ttl)
+
+    def invalidate(self) -> int:
+        """Bump the catalog version; returns the new one."""
+        version = self.backend.incr(self.VERSION_KEY)
+        self._count("invalidations")
+        return version
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "version": self.version()}
+
+
+def cached_json_response(
+    cached: CachedResponse, request: Request, cache_status: str, extra_headers=None
+) -> Response:
+    """Serve pre-serialized JSON, answering 304 when the client's ETag matches."""
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": "private, no-cache",
+        "X-Cache": cache_status,
+        **(extra_headers or {}),
+    }
+    if cached.matches(request.headers.get("if-none-match")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+
+catalog_cache = CatalogCache(make_state_backend(CATALOG_CACHE_MAX_ENTRIES))
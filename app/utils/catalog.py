@@ -0,0 +1,44 @@
+from sqlalchemy.orm import Session
+
+from app.models.movie import Movie
+from app.utils.cache import CachedResponse, catalog_cache
+from app.utils.pagination import MovieFilters, PageParams, paginate, parse_fields
+from app.utils.serialization import json_encoder
+
+MOVIE_COLUMNS = {
+    "id": Movie.id,
+    "title": Movie.title,
+    "description": Movie.description,
+    "showtime": Movie.showtime,
+    "film_id": Movie.film_id,
+}
+
+
+def catalog_page(db: Session, page: PageParams, filters: MovieFilters):
+    """One catalog page from the cache, queried and cached on a miss.
+
+    Returns the page and its X-Cache status.
+    """
+    variant = "|".join(
+        str(value)
+        for value in (
+            page.limit,
+            page.cursor,
+            page.fields,
+            filters.title_prefix,
+            filters.showtime_from,
+            filters.showtime_to,
+            filters.sort,
+        )
+    )
+    version = catalog_cache.version()
+    cached = catalog_cache.get(variant, version)
+    if cached is not None:
+        return cached, "HIT"
+    fields = parse_fields(page.fields, MOVIE_COLUMNS, ("title", "showtime"))
+    movies, next_cursor = paginate(
+        db, MOVIE_COLUMNS, fields, filters.sort_columns(), page, filters.clauses()
+    )
+    cached = CachedResponse.build(json_encoder.dumps(movies), next_cursor)
+    catalog_cache.put(variant, version, cached)
+    return cached, "MISS"
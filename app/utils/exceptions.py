@@ -15,11 +15,21 @@ INVALID_CREDS = HTTPException(
     status_code=status.HTTP_404_NOT_FOUND, detail="Invalid Username Or Password"
 )
 
+INVALID_REFRESH_TOKEN_ERROR = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid or expired refresh token",
+)
+
 # Movie Errors
 MOVIE_NOT_FOUND_ERROR = HTTPException(
     status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found"
 )
 
+MOVIE_ALREADY_EXISTS_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="A movie with this title and showtime already exists",
+)
+
 # Booking Errors
 BOOKING_NOT_FOUND_ERROR = HTTPException(
     status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found"
@@ -30,6 +40,11 @@ BOOKING_ALREADY_EXISTS_ERROR = HTTPException(
     status_code=status.HTTP_400_BAD_REQUEST, detail="You have already booked this movie"
 )
 
+# User Errors
+USER_NOT_FOUND_ERROR = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+)
+
 # Username Already Exists
 USERNAME_ALREADY_EXISTS_ERROR = HTTPException(
     status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists"
@@ -40,3 +55,128 @@ USERNAME_ALREADY_EXISTS_ERROR = HTTPException(
 INVALID_MOVIE_DATA = HTTPException(
     status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalide Movie Data"
 )
+
+
+# Login Throttled
+TOO_MANY_LOGIN_ATTEMPTS_ERROR = HTTPException(
+    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    detail="Too many login attempts, please retry later",
+)
+
+# Password Hashing Pool Saturated
+HASHING_BUSY_ERROR = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Server is busy, please retry shortly",
+    headers={"Retry-After": "1"},
+)
+
+# Booking Pipeline Saturated
+BOOKING_QUEUE_FULL_ERROR = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many bookings in progress, please retry shortly",
+    headers={"Retry-After": "1"},
+)
+
+# Booking Pipeline Stalled
+BOOKING_TIMEOUT_ERROR = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="The booking was not confirmed in time; check your bookings before retrying",
+    headers={"Retry-After": "1"},
+)
+
+
+# Seat Inventory Errors
+AUDITORIUM_NOT_FOUND_ERROR = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="Auditorium not found"
+)
+
+AUDITORIUM_ALREADY_EXISTS_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Auditorium already exists"
+)
+
+SEATS_UNAVAILABLE_ERROR = HTTPException(
+    status_code=status.HTTP_409_CONFLICT, detail="Requested seats are not available"
+)
+
+SEATING_NOT_AVAILABLE_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="This show does not have reserved seating",
+)
+
+SEAT_MAP_LOCKED_ERROR = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="Seats for this show have already been sold",
+)
+
+# Seat Hold Errors
+HOLD_NOT_FOUND_ERROR = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="Hold not found"
+)
+
+HOLD_EXPIRED_ERROR = HTTPException(
+    status_code=status.HTTP_410_GONE, detail="Hold has expired or was released"
+)
+
+# Idempotency Errors
+INVALID_IDEMPOTENCY_KEY_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Idempotency-Key must be 1 to 255 characters",
+)
+
+IDEMPOTENCY_KEY_REUSED_ERROR = HTTPException(
+    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    detail="Idempotency-Key was already used for a different request",
+)
+
+# Live Feed Errors
+FEED_FULL_ERROR = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many live feed subscribers, please poll instead",
+)
+
+# Waitlist Errors
+ALREADY_WAITLISTED_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="You are already on the waitlist for this movie",
+)
+
+SEATS_STILL_AVAILABLE_ERROR = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="Seats are still available, book them instead",
+)
+
+WAITLIST_AHEAD_ERROR = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="Other users are waiting for this show, join its waitlist",
+)
+
+WAITLIST_ENTRY_NOT_FOUND_ERROR = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="You are not on this waitlist"
+)
+
+# Listing Errors
+INVALID_CURSOR_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor"
+)
+
+INVALID_FIELDS_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown field requested"
+)
+
+# Scheduling Errors
+FILM_NOT_FOUND_ERROR = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="Film not found"
+)
+
+THEATER_NOT_FOUND_ERROR = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="Theater not found"
+)
+
+THEATER_ALREADY_EXISTS_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Theater already exists"
+)
+
+SCREEN_BUSY_ERROR = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="The screen already has a show at that time",
+)
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+import zlib
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import EXPORT_BATCH_SIZE
+from app.models.booking import Booking
+
+EXPORT_COLUMNS = (Booking.id, Booking.user_id, Booking.movie_id)
+
+
+def iter_booking_batches(bind, filters: list, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield bookings `batch_size` rows at a time from a server-side cursor.
+
+    The generator owns its session because the request's session is closed
+    before a streamed body is sent.
+    """
+    with Session(bind=bind) as db:
+        result = db.execute(
+            select(*EXPORT_COLUMNS)
+            .where(*filters)
+            .order_by(Booking.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for rows in result.partitions():
+            yield rows
+
+
+def ndjson_chunks(batches):
+    keys = [column.key for column in EXPORT_COLUMNS]
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(keys, row)), separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode()
+
+
+def csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([column.key for column in EXPORT_COLUMNS])
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,366 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import (
+    FEED_COALESCE_SECONDS,
+    FEED_KEEPALIVE_SECONDS,
+    FEED_MAX_SUBSCRIBERS,
+    REDIS_URL,
+)
+from app.models.booking import Booking
+from app.models.movie import Movie
+from app.models.seat import Seat, SEAT_AVAILABLE
+from app.utils.exceptions import FEED_FULL_ERROR
+from app.utils.state import backend_name, make_state_backend
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+class Subscriber:
+    """One listener on a show's feed: just the latest undelivered message.
+
+    A slow consumer never builds a backlog; a newer message replaces the
+    one it has not read yet, so publishers never wait on it either.
+    """
+
+    __slots__ = ("movie_id", "message", "event")
+
+    def __init__(self, movie_id: int):
+        self.movie_id = movie_id
+        self.message: bytes | None = None
+        self.event = asyncio.Event()
+
+    def offer(self, message: bytes) -> bool:
+        """Queue `message`; returns False if it replaced an unread one."""
+        replaced = self.message is not None
+        self.message = message
+        self.event.set()
+        return not replaced
+
+    async def next(self, timeout: float) -> bytes | None:
+        """Wait up to `timeout` seconds for a message; None on timeout."""
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.event.clear()
+        message, self.message = self.message, None
+        return message
+
+
+class FeedHub:
+    """In-process fan-out of availability updates to per-show subscribers.
+
+    `publish` may be called from any thread. Updates are coalesced per show
+    for FEED_COALESCE_SECONDS and then delivered on the event loop, each
+    message serialized once and shared by every subscriber.
+    """
+
+    def __init__(
+        self,
+        coalesce_seconds: float = FEED_COALESCE_SECONDS,
+        max_subscribers: int = FEED_MAX_SUBSCRIBERS,
+    ):
+        self.coalesce_seconds = coalesce_seconds
+        self.max_subscribers = max_subscribers
+        self._topics: dict[int, set[Subscriber]] = {}
+        self._pending: dict[int, dict] = {}
+        self._flush_scheduled = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+        self._count = 0
+        self._stats = {"published": 0, "delivered": 0, "coalesced": 0}
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def has_subscribers(self, movie_id: int) -> bool:
+        return movie_id in self._topics
+
+    def watched(self) -> list[int]:
+        """Shows with at least one subscriber in this process."""
+        with self._lock:
+            return list(self._topics)
+
+    def subscribe(self, movie_id: int) -> Subscriber:
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise FEED_FULL_ERROR
+            subscriber = Subscriber(movie_id)
+            self._topics.setdefault(movie_id, set()).add(subscriber)
+            self._count += 1
+            return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            topic = self._topics.get(subscriber.movie_id)
+            if topic is None or subscriber not in topic:
+                return
+            topic.discard(subscriber)
+            if not topic:
+                del self._topics[subscriber.movie_id]
+            self._count -= 1
+
+    def publish(self, movie_id: int, update: dict):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        with self._lock:
+            if movie_id in self._pending:
+                self._stats["coalesced"] += 1
+            self._pending[movie_id] = update
+            self._stats["published"] += 1
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        loop.call_soon_threadsafe(loop.call_later, self.coalesce_seconds, self._flush)
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+            targets = [
+                (update, list(self._topics.get(movie_id, ())))
+                for movie_id, update in pending.items()
+            ]
+        delivered = coalesced = 0
+        for update, subscribers in targets:
+            message = sse_message(update)
+            for subscriber in subscribers:
+                if subscriber.offer(message):
+                    delivered += 1
+                else:
+                    coalesced += 1
+        with self._lock:
+            self._stats["delivered"] += delivered
+            self._stats["coalesced"] += coalesced
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "subscribers": self._count,
+                "shows": len(self._topics),
+                "max_subscribers": self.max_subscribers,
+            }
+
+
+class LocalBroker:
+    """Publishes straight into this process's hub."""
+
+    def __init__(self, hub: FeedHub):
+        self.hub = hub
+
+    def wants(self, movie_id: int) -> bool:
+        return self.hub.has_subscribers(movie_id)
+
+    def watch(self, movie_id: int):
+        pass  # the hub already knows
+
+    def publish(self, movie_id: int, update: dict):
+        self.hub.publish(movie_id, update)
+
+    async def run(self):
+        pass  # nothing to relay
+
+
+class SharedBroker:
+    """Tells every worker which shows have subscribers anywhere.
+
+    Each worker keeps a `feed:watched:<movie_id>` key alive in the shared
+    backend for the shows its hub has subscribers for, refreshing it every
+    WATCH_TTL_SECONDS / 3. Writers only compute availability for shows that
+    have such a key; one nobody watches any more drops out within the TTL.
+    """
+
+    WATCH_TTL_SECONDS = 30
+
+    def wants(self, movie_id: int) -> bool:
+        if self.hub.has_subscribers(movie_id):
+            return True
+        return self.backend.get(f"feed:watched:{movie_id}") is not None
+
+    def watch(self, movie_id: int):
+        """Mark a show as watched right away, on a new subscription."""
+        self.backend.set(f"feed:watched:{movie_id}", b"1", ex=self.WATCH_TTL_SECONDS)
+
+    def _refresh_watched(self):
+        for movie_id in self.hub.watched():
+            self.watch(movie_id)
+
+    async def keep_watching(self):
+        while True:
+            await asyncio.sleep(self.WATCH_TTL_SECONDS / 3)
+            try:
+                await asyncio.to_thread(self._refresh_watched)
+            except Exception:
+                logger.exception("Feed watch refresh failed")
+
+
+class RedisBroker(SharedBroker):
+    """Relays updates through a Redis channel so every worker's hub sees
+    changes committed by any other worker."""
+
+    CHANNEL = "feed:availability"
+
+    def __init__(self, hub: FeedHub, url: str):
+        import redis
+
+        self.hub = hub
+        self.url = url
+        self.backend = redis.Redis.from_url(url)
+
+    def publish(self, movie_id: int, update: dict):
+        self.backend.publish(self.CHANNEL, json.dumps(update))
+
+    async def run(self):
+        import redis.asyncio
+
+        watching = asyncio.create_task(self.keep_watching())
+        client = redis.asyncio.Redis.from_url(self.url)
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(self.CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        update = json.loads(message["data"])
+                        self.hub.publish(update["movie_id"], update)
+        finally:
+            watching.cancel()
+
+
+class StateBroker(SharedBroker):
+    """Relays updates through a local shared-state backend (e.g. SQLite).
+
+    Each update is stored under the next value of a shared sequence, and
+    every worker polls the sequence every FEED_COALESCE_SECONDS and hands
+    the updates it has not seen to its hub. Updates outlive a slow poller
+    for EVENT_TTL_SECONDS.
+
+    A publisher takes its sequence number before it writes the event, so a
+    poller can find a number with no event yet. It stops there and retries
+    on its next poll; only once every number allocated when it first hit
+    the gap has had GAP_WAIT_SECONDS to be written (the publisher died, or
+    the event expired) does it skip the ones still missing.
+    """
+
+    SEQUENCE_KEY = "feed:sequence"
+    EVENT_TTL_SECONDS = 60
+    GAP_WAIT_SECONDS = 5
+
+    def __init__(
+        self, hub: FeedHub, backend, poll_seconds: float = FEED_COALESCE_SECONDS
+    ):
+        self.hub = hub
+        self.backend = backend
+        self.poll_seconds = poll_seconds
+        self._gap: tuple[int, float] | None = None
+
+    def publish(self, movie_id: int, update: dict):
+        sequence = self.backend.incr(self.SEQUENCE_KEY)
+        self.backend.set(
+            f"feed:event:{sequence}",
+            json.dumps(update).encode(),
+            ex=self.EVENT_TTL_SECONDS,
+        )
+
+    def _sequence(self) -> int:
+        return int(self.backend.get(self.SEQUENCE_KEY) or 0)
+
+    def _relay(self, seen: int) -> int:
+        """Hand events after `seen` to the hub; returns the last one handled."""
+        latest = self._sequence()
+        now = time.monotonic()
+        for sequence in range(seen + 1, latest + 1):
+            data = self.backend.get(f"feed:event:{sequence}")
+            if data is not None:
+                update = json.loads(data)
+                self.hub.publish(update["movie_id"], update)
+            elif not self._gap_timed_out(sequence, latest, now):
+                return sequence - 1
+        return latest
+
+    def _gap_timed_out(self, sequence: int, latest: int, now: float) -> bool:
+        """Whether missing event `sequence` has had its time to be written."""
+        if self._gap is not None:
+            allocated, since = self._gap
+            if sequence <= allocated:
+                return now - since >= self.GAP_WAIT_SECONDS
+        self._gap = (latest, now)
+        return False
+
+    async def run(self):
+        watching = asyncio.create_task(self.keep_watching())
+        try:
+            seen = await asyncio.to_thread(self._sequence)
+            while True:
+                await asyncio.sleep(self.poll_seconds)
+                try:
+                    seen = await asyncio.to_thread(self._relay, seen)
+                except Exception:
+                    logger.exception("Feed relay failed")
+        finally:
+            watching.cancel()
+
+
+def sse_message(update: dict) -> bytes:
+    return f"event: availability\ndata: {json.dumps(update)}\n\n".encode()
+
+
+def availability(db: Session, movie_id: int) -> dict:
+    """Bookings made and, for reserved seating, seats still available."""
+    booked = db.execute(
+        select(func.count(Booking.id)).where(Booking.movie_id == movie_id)
+    ).scalar()
+    available = None
+    if db.execute(select(Movie.auditorium_id).where(Movie.id == movie_id)).scalar():
+        available = db.execute(
+            select(func.count(Seat.id)).where(
+                Seat.movie_id == movie_id, Seat.status == SEAT_AVAILABLE
+            )
+        ).scalar()
+    return {"movie_id": movie_id, "booked": booked, "available": available}
+
+
+def notify_availability(db: Session, movie_ids):
+    """Publish fresh availability for `movie_ids`; call after committing.
+
+    Shows nobody is watching cost nothing beyond a dict lookup.
+    """
+    for movie_id in set(movie_ids):
+        if feed_broker.wants(movie_id):
+            feed_broker.publish(movie_id, availability(db, movie_id))
+
+
+async def event_stream(subscriber: Subscriber, snapshot: dict):
+    """SSE body: the current availability, then every change, with keepalives."""
+    try:
+        yield sse_message(snapshot)
+        while True:
+            message = await subscriber.next(FEED_KEEPALIVE_SECONDS)
+            yield message or KEEPALIVE
+    finally:
+        feed_hub.unsubscribe(subscriber)
+
+
+def make_broker(hub: FeedHub):
+    """Redis pub/sub or a local shared-state backend per STATE_BACKEND
+    (see app.utils.state), otherwise in-process only."""
+    name = backend_name()
+    if name == "redis":
+        return RedisBroker(hub, REDIS_URL)
+    if name == "sqlite":
+        return StateBroker(hub, make_state_backend())
+    return LocalBroker(hub)
+
+
+feed_hub = FeedHub()
+feed_broker = make_broker(feed_hub)
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.config import HASH_EXECUTOR, HASH_QUEUE_LIMIT, HASH_WORKERS
+from app.utils.exceptions import HASHING_BUSY_ERROR
+
+
+class HashingPool:
+    """Bounded worker pool that keeps bcrypt work off the event loop."""
+
+    def __init__(self, kind: str = "thread", workers: int = 4, queue_limit: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hash executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="hash"
+                        )
+        return self._executor
+
+    async def run(self, func, *args):
+        """Run `func(*args)` on the pool, rejecting the call if the queue is full."""
+        with self._lock:
+            if self._pending >= self.queue_limit:
+                self._rejected += 1
+                raise HASHING_BUSY_ERROR
+            self._pending += 1
+
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "queue_depth": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_latency_ms": (
+                    self._total_seconds / self._completed * 1000
+                    if self._completed
+                    else 0.0
+                ),
+                "max_latency_ms": self._max_seconds * 1000,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+hash_pool = HashingPool(HASH_EXECUTOR, HASH_WORKERS, HASH_QUEUE_LIMIT)
@@ -0,0 +1,240 @@
+import asyncio
+import heapq
+import logging
+import threading
+from contextlib import suppress
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.config import (
+    HOLD_SWEEP_BATCH_SIZE,
+    HOLD_SWEEP_INTERVAL_SECONDS,
+    HOLD_TTL_SECONDS,
+)
+from app.models.hold import (
+    SeatHold,
+    HOLD_ACTIVE,
+    HOLD_CONFIRMED,
+    HOLD_EXPIRED,
+    HOLD_RELEASED,
+)
+from app.models.movie import Movie
+from app.models.seat import Seat, SEAT_AVAILABLE, SEAT_BOOKED, SEAT_HELD
+from app.utils.analytics import record_bookings
+from app.utils.exceptions import (
+    HOLD_EXPIRED_ERROR,
+    SEATING_NOT_AVAILABLE_ERROR,
+    SEATS_UNAVAILABLE_ERROR,
+    WAITLIST_AHEAD_ERROR,
+)
+from app.utils.inventory import claim_seats, create_booking, has_waiters, seat_labels
+from app.utils.waitlist import request_promotion
+
+logger = logging.getLogger(__name__)
+
+
+class HoldExpiryQueue:
+    """Min-heap of (expires_at, hold_id) so the sweeper never scans the table."""
+
+    def __init__(self):
+        self._heap: list[tuple[datetime, int]] = []
+        self._lock = threading.Lock()
+
+    def push(self, expires_at: datetime, hold_id: int):
+        with self._lock:
+            heapq.heappush(self._heap, (expires_at, hold_id))
+
+    def pop_due(self, now: datetime, limit: int) -> list[int]:
+        """Remove and return up to `limit` hold ids that expire at or before `now`."""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < limit:
+                due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class HoldStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"created": 0, "confirmed": 0, "released": 0, "expired": 0}
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counts[name] += amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.counts, "pending": len(hold_queue)}
+
+
+hold_queue = HoldExpiryQueue()
+hold_stats = HoldStats()
+
+
+def create_hold(
+    db: Session,
+    user_id: int,
+    movie: Movie,
+    labels: list[str] | None = None,
+    quantity: int = 1,
+):
+    """Hold seats for `HOLD_TTL_SECONDS`. The caller commits.
+
+    The hold is only registered for expiry once the caller has committed,
+    via `track_hold`.
+    """
+    if movie.auditorium_id is None:
+        raise SEATING_NOT_AVAILABLE_ERROR
+    if has_waiters(db, movie.id):
+        raise WAITLIST_AHEAD_ERROR
+
+    hold = SeatHold(
+        user_id=user_id,
+        movie_id=movie.id,
+        status=HOLD_ACTIVE,
+        expires_at=datetime.utcnow() + timedelta(seconds=HOLD_TTL_SECONDS),
+    )
+    db.add(hold)
+    db.flush()
+    claimed = claim_seats(
+        db,
+        movie.id,
+        labels,
+        quantity,
+        {Seat.status: SEAT_HELD, Seat.hold_id: hold.id},
+    )
+    if not claimed:
+        db.rollback()
+        raise SEATS_UNAVAILABLE_ERROR
+    return hold, held_labels(db, hold.id)
+
+
+def track_hold(hold: SeatHold):
+    hold_queue.push(hold.expires_at, hold.id)
+    hold_stats.incr("created")
+
+
+def held_labels(db: Session, hold_id: int) -> list[str]:
+    rows = db.query(Seat.label).filter(Seat.hold_id == hold_id).order_by(Seat.id)
+    return [label for (label,) in rows]
+
+
+def _close_hold(db: Session, hold: SeatHold, new_status: str) -> bool:
+    """Move an active, unexpired hold to `new_status`; False if we lost the race."""
+    closed = (
+        db.query(SeatHold)
+        .filter(
+            SeatHold.id == hold.id,
+            SeatHold.status == HOLD_ACTIVE,
+            SeatHold.expires_at > datetime.utcnow(),
+        )
+        .update({SeatHold.status: new_status}, synchronize_session=False)
+    )
+    return closed == 1
+
+
+def confirm_hold(db: Session, hold: SeatHold):
+    """Turn a hold into a booking for the same seats. The caller commits."""
+    if not _close_hold(db, hold, HOLD_CONFIRMED):
+        raise HOLD_EXPIRED_ERROR
+    booking = create_booking(db, hold.user_id, hold.movie_id)
+    db.query(SeatHold).filter(SeatHold.id == hold.id).update(
+        {SeatHold.booking_id: booking.id}, synchronize_session=False
+    )
+    db.query(Seat).filter(Seat.hold_id == hold.id, Seat.status == SEAT_HELD).update(
+        {Seat.status: SEAT_BOOKED, Seat.booking_id: booking.id, Seat.hold_id: None},
+        synchronize_session=False,
+    )
+    labels = seat_labels(db, booking.id)
+    record_bookings(db, [(hold.movie_id, 1, len(labels))])
+    return booking, labels
+
+
+def release_hold(db: Session, hold: SeatHold):
+    """Give a hold's seats back before it expires. The caller commits."""
+    if not _close_hold(db, hold, HOLD_RELEASED):
+        raise HOLD_EXPIRED_ERROR
+    _free_held_seats(db, [hold.id])
+
+
+def _free_held_seats(db: Session, hold_ids: list[int]):
+    db.query(Seat).filter(Seat.hold_id.in_(hold_ids), Seat.status == SEAT_HELD).update(
+        {Seat.status: SEAT_AVAILABLE, Seat.hold_id: None}, synchronize_session=False
+    )
+
+
+def expire_holds(db: Session, hold_ids: list[int], now: datetime) -> int:
+    """Expire a batch of due holds in one transaction and free their seats."""
+    if not hold_ids:
+        return 0
+    expired = (
+        db.query(SeatHold)
+        .filter(
+            SeatHold.id.in_(hold_ids),
+            SeatHold.status == HOLD_ACTIVE,
+            SeatHold.expires_at <= now,
+        )
+        .update({SeatHold.status: HOLD_EXPIRED}, synchronize_session=False)
+    )
+    _free_held_seats(db, hold_ids)
+    db.commit()
+    hold_stats.incr("expired", expired)
+    if expired:
+        request_promotion(
+            movie_id
+            for (movie_id,) in db.query(SeatHold.movie_id)
+            .filter(SeatHold.id.in_(hold_ids), SeatHold.status == HOLD_EXPIRED)
+            .distinct()
+        )
+    return expired
+
+
+def load_active_holds(db: Session):
+    """Rebuild the expiry heap from the database, e.g. after a restart."""
+    hold_queue.clear()
+    for hold_id, expires_at in db.query(SeatHold.id, SeatHold.expires_at).filter(
+        SeatHold.status == HOLD_ACTIVE
+    ):
+        hold_queue.push(expires_at, hold_id)
+
+
+def sweep_expired_holds(session_factory, now: datetime | None = None) -> int:
+    """Release every hold that is due, `HOLD_SWEEP_BATCH_SIZE` at a time.
+
+    A batch that fails goes back on the heap, so the next sweep retries it.
+    """
+    now = now or datetime.utcnow()
+    total = 0
+    while hold_ids := hold_queue.pop_due(now, HOLD_SWEEP_BATCH_SIZE):
+        try:
+            with session_factory() as db:
+                total += expire_holds(db, hold_ids, now)
+        except Exception:
+            for hold_id in hold_ids:
+                hold_queue.push(now, hold_id)
+            raise
+    return total
+
+
+async def run_hold_sweeper(session_factory, stopping: asyncio.Event):
+    """Background task that periodically expires due holds off the event loop.
+
+    Returns once `stopping` is set, never in the middle of a sweep.
+    """
+    while True:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stopping.wait(), HOLD_SWEEP_INTERVAL_SECONDS)
+        if stopping.is_set():
+            return
+        try:
+            await asyncio.to_thread(sweep_expired_holds, session_factory)
+        except Exception:
+            logger.exception("Seat hold sweep failed")
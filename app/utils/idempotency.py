@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from app.config import (
+    IDEMPOTENCY_MAX_ENTRIES,
+    IDEMPOTENCY_PENDING_SECONDS,
+    IDEMPOTENCY_TTL_SECONDS,
+)
+from app.utils.exceptions import (
+    IDEMPOTENCY_KEY_REUSED_ERROR,
+    INVALID_IDEMPOTENCY_KEY_ERROR,
+)
+from app.utils.state import make_state_backend, offload
+from app.utils.tokens import TokenError, token_cache
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Login, refresh and logout mint or revoke credentials; never replay them
+EXCLUDED_PREFIXES = ("/auth/",)
+MAX_KEY_LENGTH = 255
+# Stored while the first request runs; responses start with "{" instead
+PENDING_PREFIX = b"pending:"
+PENDING_POLL_SECONDS = 0.05
+
+
+class StoredResponse:
+    """A completed response plus the fingerprint of the request behind it."""
+
+    __slots__ = ("fingerprint", "status", "headers", "body")
+
+    def __init__(self, fingerprint: str, status: int, headers: list, body: bytes):
+        self.fingerprint = fingerprint
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def to_bytes(self) -> bytes:
+        meta = {
+            "fingerprint": self.fingerprint,
+            "status": self.status,
+            "headers": [
+                [name.decode("latin-1"), value.decode("latin-1")]
+                for name, value in self.headers
+            ],
+        }
+        return json.dumps(meta).encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        meta, body = data.split(b"\n", 1)
+        meta = json.loads(meta)
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in meta["headers"]
+        ]
+        return cls(meta["fingerprint"], meta["status"], headers, body)
+
+
+class KeyLocks:
+    """One asyncio lock per in-flight key, dropped once nobody waits on it."""
+
+    def __init__(self):
+        self._locks: dict[str, list] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str):
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    def __len__(self):
+        return len(self._locks)
+
+
+def error_response(error: HTTPException) -> JSONResponse:
+    return JSONResponse({"detail": error.detail}, status_code=error.status_code)
+
+
+async def bearer_user_id(headers: dict) -> Optional[int]:
+    scheme, _, token = headers.get(b"authorization", b"").decode().partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return (await token_cache.decode_async(token)).get("id")
+    except TokenError:
+        return None
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response for a repeated `Idempotency-Key`.
+
+    Applies to authenticated mutating requests that send the header. The
+    first request claims (user, key) in the shared-state backend with an
+    atomic insert-if-absent, runs normally, and its response replaces the
+    claim for IDEMPOTENCY_TTL_SECONDS. Duplicates, including ones that
+    arrive on another worker while it is still running, wait for the claim
+    to turn into a response and replay it without touching the handler or
+    the database. A key reused with a different method, path or body is
+    rejected with 422. Server errors are not stored, so those requests can
+    be retried. A claim outlives a dead worker by at most
+    IDEMPOTENCY_PENDING_SECONDS.
+
+    Calls to a shared backend run in a worker thread, off the event loop.
+    The request body is buffered to fingerprint it, so very large uploads
+    (e.g. bulk imports) should be sent without a key.
+    """
+
+    def __init__(
+        self,
+        app,
+        backend=None,
+        ttl: int = IDEMPOTENCY_TTL_SECONDS,
+        pending_ttl: int = IDEMPOTENCY_PENDING_SECONDS,
+    ):
+        self.app = app
+        self.backend = backend or make_state_backend(IDEMPOTENCY_MAX_ENTRIES)
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.locks = KeyLocks()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        key = headers.get(IDEMPOTENCY_HEADER)
+        if key is None or scope["path"].startswith(EXCLUDED_PREFIXES):
+            return await self.app(scope, receive, send)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return await error_response(INVALID_IDEMPOTENCY_KEY_ERROR)(
+                scope, receive, send
+            )
+        user_id = await bearer_user_id(headers)
+        if user_id is None:
+            return await self.app(scope, receive, send)
+
+        store_key = f"idempotency:{user_id}:{key.decode('latin-1')}"
+        body = await read_body(receive)
+        fingerprint = request_fingerprint(scope, body)
+        pending = PENDING_PREFIX + fingerprint.encode()
+        # Duplicates on this worker queue on the lock; the claim covers the rest
+        async with self.locks.hold(store_key):
+            while True:
+                data = await offload(self.backend, self._claim, store_key, pending)
+                if data is None:
+                    break
+                if data.startswith(PENDING_PREFIX):
+                    if data != pending:
+                        return await error_response(IDEMPOTENCY_KEY_REUSED_ERROR)(
+                            scope, receive, send
+                        )
+                    await asyncio.sleep(PENDING_POLL_SECONDS)
+                    continue
+                stored = StoredResponse.from_bytes(data)
+                if stored.fingerprint != fingerprint:
+                    return await error_response(IDEMPOTENCY_KEY_REUSED_ERROR)(
+                        scope, receive, send
+                    )
+                return await replay(stored, send)
+            await self._run(scope, receive, send, body, store_key, fingerprint)
+
+    def _claim(self, store_key: str, pending: bytes) -> Optional[bytes]:
+        """Claim `store_key` and return None, or return what it already holds."""
+        while True:
+            data = self.backend.get(store_key)
+            if data is not None:
+                return data
+            if self.backend.set(store_key, pending, ex=self.pending_ttl, nx=True):
+                return None
+            # another worker claimed it first; read what it stored
+
+    async def _run(self, scope, receive, send, body, store_key, fingerprint):
+        sent = False
+        status = 500
+        response_headers = []
+        chunks = []
+
+        async def replay_receive():
+            # The body was already read to fingerprint it; hand it over once
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def send_wrapper(message):
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+        finally:
+            if status < 500:
+                body = b"".join(chunks)
+                stored = StoredResponse(fingerprint, status, response_headers, body)
+                await offload(self.backend, self._store, store_key, stored)
+            else:
+                # let a retry run it again
+                await offload(self.backend, self.backend.delete, store_key)
+
+    def _store(self, store_key: str, stored: StoredResponse):
+        self.backend.set(store_key, stored.to_bytes(), ex=self.ttl)
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+def request_fingerprint(scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (scope["method"], scope["path"], scope.get("query_string", b"")):
+        digest.update(part if isinstance(part, bytes) else part.encode())
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+async def replay(stored: StoredResponse, send):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": [*stored.headers, (REPLAYED_HEADER, b"true")],
+        }
+    )
+    await send({"type": "http.response.body", "body": stored.body})
@@ -0,0 +1,226 @@
+import random
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import SEAT_CLAIM_RETRIES
+from app.models.auditorium import Auditorium
+from app.models.booking import Booking
+from app.models.movie import Movie
+from app.models.seat import Seat, SEAT_AVAILABLE, SEAT_BOOKED
+from app.models.waitlist import WaitlistEntry, WAITLIST_WAITING
+from app.utils.analytics import record_bookings
+from app.utils.exceptions import (
+    BOOKING_ALREADY_EXISTS_ERROR,
+    SEATING_NOT_AVAILABLE_ERROR,
+    SEATS_UNAVAILABLE_ERROR,
+    SEAT_MAP_LOCKED_ERROR,
+    WAITLIST_AHEAD_ERROR,
+)
+
+# How many candidate seats to read per seat requested; spreading concurrent
+# requests over a wider window keeps them from all racing for the same rows.
+CANDIDATE_SPREAD = 4
+
+
+def row_name(index: int) -> str:
+    """Spreadsheet-style row names: 0 -> A, 25 -> Z, 26 -> AA."""
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord("A") + remainder) + name
+    return name
+
+
+def build_seat_map(db: Session, movie_id: int, auditorium: Auditorium):
+    """Create one available seat row per position in the auditorium layout."""
+    db.execute(
+        insert(Seat),
+        [
+            {
+                "movie_id": movie_id,
+                "label": f"{row_name(row)}{number}",
+                "row": row + 1,
+                "number": number,
+                "status": SEAT_AVAILABLE,
+            }
+            for row in range(auditorium.rows)
+            for number in range(1, auditorium.seats_per_row + 1)
+        ],
+    )
+
+
+def replace_seat_map(db: Session, movie: Movie, auditorium: Auditorium | None):
+    """Swap a show's seat map for a new layout, refusing once seats are sold."""
+    sold = (
+        db.query(Seat.id)
+        .filter(Seat.movie_id == movie.id, Seat.status != SEAT_AVAILABLE)
+        .first()
+    )
+    if sold:
+        raise SEAT_MAP_LOCKED_ERROR
+    db.query(Seat).filter(Seat.movie_id == movie.id).delete(synchronize_session=False)
+    if auditorium is not None:
+        build_seat_map(db, movie.id, auditorium)
+
+
+def seat_labels(db: Session, booking_id: int) -> list[str]:
+    rows = db.query(Seat.label).filter(Seat.booking_id == booking_id).order_by(Seat.id)
+    return [label for (label,) in rows]
+
+
+def _claim_labels(db: Session, movie_id: int, labels: list[str], values: dict):
+    claimed = (
+        db.query(Seat)
+        .filter(
+            Seat.movie_id == movie_id,
+            Seat.label.in_(labels),
+            Seat.status == SEAT_AVAILABLE,
+        )
+        .update(values, synchronize_session=False)
+    )
+    return claimed == len(labels)
+
+
+def _claim_any(db: Session, movie_id: int, quantity: int, values: dict):
+    remaining = quantity
+    for _ in range(SEAT_CLAIM_RETRIES):
+        candidates = [
+            seat_id
+            for (seat_id,) in db.query(Seat.id)
+            .filter(Seat.movie_id == movie_id, Seat.status == SEAT_AVAILABLE)
+            .order_by(Seat.id)
+            .limit(remaining * CANDIDATE_SPREAD)
+        ]
+        if len(candidates) < remaining:
+            return False
+        chosen = random.sample(candidates, remaining)
+        remaining -= (
+            db.query(Seat)
+            .filter(Seat.id.in_(chosen), Seat.status == SEAT_AVAILABLE)
+            .update(values, synchronize_session=False)
+        )
+        if remaining == 0:
+            return True
+    return False
+
+
+def claim_seats(
+    db: Session,
+    movie_id: int,
+    labels: list[str] | None,
+    quantity: int,
+    values: dict,
+):
+    """Move available seats to a new state with conditional updates.
+
+    Either the named seats or any `quantity` seats are claimed; the return
+    value says whether all of them were. Partial claims are left for the
+    caller to roll back.
+    """
+    if labels:
+        labels = sorted({label.strip().upper() for label in labels})
+        return _claim_labels(db, movie_id, labels, values)
+    return _claim_any(db, movie_id, quantity, values)
+
+
+def shows_with_waiters(db: Session, movie_ids) -> set[int]:
+    """The shows among `movie_ids` that have users on their waitlist.
+
+    Freed seats of those shows belong to the queue, so they are only booked
+    by waitlist promotion, never directly.
+    """
+    movie_ids = set(movie_ids)
+    if not movie_ids:
+        return set()
+    return set(
+        db.execute(
+            select(WaitlistEntry.movie_id)
+            .where(
+                WaitlistEntry.movie_id.in_(movie_ids),
+                WaitlistEntry.status == WAITLIST_WAITING,
+            )
+            .distinct()
+        ).scalars()
+    )
+
+
+def has_waiters(db: Session, movie_id: int) -> bool:
+    return bool(shows_with_waiters(db, [movie_id]))
+
+
+def create_booking(db: Session, user_id: int, movie_id: int) -> Booking:
+    """Insert a booking row, relying on the unique constraint for duplicates."""
+    booking = Booking(user_id=user_id, movie_id=movie_id)
+    db.add(booking)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise BOOKING_ALREADY_EXISTS_ERROR
+    return booking
+
+
+def book_seats(
+    db: Session,
+    user_id: int,
+    movie: Movie,
+    labels: list[str] | None = None,
+    quantity: int = 1,
+    from_waitlist: bool = False,
+):
+    """Create a booking and atomically claim its seats.
+
+    Duplicate bookings are rejected by the (user_id, movie_id) unique
+    constraint and seats are claimed with conditional updates, so concurrent
+    requests can never sell the same seat twice. While users wait for the
+    show, only their promotions (`from_waitlist`) may book it. On failure
+    the transaction is rolled back and an HTTPException is raised. The
+    caller commits.
+    """
+    if movie.auditorium_id is None and (labels or quantity != 1):
+        raise SEATING_NOT_AVAILABLE_ERROR
+    if movie.auditorium_id is not None and not from_waitlist:
+        if has_waiters(db, movie.id):
+            raise WAITLIST_AHEAD_ERROR
+
+    booking = create_booking(db, user_id, movie.id)
+    if movie.auditorium_id is None:
+        record_bookings(db, [(movie.id, 1, 1)])
+        return booking, []
+
+    claimed = claim_seats(
+        db,
+        movie.id,
+        labels,
+        quantity,
+        {Seat.status: SEAT_BOOKED, Seat.booking_id: booking.id},
+    )
+    if not claimed:
+        db.rollback()
+        raise SEATS_UNAVAILABLE_ERROR
+    labels = seat_labels(db, booking.id)
+    record_bookings(db, [(movie.id, 1, len(labels))])
+    return booking, labels
+
+
+def release_seats(db: Session, booking: Booking) -> int:
+    """Return a booking's seats to the available pool. The caller commits."""
+    return (
+        db.query(Seat)
+        .filter(Seat.booking_id == booking.id)
+        .update(
+            {Seat.status: SEAT_AVAILABLE, Seat.booking_id: None},
+            synchronize_session=False,
+        )
+    )
+
+
+def remove_booking(db: Session, booking: Booking):
+    """Cancel a booking: free its seats, delete it and update the occupancy
+    counters. The caller commits."""
+    released = release_seats(db, booking)
+    db.delete(booking)
+    record_bookings(db, [(booking.movie_id, -1, -(released or 1))])
@@ -0,0 +1,220 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float):
+        with self._lock:
+            series = self._series.setdefault(
+                label_values, [[0] * (len(self.buckets) + 1), 0.0, 0]
+            )
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                labels = ",".join(
+                    f'{name}="{value}"' for name, value in zip(self.labels, label_values)
+                )
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f"{self.name}_sum{{{labels}}} {total}")
+                lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def incr(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {self.value}",
+        ]
+
+
+ROUTE_LABELS = ("method", "route", "status")
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request.",
+    ROUTE_LABELS,
+    LATENCY_BUCKETS,
+)
+request_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed while handling a request.",
+    ROUTE_LABELS,
+    QUERY_BUCKETS,
+)
+request_db_time = Histogram(
+    "http_request_db_seconds",
+    "Time spent in the database while handling a request.",
+    ROUTE_LABELS,
+    LATENCY_BUCKETS,
+)
+response_size = Histogram(
+    "http_response_size_bytes",
+    "Size of response bodies.",
+    ROUTE_LABELS,
+    SIZE_BUCKETS,
+)
+sql_statements = Counter("db_statements_total", "SQL statements executed.")
+sql_seconds = Counter("db_statement_seconds_total", "Time spent executing SQL.")
+
+METRICS = (
+    request_duration,
+    request_queries,
+    request_db_time,
+    response_size,
+    sql_statements,
+    sql_seconds,
+)
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+
+
+# Statements run while handling the current request. Sync handlers and the
+# async sessions' greenlets inherit the request's context, so both count.
+_request_queries: ContextVar[QueryStats | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    sql_statements.incr()
+    sql_seconds.incr(elapsed)
+    stats = _request_queries.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+
+
+def instrument_engine(engine):
+    """Count and time every statement `engine` executes."""
+    event.listen(engine, "before_cursor_execute", _start_timer)
+    event.listen(engine, "after_cursor_execute", _record_query)
+
+
+@contextmanager
+def count_queries():
+    """Count every SQL statement run on instrumented engines inside the block.
+
+    Uses the process-wide counter, so it also sees statements run on the
+    TestClient's event-loop thread; only use it where nothing else runs SQL
+    concurrently, e.g. in tests.
+    """
+    stats = QueryStats()
+    start_count, start_seconds = sql_statements.value, sql_seconds.value
+    try:
+        yield stats
+    finally:
+        stats.count = sql_statements.value - start_count
+        stats.seconds = sql_seconds.value - start_seconds
+
+
+def server_timing(total: float, stats: QueryStats) -> str:
+    return (
+        f"app;dur={total * 1000:.1f}, "
+        f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+    )
+
+
+class MetricsMiddleware:
+    """Records latency, SQL statement count, DB time and response size per route.
+
+    A plain ASGI middleware, so streamed responses pass through untouched
+    and the request's context variable reaches the handler. The
+    `Server-Timing` header reflects work done before the response starts.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = _request_queries.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = server_timing(time.perf_counter() - start, stats)
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", timing.encode()),
+                ]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_queries.reset(token)
+            route = scope.get("route")
+            labels = (
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                str(status_code),
+            )
+            request_duration.observe(labels, time.perf_counter() - start)
+            request_queries.observe(labels, stats.count)
+            request_db_time.observe(labels, stats.seconds)
+            response_size.observe(labels, size)
@@ -0,0 +1,148 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Query
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.models.booking import Booking
+from app.models.movie import Movie
+from app.utils.exceptions import INVALID_CURSOR_ERROR, INVALID_FIELDS_ERROR
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Query parameters shared by every paginated listing."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor"),
+        fields: Optional[str] = Query(None, description="Comma separated columns"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = fields
+
+
+class MovieFilters:
+    """Query parameters for filtering and ordering movie listings."""
+
+    def __init__(
+        self,
+        title_prefix: Optional[str] = None,
+        showtime_from: Optional[datetime] = None,
+        showtime_to: Optional[datetime] = None,
+        sort: str = Query("id", pattern="^(id|showtime)$"),
+    ):
+        self.title_prefix = title_prefix
+        self.showtime_from = showtime_from
+        self.showtime_to = showtime_to
+        self.sort = sort
+
+    def clauses(self) -> list:
+        clauses = []
+        if self.title_prefix:
+            clauses.append(Movie.title.startswith(self.title_prefix, autoescape=True))
+        if self.showtime_from:
+            clauses.append(Movie.showtime >= self.showtime_from)
+        if self.showtime_to:
+            clauses.append(Movie.showtime < self.showtime_to)
+        return clauses
+
+    def sort_columns(self) -> tuple:
+        if self.sort == "showtime":
+            return (Movie.showtime, Movie.id)
+        return (Movie.id,)
+
+
+class BookingFilters:
+    """Query parameters for filtering booking listings."""
+
+    def __init__(self, movie_id: Optional[int] = None, user_id: Optional[int] = None):
+        self.movie_id = movie_id
+        self.user_id = user_id
+
+    def clauses(self) -> list:
+        clauses = []
+        if self.movie_id is not None:
+            clauses.append(Booking.movie_id == self.movie_id)
+        if self.user_id is not None:
+            clauses.append(Booking.user_id == self.user_id)
+        return clauses
+
+
+def encode_cursor(values: list) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_columns: tuple) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(sort_columns):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(value)
+            if column.type.python_type is datetime
+            else value
+            for column, value in zip(sort_columns, values)
+        ]
+    except (ValueError, TypeError):
+        raise INVALID_CURSOR_ERROR
+
+
+def parse_fields(fields: Optional[str], allowed: dict, default: tuple) -> list[str]:
+    if not fields:
+        return list(default)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names or any(name not in allowed for name in names):
+        raise INVALID_FIELDS_ERROR
+    return list(dict.fromkeys(names))
+
+
+def after_cursor(sort_columns: tuple, values: list):
+    """Row-value comparison `(a, b) > (x, y)` spelled out so indexes are used."""
+    return or_(
+        *[
+            and_(
+                *[column == value for column, value in zip(sort_columns[:i], values)],
+                sort_columns[i] > values[i],
+            )
+            for i in range(len(sort_columns))
+        ]
+    )
+
+
+def paginate(
+    db: Session,
+    columns: dict,
+    fields: list[str],
+    sort_columns: tuple,
+    page: PageParams,
+    filters: list = (),
+):
+    """Fetch one keyset page of the requested columns, without loading entities.
+
+    Returns the rows as dicts holding only `fields`, plus the cursor for the
+    next page (None on the last page).
+    """
+    sort_keys = [column.key for column in sort_columns]
+    selected = list(dict.fromkeys([*fields, *sort_keys]))
+    query = db.query(*[columns[name] for name in selected]).filter(*filters)
+    if page.cursor:
+        query = query.filter(
+            after_cursor(sort_columns, decode_cursor(page.cursor, sort_columns))
+        )
+    rows = query.order_by(*sort_columns).limit(page.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        next_cursor = encode_cursor([getattr(rows[-1], key) for key in sort_keys])
+    # The requested fields come first in every row
+    return [dict(zip(fields, row)) for row in rows], next_cursor
@@ -0,0 +1,256 @@
+"""Write-behind booking pipeline with group commit, for on-sale spikes.
+
+With BOOKING_PIPELINE_ENABLED, `POST /movies/{id}/book` does not open its
+own transaction. It queues the booking and waits for its future. A single
+writer task collects the queue into batches of up to BOOKING_BATCH_SIZE,
+waiting at most BOOKING_BATCH_WAIT_MS for a batch to fill. Each batch is
+booked with `book_batch` and committed in one transaction, so one commit
+(one fsync on SQLite) covers many bookings.
+
+`book_batch` keeps the usual rules. Duplicates are rejected both against
+the database and within the batch, and seats are claimed with the same
+conditional updates. A booking that fails is reported to its own caller,
+and the rest of its batch is still committed. Once BOOKING_QUEUE_LIMIT
+bookings are waiting, new ones are rejected with a 503. A caller whose
+booking is not written within BOOKING_WAIT_SECONDS also gets a 503; its
+booking is dropped unless the writer has already taken it.
+"""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+from app.config import (
+    BOOKING_BATCH_SIZE,
+    BOOKING_BATCH_WAIT_MS,
+    BOOKING_QUEUE_LIMIT,
+    BOOKING_WAIT_SECONDS,
+)
+from app.utils.batch import FAILED, book_batch, changed_movies
+from app.utils.exceptions import (
+    BOOKING_ALREADY_EXISTS_ERROR,
+    BOOKING_QUEUE_FULL_ERROR,
+    BOOKING_TIMEOUT_ERROR,
+    MOVIE_NOT_FOUND_ERROR,
+    SEATING_NOT_AVAILABLE_ERROR,
+    SEATS_UNAVAILABLE_ERROR,
+    WAITLIST_AHEAD_ERROR,
+)
+from app.utils.feed import notify_availability
+
+logger = logging.getLogger(__name__)
+
+# The per-item failures book_batch reports, by their detail
+ITEM_ERRORS = {
+    error.detail: error
+    for error in (
+        MOVIE_NOT_FOUND_ERROR,
+        BOOKING_ALREADY_EXISTS_ERROR,
+        SEATING_NOT_AVAILABLE_ERROR,
+        SEATS_UNAVAILABLE_ERROR,
+        WAITLIST_AHEAD_ERROR,
+    )
+}
+
+
+@dataclass
+class QueuedBooking:
+    item: dict
+    future: asyncio.Future = field(repr=False)
+
+
+class BookingPipeline:
+    """Queues bookings and group-commits them from one writer task."""
+
+    def __init__(
+        self,
+        batch_size: int = 64,
+        max_wait_ms: float = 5,
+        queue_limit: int = 1000,
+        wait_seconds: float = 30,
+    ):
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue_limit = queue_limit
+        self.wait_seconds = wait_seconds
+        self._session_factory = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+        self._accepting = False
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._batches = 0
+        self._booked = 0
+        self._failed = 0
+        self._largest_batch = 0
+        self._commit_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._accepting
+
+    def start(self, session_factory):
+        """Start the writer on the running event loop."""
+        self._session_factory = session_factory
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._run())
+        self._accepting = True
+
+    async def stop(self):
+        """Refuse new bookings, then let the writer commit what is queued."""
+        if self._writer is None:
+            return
+        with self._lock:
+            self._accepting = False
+            self._queue.put_nowait(None)
+        await self._writer
+        self._writer = None
+        # Nothing should be queued behind the sentinel, but never leave a
+        # caller waiting on a booking no writer will take
+        while not self._queue.empty():
+            queued = self._queue.get_nowait()
+            if queued is not None and not queued.future.done():
+                queued.future.set_exception(BOOKING_QUEUE_FULL_ERROR)
+
+    async def book(
+        self, user_id: int, movie_id: int, seats: list[str] | None, quantity: int
+    ) -> dict:
+        """Queue one booking and wait for its batch to commit.
+
+        Returns the booking's `book_batch` result or raises its HTTPException.
+        """
+        item = {
+            "user_id": user_id,
+            "movie_id": movie_id,
+            "seats": seats,
+            "quantity": quantity,
+        }
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            if not self._accepting or self._queue.qsize() >= self.queue_limit:
+                self._rejected += 1
+                raise BOOKING_QUEUE_FULL_ERROR
+            self._queued += 1
+            self._queue.put_nowait(QueuedBooking(item, future))
+        try:
+            # A cancelled future is skipped by the writer if it has not
+            # taken the booking yet
+            result = await asyncio.wait_for(future, self.wait_seconds)
+        except TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise BOOKING_TIMEOUT_ERROR
+        if result["status"] == FAILED:
+            raise ITEM_ERRORS[result["detail"]]
+        return result
+
+    def book_from_thread(self, *args) -> dict:
+        """`book` for sync handlers running in the threadpool.
+
+        The thread waits no longer than `book` does, plus a second's grace,
+        even if the event loop itself stops answering.
+        """
+        call = asyncio.run_coroutine_threadsafe(self.book(*args), self._loop)
+        try:
+            return call.result(self.wait_seconds + 1)
+        except TimeoutError:
+            call.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise BOOKING_TIMEOUT_ERROR
+
+    async def _next_batch(self) -> tuple[list[QueuedBooking], bool]:
+        """Wait for a booking, then gather more for up to `max_wait`.
+
+        Returns the batch and whether `stop` was called.
+        """
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        if self._queue.qsize() < self.batch_size - 1:
+            await asyncio.sleep(self.max_wait)
+        batch = [first]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            queued = self._queue.get_nowait()
+            if queued is None:
+                return batch, True
+            batch.append(queued)
+        return batch, False
+
+    async def _run(self):
+        while True:
+            batch, stopping = await self._next_batch()
+            # Callers that went away before their batch was written are dropped
+            batch = [queued for queued in batch if not queued.future.done()]
+            if batch:
+                await self._commit(batch)
+            if stopping:
+                return
+
+    async def _commit(self, batch: list[QueuedBooking]):
+        started = time.perf_counter()
+        try:
+            results = await asyncio.to_thread(
+                self._write, [queued.item for queued in batch]
+            )
+        except Exception as error:
+            logger.exception("Booking batch of %s failed", len(batch))
+            for queued in batch:
+                if not queued.future.done():
+                    queued.future.set_exception(error)
+            return
+
+        failed = sum(result["status"] == FAILED for result in results)
+        with self._lock:
+            self._batches += 1
+            self._booked += len(results) - failed
+            self._failed += failed
+            self._largest_batch = max(self._largest_batch, len(batch))
+            self._commit_seconds += time.perf_counter() - started
+        for queued, result in zip(batch, results):
+            if not queued.future.done():
+                queued.future.set_result(result)
+
+    def _write(self, items: list[dict]) -> list[dict]:
+        with self._session_factory() as db:
+            results = book_batch(db, items)
+            db.commit()
+            notify_availability(db, changed_movies(results))
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._accepting,
+                "batch_size": self.batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_limit": self.queue_limit,
+                "queue_depth": self._queue.qsize() if self._queue else 0,
+                "queued": self._queued,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "batches": self._batches,
+                "booked": self._booked,
+                "failed": self._failed,
+                "largest_batch": self._largest_batch,
+                "avg_batch": (
+                    (self._booked + self._failed) / self._batches
+                    if self._batches
+                    else 0.0
+                ),
+                "avg_commit_ms": (
+                    self._commit_seconds / self._batches * 1000
+                    if self._batches
+                    else 0.0
+                ),
+            }
+
+
+booking_pipeline = BookingPipeline(
+    BOOKING_BATCH_SIZE, BOOKING_BATCH_WAIT_MS, BOOKING_QUEUE_LIMIT, BOOKING_WAIT_SECONDS
+)
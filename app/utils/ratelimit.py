@@ -0,0 +1,354 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+
+from app.config import (
+    LOGIN_FAILURE_WINDOW_SECONDS,
+    LOGIN_IP_BURST,
+    LOGIN_IP_PER_MINUTE,
+    LOGIN_MAX_FAILURES,
+    LOGIN_RATE_LIMIT_ENABLED,
+    LOGIN_USER_BURST,
+    LOGIN_USER_PER_MINUTE,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_TRUST_FORWARDED,
+)
+from app.utils.exceptions import TOO_MANY_LOGIN_ATTEMPTS_ERROR
+from app.utils.state import backend_name, make_state_backend
+
+
+def window_estimate(current: int, previous: int, now: float, window: float) -> float:
+    """Sliding-window count: the previous window weighted by how much of it
+    still overlaps the last `window` seconds, plus the current window."""
+    elapsed = (now % window) / window
+    return previous * (1 - elapsed) + current
+
+
+def window_wait(
+    current: int, previous: int, now: float, window: float, limit: float
+) -> float:
+    """Seconds until the sliding-window count drops below `limit` if nothing
+    more is counted; 0 if it already has."""
+    if window_estimate(current, previous, now, window) < limit:
+        return 0.0
+    elapsed = (now % window) / window
+    if current < limit:
+        # The previous window's share fades out within this window
+        return (1 - (limit - current) / previous - elapsed) * window
+    # Only once this window has become the previous one and faded enough
+    return (2 - limit / current - elapsed) * window
+
+
+class InMemoryRateLimitStore:
+    """Token buckets and sliding-window counters in one bounded LRU.
+
+    Each key holds a 3-item list: `[tokens, updated_at, 0]` for a bucket or
+    `[window_index, current, previous]` for a counter. The least recently
+    used keys are evicted beyond `max_keys`; an evicted bucket simply starts
+    full again and an evicted counter starts at zero.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._entries: OrderedDict[str, list] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _touch(self, key: str, default: list) -> list:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = default
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def take(self, key: str, capacity: float, rate: float, now: float) -> float:
+        """Take one token; returns 0 if allowed, else seconds until one refills."""
+        with self._lock:
+            entry = self._touch(key, [capacity, now, 0])
+            tokens = min(capacity, entry[0] + (now - entry[1]) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            entry[0], entry[1] = tokens, now
+            return wait
+
+    def _roll(self, entry: list, index: int):
+        if entry[0] != index:
+            entry[2] = entry[1] if entry[0] == index - 1 else 0
+            entry[0], entry[1] = index, 0
+
+    def hit(self, key: str, window: float, now: float) -> float:
+        index = int(now // window)
+        with self._lock:
+            entry = self._touch(key, [index, 0, 0])
+            self._roll(entry, index)
+            entry[1] += 1
+            return window_estimate(entry[1], entry[2], now, window)
+
+    def count(self, key: str, window: float, now: float) -> float:
+        index = int(now // window)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return 0.0
+            self._roll(entry, index)
+            return window_estimate(entry[1], entry[2], now, window)
+
+    def wait(self, key: str, window: float, limit: float, now: float) -> float:
+        """Seconds until the counter drops below `limit`; see `window_wait`."""
+        index = int(now // window)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return 0.0
+            self._roll(entry, index)
+            return window_wait(entry[1], entry[2], now, window, limit)
+
+    def reset(self, key: str, window: float):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Refill, take and persist a bucket atomically. Returns the wait as a string
+# because Redis truncates Lua numbers to integers.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitStore:
+    """The same interface backed by Redis, so every worker shares its limits."""
+
+    def __init__(self, client):
+        self.client = client
+        self._take = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key: str, capacity: float, rate: float, now: float) -> float:
+        return float(self._take(keys=[key], args=[capacity, rate, now]))
+
+    def hit(self, key: str, window: float, now: float) -> float:
+        index = int(now // window)
+        pipe = self.client.pipeline()
+        pipe.incr(f"{key}:{index}")
+        pipe.expire(f"{key}:{index}", math.ceil(window * 2))
+        pipe.get(f"{key}:{index - 1}")
+        current, _, previous = pipe.execute()
+        return window_estimate(int(current), int(previous or 0), now, window)
+
+    def count(self, key: str, window: float, now: float) -> float:
+        index = int(now // window)
+        current, previous = self.client.mget(f"{key}:{index}", f"{key}:{index - 1}")
+        return window_estimate(int(current or 0), int(previous or 0), now, window)
+
+    def wait(self, key: str, window: float, limit: float, now: float) -> float:
+        index = int(now // window)
+        current, previous = self.client.mget(f"{key}:{index}", f"{key}:{index - 1}")
+        return window_wait(int(current or 0), int(previous or 0), now, window, limit)
+
+    def reset(self, key: str, window: float):
+        index = int(time.time() // window)
+        self.client.delete(f"{key}:{index}", f"{key}:{index - 1}")
+
+    def clear(self):
+        pass  # keys expire on their own; never flush a shared Redis
+
+
+class StateRateLimitStore:
+    """The same interface over a local shared-state backend (e.g. SQLite),
+    so every worker on the host shares its limits without Redis.
+
+    Buckets are read, refilled and written back in one atomic `update`.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def take(self, key: str, capacity: float, rate: float, now: float) -> float:
+        wait = 0.0
+
+        def refill(value):
+            nonlocal wait
+            tokens, updated = map(float, value.split()) if value else (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            return f"{tokens} {now}".encode()
+
+        self.backend.update(key, refill, ex=math.ceil(capacity / rate) + 1)
+        return wait
+
+    def hit(self, key: str, window: float, now: float) -> float:
+        index = int(now // window)
+        current = self.backend.update(
+            f"{key}:{index}",
+            lambda value: b"%d" % (int(value or 0) + 1),
+            ex=math.ceil(window * 2),
+        )
+        previous = self.backend.get(f"{key}:{index - 1}")
+        return window_estimate(int(current), int(previous or 0), now, window)
+
+    def count(self, key: str, window: float, now: float) -> float:
+        index = int(now // window)
+        current = self.backend.get(f"{key}:{index}")
+        previous = self.backend.get(f"{key}:{index - 1}")
+        return window_estimate(int(current or 0), int(previous or 0), now, window)
+
+    def wait(self, key: str, window: float, limit: float, now: float) -> float:
+        index = int(now // window)
+        current = self.backend.get(f"{key}:{index}")
+        previous = self.backend.get(f"{key}:{index - 1}")
+        return window_wait(int(current or 0), int(previous or 0), now, window, limit)
+
+    def reset(self, key: str, window: float):
+        index = int(time.time() // window)
+        self.backend.delete(f"{key}:{index}", f"{key}:{index - 1}")
+
+    def clear(self):
+        pass  # keys expire on their own; never flush state other workers share
+
+
+def throttled(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=TOO_MANY_LOGIN_ATTEMPTS_ERROR.status_code,
+        detail=TOO_MANY_LOGIN_ATTEMPTS_ERROR.detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class LoginLimiter:
+    """Throttles login attempts per client IP and per username.
+
+    Every attempt takes a token from the IP's and the username's bucket, and
+    a username with too many recent failures is locked out until its
+    sliding failure count drops below the limit again. `check` runs before
+    any database or bcrypt work; the `_async` variants call a shared store
+    from a worker thread instead of the event loop.
+    """
+
+    def __init__(self, store, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {"checked": 0, "throttled": 0, "failures": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def _user_key(username: str) -> str:
+        return username.strip().lower()[:128]
+
+    def check(self, ip: str, username: str):
+        if not self.enabled:
+            return
+        self._count("checked")
+        user = self._user_key(username)
+        now = time.time()
+        wait = self.store.wait(
+            f"login:fail:{user}", LOGIN_FAILURE_WINDOW_SECONDS, LOGIN_MAX_FAILURES, now
+        )
+        if not wait:
+            # The username's bucket is only drawn from once the IP bucket admits
+            # the attempt, so a throttled client cannot drain it for others
+            wait = self.store.take(
+                f"login:ip:{ip}", LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE / 60, now
+            ) or self.store.take(
+                f"login:user:{user}", LOGIN_USER_BURST, LOGIN_USER_PER_MINUTE / 60, now
+            )
+        if wait:
+            self._count("throttled")
+            raise throttled(wait)
+
+    def record_failure(self, username: str):
+        if self.enabled:
+            self._count("failures")
+            self.store.hit(
+                f"login:fail:{self._user_key(username)}",
+                LOGIN_FAILURE_WINDOW_SECONDS,
+                time.time(),
+            )
+
+    def record_success(self, username: str):
+        if self.enabled:
+            self.store.reset(
+                f"login:fail:{self._user_key(username)}", LOGIN_FAILURE_WINDOW_SECONDS
+            )
+
+    async def _offload(self, function, *args):
+        if isinstance(self.store, InMemoryRateLimitStore):
+            return function(*args)
+        return await asyncio.to_thread(function, *args)
+
+    async def check_async(self, ip: str, username: str):
+        await self._offload(self.check, ip, username)
+
+    async def record_failure_async(self, username: str):
+        await self._offload(self.record_failure, username)
+
+    async def record_success_async(self, username: str):
+        await self._offload(self.record_success, username)
+
+    def clear(self):
+        self.store.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {**self._stats, "enabled": self.enabled}
+        if isinstance(self.store, InMemoryRateLimitStore):
+            stats["keys"] = len(self.store)
+        return stats
+
+
+def make_store():
+    """Redis or a local shared-state backend per STATE_BACKEND, otherwise an
+    in-process store."""
+    name = backend_name()
+    if name == "redis":
+        return RedisRateLimitStore(make_state_backend())
+    if name == "sqlite":
+        return StateRateLimitStore(make_state_backend())
+    return InMemoryRateLimitStore(RATE_LIMIT_MAX_KEYS)
+
+
+login_limiter = LoginLimiter(make_store(), LOGIN_RATE_LIMIT_ENABLED)
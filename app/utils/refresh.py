@@ -0,0 +1,100 @@
+import secrets
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import REFRESH_TOKEN_EXPIRE_DAYS
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.utils.exceptions import INVALID_REFRESH_TOKEN_ERROR
+from app.utils.tokens import token_key
+
+
+def issue_refresh_token(db: Session, user_id: int, family_id: str | None = None) -> str:
+    """Store a new refresh token for `user_id` and return its plaintext.
+
+    The token is 256 random bits, so a single SHA-256 is enough to store it
+    safely and is looked up through a unique index; no bcrypt is involved.
+    """
+    token = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            user_id=user_id,
+            token_hash=token_key(token),
+            family_id=family_id or uuid.uuid4().hex,
+            expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return token
+
+
+def rotate_refresh_token(db: Session, token: str) -> tuple[User, str]:
+    """Exchange a refresh token for its successor in the same family.
+
+    Presenting a token that was already rotated or revoked means it leaked,
+    so every token in its family is revoked as well. The caller commits.
+    """
+    now = datetime.utcnow()
+    row = db.execute(
+        select(RefreshToken, User)
+        .join(User, User.id == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == token_key(token))
+    ).first()
+    if row is None:
+        raise INVALID_REFRESH_TOKEN_ERROR
+    stored, user = row
+    family_id = stored.family_id
+
+    # Claim the token atomically so two concurrent refreshes can't both win
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.id == stored.id,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        if stored.revoked_at is not None:
+            revoke_family(db, family_id)
+        db.commit()
+        raise INVALID_REFRESH_TOKEN_ERROR
+
+    return user, issue_refresh_token(db, user.id, family_id)
+
+
+def revoke_family(db: Session, family_id: str) -> int:
+    return db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def revoke_refresh_token(db: Session, token: str, user_id: int) -> int:
+    """Revoke the login session `token` belongs to (its whole family).
+
+    Only `user_id`'s own sessions are revoked; someone else's token is
+    ignored like an unknown one.
+    """
+    family_id = db.execute(
+        select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == token_key(token),
+            RefreshToken.user_id == user_id,
+        )
+    ).scalar()
+    return revoke_family(db, family_id) if family_id else 0
+
+
+def revoke_user_refresh_tokens(db: Session, user_id: int) -> int:
+    return db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
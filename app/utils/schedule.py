@@ -0,0 +1,144 @@
+"""Screen schedules: overlap checks and the showtime queries built on them.
+
+A showing is a `movies` row on a screen (auditorium) from `showtime` to
+`ends_at`. Every query here is a range scan of one of the two schedule
+indexes: `ix_movies_screen_start` (auditorium_id, showtime) and
+`ix_movies_film_start` (film_id, showtime).
+
+Overlap checks lean on MAX_FILM_MINUTES: no show is longer, so only shows
+starting less than that before a new one can still be running when it
+starts. That bounds the check to one short index range per screen instead
+of a comparison against every show on it. Shows added without a film have
+no `ends_at` and occupy just their start time.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import MAX_FILM_MINUTES
+from app.models.auditorium import Auditorium
+from app.models.film import Film
+from app.models.movie import Movie
+from app.utils.exceptions import SCREEN_BUSY_ERROR
+
+SHOWTIME_COLUMNS = (
+    Movie.id,
+    Movie.film_id,
+    Movie.title,
+    Movie.auditorium_id,
+    Auditorium.name.label("screen"),
+    Movie.showtime,
+    Movie.ends_at,
+)
+
+
+def overlapping_show(
+    db: Session,
+    auditorium_id: int,
+    start: datetime,
+    end: datetime | None = None,
+    exclude_id: int | None = None,
+) -> int | None:
+    """Id of a show on the screen that overlaps [start, end), if any.
+
+    Without `end` the show occupies just its start time. `exclude_id` is
+    the show being rescheduled, which cannot clash with itself.
+    """
+    query = select(Movie.id).where(
+        Movie.auditorium_id == auditorium_id,
+        Movie.showtime > start - timedelta(minutes=MAX_FILM_MINUTES),
+        Movie.showtime < end if end else Movie.showtime <= start,
+        or_(
+            Movie.ends_at > start,
+            and_(Movie.ends_at.is_(None), Movie.showtime >= start),
+        ),
+    )
+    if exclude_id is not None:
+        query = query.where(Movie.id != exclude_id)
+    return db.execute(query.limit(1)).scalar()
+
+
+def show_end(film: Film | None, start: datetime) -> datetime | None:
+    """When a show of `film` starting at `start` ends; None without a film."""
+    return start + timedelta(minutes=film.duration_minutes) if film else None
+
+
+def check_screen_free(
+    db: Session,
+    auditorium_id: int,
+    start: datetime,
+    end: datetime | None = None,
+    exclude_id: int | None = None,
+):
+    """Raise SCREEN_BUSY_ERROR if the screen has another show then.
+
+    The caller holds the screen's row lock (see `lock_screen`) until it
+    commits the show.
+    """
+    if overlapping_show(db, auditorium_id, start, end, exclude_id) is not None:
+        raise SCREEN_BUSY_ERROR
+
+
+def schedule_show(
+    db: Session, film: Film, auditorium: Auditorium, start: datetime
+) -> Movie:
+    """Add a showing of `film` on the screen if the screen is free then.
+
+    The caller holds the screen's row lock (see `lock_screen`), builds the
+    seat map once the show is flushed, and commits.
+    """
+    end = show_end(film, start)
+    check_screen_free(db, auditorium.id, start, end)
+    show = Movie(
+        title=film.title,
+        showtime=start,
+        ends_at=end,
+        film_id=film.id,
+        auditorium_id=auditorium.id,
+    )
+    db.add(show)
+    return show
+
+
+def lock_screen(db: Session, auditorium_id: int) -> Auditorium | None:
+    """Load a screen, locking its row where the database supports it, so
+    two concurrent schedulings of one screen cannot both pass the check.
+    SQLite serializes writers anyway."""
+    return (
+        db.query(Auditorium)
+        .filter(Auditorium.id == auditorium_id)
+        .with_for_update()
+        .first()
+    )
+
+
+def playing_at(
+    db: Session, theater_id: int, showtime_from: datetime, showtime_to: datetime
+) -> list[dict]:
+    """Shows starting in [showtime_from, showtime_to) on the theater's screens."""
+    query = (
+        select(*SHOWTIME_COLUMNS)
+        .join(Auditorium, Auditorium.id == Movie.auditorium_id)
+        .where(
+            Auditorium.theater_id == theater_id,
+            Movie.showtime >= showtime_from,
+            Movie.showtime < showtime_to,
+        )
+        .order_by(Movie.showtime, Movie.id)
+    )
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def next_showings(
+    db: Session, film_id: int, showtime_from: datetime, limit: int
+) -> list[dict]:
+    """The film's next `limit` shows starting at or after `showtime_from`."""
+    query = (
+        select(*SHOWTIME_COLUMNS)
+        .outerjoin(Auditorium, Auditorium.id == Movie.auditorium_id)
+        .where(Movie.film_id == film_id, Movie.showtime >= showtime_from)
+        .order_by(Movie.showtime, Movie.id)
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in db.execute(query)]
@@ -0,0 +1,367 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import SEARCH_MAX_EXPANSIONS
+from app.models.movie import Movie
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+TITLE_WEIGHT = 3.0
+# How much a term counts when it only matches the query approximately
+PREFIX_FACTOR = 0.7
+TYPO_FACTORS = {1: 0.5, 2: 0.3}
+# A single letter would expand to far too many words to be a useful prefix
+MIN_PREFIX_LENGTH = 2
+# Shortest query token that is matched with typos (1 edit; 2 from 8 chars)
+MIN_FUZZY_LENGTH = 4
+LOAD_BATCH_SIZE = 5000
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercase, accent-folded alphanumeric words."""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return TOKEN_PATTERN.findall(folded.lower())
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Edit distance counting a swap of adjacent letters as one edit.
+
+    Gives up, returning `limit + 1`, as soon as the distance exceeds `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+            if before and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class MovieSearchIndex:
+    """Incremental in-memory inverted index over movie titles and descriptions.
+
+    Postings map each term to the set of movie ids containing it, and a
+    sorted vocabulary answers prefix queries with a binary search. Title
+    terms are also indexed by trigram, so a misspelled word can be matched
+    by comparing it only against title terms that share some trigrams.
+
+    A query matches movies containing every query word. The last word may
+    be a prefix (search-as-you-type) and longer words tolerate typos. Hits
+    are ranked by inverse document frequency, with title matches counting
+    triple, then by showtime.
+
+    `version` is the catalog cache version the index reflects. Writes in
+    this process apply incrementally; if another worker changed the catalog,
+    the version drifts and the index is rebuilt in the background.
+    """
+
+    def __init__(self, max_expansions: int = SEARCH_MAX_EXPANSIONS):
+        self.max_expansions = max_expansions
+        self.version = 0
+        self._lock = threading.RLock()
+        self._rebuilding = False
+        # While adding many movies at once the vocabulary is sorted once at
+        # the end instead of kept sorted on every new term
+        self._batch = False
+        self._stats = {"queries": 0, "rebuilds": 0}
+        self._reset()
+
+    def _reset(self):
+        self._docs: dict[int, tuple[str, datetime]] = {}
+        self._doc_terms: dict[int, tuple[frozenset, frozenset]] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._vocabulary: list[str] = []
+        self._title_df: dict[str, int] = {}
+        self._grams: dict[str, set[str]] = {}
+
+    # ---------------------------------------------------------------- updates
+
+    def _add_term(self, term: str, movie_id: int):
+        ids = self._postings.get(term)
+        if ids is None:
+            ids = self._postings[term] = set()
+            if not self._batch:
+                self._vocabulary.insert(bisect_left(self._vocabulary, term), term)
+        ids.add(movie_id)
+
+    def _remove_term(self, term: str, movie_id: int):
+        ids = self._postings[term]
+        ids.discard(movie_id)
+        if not ids:
+            del self._postings[term]
+            if not self._batch:
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+
+    def _add_title_term(self, term: str):
+        count = self._title_df.get(term, 0)
+        self._title_df[term] = count + 1
+        if not count:
+            for gram in trigrams(term):
+                self._grams.setdefault(gram, set()).add(term)
+
+    def _remove_title_term(self, term: str):
+        count = self._title_df[term] - 1
+        if count:
+            self._title_df[term] = count
+            return
+        del self._title_df[term]
+        for gram in trigrams(term):
+            terms = self._grams[gram]
+            terms.discard(term)
+            if not terms:
+                del self._grams[gram]
+
+    def _add(self, movie_id: int, title: str, description: str, showtime):
+        title_terms = frozenset(tokenize(title))
+        other_terms = frozenset(tokenize(description)) - title_terms
+        self._docs[movie_id] = (title, showtime)
+        self._doc_terms[movie_id] = (title_terms, other_terms)
+        for term in title_terms:
+            self._add_term(term, movie_id)
+            self._add_title_term(term)
+        for term in other_terms:
+            self._add_term(term, movie_id)
+
+    def _remove(self, movie_id: int):
+        terms = self._doc_terms.pop(movie_id, None)
+        if terms is None:
+            return
+        del self._docs[movie_id]
+        title_terms, other_terms = terms
+        for term in title_terms:
+            self._remove_term(term, movie_id)
+            self._remove_title_term(term)
+        for term in other_terms:
+            self._remove_term(term, movie_id)
+
+    def _advance(self, version: int | None):
+        # Only a write that directly follows the indexed version keeps the
+        # index in step; a gap means another worker wrote in between
+        if version is not None and version == self.version + 1:
+            self.version = version
+
+    def upsert(self, movie: Movie, version: int | None = None):
+        with self._lock:
+            self._remove(movie.id)
+            self._add(movie.id, movie.title, movie.description, movie.showtime)
+            self._advance(version)
+
+    def remove(self, movie_id: int, version: int | None = None):
+        with self._lock:
+            self._remove(movie_id)
+            self._advance(version)
+
+    def _add_many(self, rows):
+        self._batch = True
+        try:
+            for row in rows:
+                self._remove(row[0])
+                self._add(*row)
+        finally:
+            self._batch = False
+            self._vocabulary = sorted(self._postings)
+
+    def refresh(self, db: Session, movie_ids: list[int], version: int | None = None):
+        """Re-read `movie_ids` from the database, e.g. after a bulk import."""
+        rows = []
+        for start in range(0, len(movie_ids), LOAD_BATCH_SIZE):
+            chunk = movie_ids[start : start + LOAD_BATCH_SIZE]
+            rows += db.execute(
+                select(Movie.id, Movie.title, Movie.description, Movie.showtime).where(
+                    Movie.id.in_(chunk)
+                )
+            ).all()
+        with self._lock:
+            self._add_many(rows)
+            self._advance(version)
+
+    def load(self, db: Session, version: int):
+        """Replace the whole index with the movies currently in the database.
+
+        The new index is built on the side, so searches keep being served
+        from the old one until it is swapped in.
+        """
+        fresh = MovieSearchIndex(self.max_expansions)
+        rows = db.execute(
+            select(Movie.id, Movie.title, Movie.description, Movie.showtime)
+        )
+        fresh._add_many(rows.yield_per(LOAD_BATCH_SIZE))
+        with self._lock:
+            for name in (
+                "_docs",
+                "_doc_terms",
+                "_postings",
+                "_vocabulary",
+                "_title_df",
+                "_grams",
+            ):
+                setattr(self, name, getattr(fresh, name))
+            self.version = version
+            self._stats["rebuilds"] += 1
+
+    def clear(self, version: int = 0):
+        with self._lock:
+            self._reset()
+            self.version = version
+
+    def ensure_fresh(self, version: int, session_factory):
+        """Rebuild in the background if the catalog moved on without us.
+
+        Searches keep using the current index until the rebuild finishes.
+        """
+        with self._lock:
+            if version == self.version or self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def rebuild():
+            try:
+                with session_factory() as db:
+                    self.load(db, version)
+            finally:
+                self._rebuilding = False
+
+        thread = threading.Thread(target=rebuild, name="search-rebuild", daemon=True)
+        thread.start()
+
+    # ---------------------------------------------------------------- queries
+
+    def _idf(self, term: str) -> float:
+        return math.log(1 + len(self._docs) / len(self._postings[term]))
+
+    def _prefix_terms(self, token: str) -> list[str]:
+        start = bisect_left(self._vocabulary, token)
+        terms = []
+        for term in self._vocabulary[start : start + self.max_expansions + 1]:
+            if not term.startswith(token):
+                break
+            if term != token:
+                terms.append(term)
+        return terms
+
+    def _fuzzy_terms(self, token: str) -> list[tuple[str, int]]:
+        limit = 2 if len(token) >= 8 else 1
+        grams = trigrams(token)
+        shared: dict[str, int] = {}
+        for gram in grams:
+            for term in self._grams.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        # Each edit destroys at most four trigrams (a swap of two letters)
+        needed = len(grams) - 4 * limit
+        matches = []
+        for term, count in shared.items():
+            if count < needed or abs(len(term) - len(token)) > limit:
+                continue
+            distance = edit_distance(token, term, limit)
+            if distance <= limit:
+                matches.append((term, distance))
+        matches.sort(key=lambda match: (match[1], -self._title_df[match[0]]))
+        return matches[: self.max_expansions]
+
+    def _expand(self, token: str, is_last: bool) -> list[tuple[str, float]]:
+        """Index terms a query word matches, each with its match factor."""
+        expansions = []
+        if token in self._postings:
+            expansions.append((token, 1.0))
+        if is_last and len(token) >= MIN_PREFIX_LENGTH:
+            expansions += [(term, PREFIX_FACTOR) for term in self._prefix_terms(token)]
+        if not expansions and len(token) >= MIN_FUZZY_LENGTH:
+            expansions = [
+                (term, TYPO_FACTORS[distance])
+                for term, distance in self._fuzzy_terms(token)
+            ]
+        return expansions
+
+    def _score_token(self, token: str, is_last: bool) -> dict[int, float]:
+        scores: dict[int, float] = {}
+        for term, factor in self._expand(token, is_last):
+            base = factor * self._idf(term)
+            title_score = base * TITLE_WEIGHT
+            in_title = term in self._title_df
+            for movie_id in self._postings[term]:
+                score = (
+                    title_score
+                    if in_title and term in self._doc_terms[movie_id][0]
+                    else base
+                )
+                if score > scores.get(movie_id, 0.0):
+                    scores[movie_id] = score
+        return scores
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            self._stats["queries"] += 1
+            if not tokens:
+                return []
+            per_token = [
+                self._score_token(token, i == len(tokens) - 1)
+                for i, token in enumerate(tokens)
+            ]
+            per_token.sort(key=len)
+            totals = per_token[0]
+            for scores in per_token[1:]:
+                totals = {
+                    movie_id: total + scores[movie_id]
+                    for movie_id, total in totals.items()
+                    if movie_id in scores
+                }
+                if not totals:
+                    return []
+            best = heapq.nsmallest(
+                limit,
+                totals.items(),
+                key=lambda item: (
+                    -item[1],
+                    self._docs[item[0]][1] or datetime.max,
+                    item[0],
+                ),
+            )
+            return [
+                {
+                    "id": movie_id,
+                    "title": self._docs[movie_id][0],
+                    "showtime": self._docs[movie_id][1],
+                    "score": round(score, 4),
+                }
+                for movie_id, score in best
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "movies": len(self._docs),
+                "terms": len(self._postings),
+                "version": self.version,
+                "rebuilding": self._rebuilding,
+            }
+
+
+search_index = MovieSearchIndex()
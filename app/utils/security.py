@@ -1,11 +1,11 @@
 from fastapi import status, Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from datetime import timedelta, datetime
-from jose import jwt, JWTError
+from datetime import timedelta, datetime, timezone
 from app.models.user import User
 from typing import Annotated
 from passlib.context import CryptContext
-from app.config import SECRET_KEY, ALGORITHM
+from app.utils.hashing import hash_pool
+from app.utils.tokens import TokenError, jwt_backend, token_cache
 
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl='auth/login')
 bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
@@ -20,25 +20,29 @@ def verify_hash(currentPassword, hashedPassword):
     else:
         return True
 
-def authenticate_user(username:str, password:str, db):
-    print(SECRET_KEY, " ", ALGORITHM)
+async def create_hash_async(currentPassword):
+    return await hash_pool.run(create_hash, currentPassword)
+
+async def verify_hash_async(currentPassword, hashedPassword):
+    return await hash_pool.run(verify_hash, currentPassword, hashedPassword)
+
+async def authenticate_user(username:str, password:str, db):
     user = db.query(User).filter(User.username==username).first()
     if not user:
         return False
-    if (verify_hash(password,user.hashed_password)==False):
+    if (await verify_hash_async(password,user.hashed_password)==False):
         return False
     return user
 
 def create_access_token(username:str, user_id, is_admin, expires_delta:timedelta):
     encode = {'sub' : username, 'id':user_id, "is_admin": is_admin}
-    expires = datetime.utcnow() + expires_delta
-    encode.update({'exp':expires}) 
-    print(f"Using ALGORITHM: {ALGORITHM}")
-    return jwt.encode(encode, SECRET_KEY, algorithm=ALGORITHM)
+    now = datetime.now(timezone.utc)
+    encode.update({'iat': now.timestamp(), 'exp': int((now + expires_delta).timestamp())})
+    return jwt_backend.encode(encode)
 
 async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=ALGORITHM)
+        payload = await token_cache.decode_async(token)
         username  = payload.get('sub')
         user_id = payload.get('id') 
         is_admin = payload.get("is_admin")
@@ -46,5 +50,5 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user.')
         
         return {'username': username,  'id': user_id, "is_admin": is_admin}
-    except JWTError:
+    except TokenError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user.')
\ No newline at end of file
@@ -0,0 +1,287 @@
+"""Shared-state backends for caches, idempotency keys, rate limits and the feed.
+
+Every backend implements the small subset of the Redis API the app needs
+(get, set with `ex` and `nx`, delete, incr), so a real Redis client can stand in for
+any of them. The local backends also offer `update`, an atomic
+read-modify-write used where Redis would run a Lua script.
+
+- `InMemoryLRUBackend` keeps state in this process only (the default).
+- `SQLiteStateBackend` keeps it in one SQLite file that every worker on the
+  host opens, so N uvicorn workers share caches, limits and feed events
+  without a Redis server. Tests use it to run two "workers" side by side.
+- Redis (STATE_BACKEND=redis, the default when REDIS_URL is set) shares it
+  across hosts.
+
+The shared backends do network or disk I/O, so async code calls them
+through `offload`, which keeps that off the event loop.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from app.config import REDIS_URL, STATE_BACKEND, STATE_SQLITE_PATH
+
+
+class InMemoryLRUBackend:
+    """Process-local backend with LRU eviction and per-key TTLs.
+
+    Counters live outside the LRU so they are never evicted. With
+    `max_entries=None` nothing is evicted before it expires, for state that
+    must not be forgotten early; expired entries are then purged every
+    PURGE_EVERY writes instead.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, max_entries: Optional[int] = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[bytes, Optional[float]]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: bytes, ex: Optional[float]):
+        expires_at = time.monotonic() + ex if ex else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        if self.max_entries is None:
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._purge_expired()
+            return
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for key in [
+            key
+            for key, (_, expires_at) in self._entries.items()
+            if expires_at is not None and expires_at <= now
+        ]:
+            del self._entries[key]
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key in self._counters:
+                return str(self._counters[key]).encode()
+            return self._get(key)
+
+    def set(
+        self, key: str, value: bytes, ex: Optional[float] = None, nx: bool = False
+    ) -> Optional[bool]:
+        """Store `value`; with `nx`, only if `key` is absent (None if it was not)."""
+        with self._lock:
+            if nx and self._get(key) is not None:
+                return None
+            self._set(key, value, ex)
+            return True
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._counters.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def update(
+        self,
+        key: str,
+        change: Callable[[Optional[bytes]], bytes],
+        ex: Optional[float] = None,
+    ) -> bytes:
+        """Store `change(current value)` atomically; returns the new value."""
+        with self._lock:
+            value = change(self._get(key))
+            self._set(key, value, ex)
+            return value
+
+    def close(self):
+        pass
+
+
+class SQLiteStateBackend:
+    """State in a SQLite file shared by every process that opens it.
+
+    Each thread gets its own connection in autocommit WAL mode, so reads
+    never wait on writers. `incr` and `update` run in `BEGIN IMMEDIATE`
+    transactions, which serialize read-modify-writes across processes.
+    Expiry uses wall-clock time, the only clock processes agree on; expired
+    rows are hidden on read and purged every PURGE_EVERY writes.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @staticmethod
+    def _expires_at(ex: Optional[float]) -> Optional[float]:
+        return time.time() + ex if ex else None
+
+    def _read(self, connection, key: str) -> Optional[bytes]:
+        row = connection.execute(
+            "SELECT value FROM state WHERE key = ? "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _write(self, connection, key: str, value: bytes, ex: Optional[float]):
+        connection.execute(
+            "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, self._expires_at(ex)),
+        )
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.PURGE_EVERY == 0
+        if purge:
+            connection.execute(
+                "DELETE FROM state WHERE expires_at <= ?", (time.time(),)
+            )
+
+    def _atomic(self, key: str, change: Callable, ex: Optional[float]) -> bytes:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            value = change(self._read(connection, key))
+            self._write(connection, key, value, ex)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._read(self._connection(), key)
+
+    def set(
+        self, key: str, value: bytes, ex: Optional[float] = None, nx: bool = False
+    ) -> Optional[bool]:
+        """Store `value`; with `nx`, only if `key` is absent (None if it was not)."""
+        if not nx:
+            self._write(self._connection(), key, value, ex)
+            return True
+        # One statement, so two processes cannot both claim the key
+        inserted = self._connection().execute(
+            "INSERT INTO state (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+            "expires_at = excluded.expires_at "
+            "WHERE state.expires_at IS NOT NULL AND state.expires_at <= ?",
+            (key, value, self._expires_at(ex), time.time()),
+        ).rowcount
+        return True if inserted else None
+
+    def delete(self, *keys: str):
+        self._connection().executemany(
+            "DELETE FROM state WHERE key = ?", [(key,) for key in keys]
+        )
+
+    def incr(self, key: str) -> int:
+        return int(self._atomic(key, lambda value: b"%d" % (int(value or 0) + 1), None))
+
+    def update(
+        self,
+        key: str,
+        change: Callable[[Optional[bytes]], bytes],
+        ex: Optional[float] = None,
+    ) -> bytes:
+        """Store `change(current value)` atomically; returns the new value."""
+        return self._atomic(key, change, ex)
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+def backend_name() -> str:
+    """The configured backend: STATE_BACKEND, else redis when REDIS_URL is set."""
+    return STATE_BACKEND or ("redis" if REDIS_URL else "memory")
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def make_state_backend(max_entries: Optional[int] = 1024):
+    """A backend of the configured kind.
+
+    In-memory backends are separate LRUs of `max_entries` each (unbounded
+    but for TTLs with None). Redis
+    (requires the `redis` package) and SQLite are one shared client whose
+    keys are namespaced by their users and bounded by TTLs.
+    """
+    global _shared
+    name = backend_name()
+    if name == "memory":
+        return InMemoryLRUBackend(max_entries)
+    with _shared_lock:
+        if _shared is None:
+            if name == "redis":
+                import redis
+
+                _shared = redis.Redis.from_url(REDIS_URL)
+            else:
+                _shared = SQLiteStateBackend(STATE_SQLITE_PATH)
+        return _shared
+
+
+def close_state_backend():
+    """Close the shared backend's connections at shutdown; they reopen on
+    next use."""
+    if _shared is not None:
+        _shared.close()
+
+
+async def offload(backend, function: Callable, *args):
+    """Run `function(*args)`, which calls `backend`, in a worker thread
+    unless the backend is process-local and never blocks."""
+    if isinstance(backend, InMemoryLRUBackend):
+        return function(*args)
+    return await asyncio.to_thread(function, *args)
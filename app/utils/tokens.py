@@ -0,0 +1,174 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    ALGORITHM,
+    JWT_BACKEND,
+    SECRET_KEY,
+    TOKEN_CACHE_SIZE,
+)
+from app.utils.state import make_state_backend, offload
+
+
+class TokenError(Exception):
+    """Raised when a token is malformed, expired, badly signed or revoked."""
+
+
+class JoseBackend:
+    def __init__(self, secret: str, algorithm: str):
+        from jose import jwt
+
+        self._jwt = jwt
+        self.secret = secret
+        self.algorithm = algorithm
+
+    def encode(self, claims: dict) -> str:
+        return self._jwt.encode(claims, self.secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        from jose import JWTError
+
+        try:
+            return self._jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        except JWTError as error:
+            raise TokenError(str(error)) from error
+
+
+class PyJWTBackend:
+    """Backend for the `PyJWT` package, which has a faster C-backed path."""
+
+    def __init__(self, secret: str, algorithm: str):
+        import jwt
+
+        self._jwt = jwt
+        self.secret = secret
+        self.algorithm = algorithm
+
+    def encode(self, claims: dict) -> str:
+        return self._jwt.encode(claims, self.secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        except self._jwt.PyJWTError as error:
+            raise TokenError(str(error)) from error
+
+
+JWT_BACKENDS = {"jose": JoseBackend, "pyjwt": PyJWTBackend}
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """Bounded LRU of verified claims, keyed by token hash and kept until `exp`.
+
+    Also tracks revocations: individual tokens (logout) are denied until they
+    expire, and a per-user cutoff rejects every token issued before it (role
+    change, password reset). Revocations live in the shared-state backend so
+    every worker honours them, and they are checked on cache hits too; only
+    the decoded claims are cached per process. In memory they are kept until
+    they expire, never evicted early. Async callers use `decode_async`,
+    which keeps the lookups off the event loop.
+    """
+
+    DENIED_PREFIX = "token:denied:"
+    CUTOFF_PREFIX = "token:cutoff:"
+
+    def __init__(self, backend, max_entries: int = 10000, state=None):
+        self.backend = backend
+        self.max_entries = max_entries
+        # A revocation forgotten before the token expires would un-revoke it
+        self.state = state or make_state_backend(max_entries=None)
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._revoked_tokens = 0
+        self._revoked_users = 0
+
+    def decode(self, token: str) -> dict:
+        key = token_key(token)
+        if self.state.get(self.DENIED_PREFIX + key) is not None:
+            raise TokenError("Token has been revoked")
+        now = time.time()
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is not None and claims.get("exp", 0) > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                claims = None
+                self._entries.pop(key, None)
+                self._misses += 1
+
+        if claims is None:
+            claims = self.backend.decode(token)
+            with self._lock:
+                self._entries[key] = claims
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if self._revoked_for_user(claims):
+            raise TokenError("Token has been revoked")
+        return claims
+
+    async def decode_async(self, token: str) -> dict:
+        return await offload(self.state, self.decode, token)
+
+    def _revoked_for_user(self, claims: dict) -> bool:
+        cutoff = self.state.get(f"{self.CUTOFF_PREFIX}{claims.get('id')}")
+        return cutoff is not None and claims.get("iat", 0) < float(cutoff)
+
+    def revoke_token(self, token: str):
+        """Deny a single token (e.g. on logout) until it would have expired."""
+        try:
+            claims = self.backend.decode(token)
+        except TokenError:
+            return  # already unusable
+        key = token_key(token)
+        expires_in = claims.get("exp", time.time() + 24 * 3600) - time.time()
+        if expires_in > 0:
+            self.state.set(self.DENIED_PREFIX + key, b"1", ex=expires_in)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._revoked_tokens += 1
+
+    def revoke_user(self, user_id: int):
+        """Reject every token issued to `user_id` before now.
+
+        The cutoff is kept for as long as the tokens it rejects can live.
+        """
+        self.state.set(
+            f"{self.CUTOFF_PREFIX}{user_id}",
+            repr(time.time()).encode(),
+            ex=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        )
+        with self._lock:
+            for key in [k for k, c in self._entries.items() if c.get("id") == user_id]:
+                del self._entries[key]
+            self._revoked_users += 1
+
+    def clear(self):
+        """Forget the claims cached by this process."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "revoked_tokens": self._revoked_tokens,
+                "revoked_users": self._revoked_users,
+            }
+
+
+jwt_backend = JWT_BACKENDS[JWT_BACKEND](SECRET_KEY, ALGORITHM)
+token_cache = TokenCache(jwt_backend, TOKEN_CACHE_SIZE)
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import threading
+from contextlib import suppress
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import WAITLIST_PROMOTE_INTERVAL_SECONDS
+from app.models.booking import Booking
+from app.models.movie import Movie
+from app.models.seat import Seat, SEAT_AVAILABLE
+from app.models.waitlist import (
+    WaitlistEntry,
+    WAITLIST_LEFT,
+    WAITLIST_PROMOTED,
+    WAITLIST_WAITING,
+)
+from app.utils.exceptions import (
+    ALREADY_WAITLISTED_ERROR,
+    BOOKING_ALREADY_EXISTS_ERROR,
+    SEATING_NOT_AVAILABLE_ERROR,
+    SEATS_STILL_AVAILABLE_ERROR,
+)
+from app.utils.feed import notify_availability
+from app.utils.inventory import book_seats, has_waiters
+
+logger = logging.getLogger(__name__)
+
+
+class PromotionQueue:
+    """Shows whose seats were freed since the worker last ran.
+
+    A set, so a burst of cancellations for one show is handled by a single
+    promotion pass.
+    """
+
+    def __init__(self):
+        self._pending: set[int] = set()
+        self._lock = threading.Lock()
+        self.counts = {"joined": 0, "left": 0, "promoted": 0, "passes": 0}
+
+    def request(self, movie_ids):
+        with self._lock:
+            self._pending.update(movie_ids)
+
+    def drain(self) -> list[int]:
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        return sorted(pending)
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counts[name] += amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.counts, "pending_shows": len(self._pending)}
+
+    def __len__(self):
+        return len(self._pending)
+
+
+promotion_queue = PromotionQueue()
+
+
+def available_seats(db: Session, movie_id: int) -> int:
+    return db.execute(
+        select(func.count(Seat.id)).where(
+            Seat.movie_id == movie_id, Seat.status == SEAT_AVAILABLE
+        )
+    ).scalar()
+
+
+def join_waitlist(
+    db: Session, user_id: int, movie: Movie, quantity: int = 1
+) -> WaitlistEntry:
+    """Queue `user_id` for a sold-out show. The caller commits.
+
+    A show with enough free seats and nobody waiting is not sold out, so
+    the user is told to book instead.
+    """
+    if movie.auditorium_id is None:
+        raise SEATING_NOT_AVAILABLE_ERROR
+    booked = db.execute(
+        select(Booking.id).where(
+            Booking.user_id == user_id, Booking.movie_id == movie.id
+        )
+    ).first()
+    if booked:
+        raise BOOKING_ALREADY_EXISTS_ERROR
+    if available_seats(db, movie.id) >= quantity and not has_waiters(db, movie.id):
+        raise SEATS_STILL_AVAILABLE_ERROR
+
+    entry = WaitlistEntry(
+        user_id=user_id,
+        movie_id=movie.id,
+        quantity=quantity,
+        status=WAITLIST_WAITING,
+        created_at=datetime.utcnow(),
+    )
+    db.add(entry)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise ALREADY_WAITLISTED_ERROR
+    promotion_queue.incr("joined")
+    return entry
+
+
+def latest_entry(db: Session, user_id: int, movie_id: int) -> WaitlistEntry | None:
+    """The user's most recent entry for a show, waiting or not."""
+    return db.execute(
+        select(WaitlistEntry)
+        .where(WaitlistEntry.user_id == user_id, WaitlistEntry.movie_id == movie_id)
+        .order_by(WaitlistEntry.id.desc())
+        .limit(1)
+    ).scalar()
+
+
+def waitlist_position(db: Session, entry: WaitlistEntry) -> int | None:
+    """1-based place in the queue, counted over the (movie, status, id) index."""
+    if entry.status != WAITLIST_WAITING:
+        return None
+    return db.execute(
+        select(func.count(WaitlistEntry.id)).where(
+            WaitlistEntry.movie_id == entry.movie_id,
+            WaitlistEntry.status == WAITLIST_WAITING,
+            WaitlistEntry.id <= entry.id,
+        )
+    ).scalar()
+
+
+def leave_waitlist(db: Session, entry: WaitlistEntry) -> bool:
+    """Drop a waiting entry; False if it was already promoted. The caller commits."""
+    left = (
+        db.query(WaitlistEntry)
+        .filter(WaitlistEntry.id == entry.id, WaitlistEntry.status == WAITLIST_WAITING)
+        .update({WaitlistEntry.status: WAITLIST_LEFT}, synchronize_session=False)
+    )
+    if left:
+        promotion_queue.incr("left")
+    return bool(left)
+
+
+def _set_status(db: Session, entry_id: int, old: str, values: dict) -> bool:
+    return bool(
+        db.query(WaitlistEntry)
+        .filter(WaitlistEntry.id == entry_id, WaitlistEntry.status == old)
+        .update(values, synchronize_session=False)
+    )
+
+
+def promote_waitlist(db: Session, movie_id: int) -> int:
+    """Book freed seats for the head of a show's queue, in FIFO order.
+
+    Stops at the first user whose party no longer fits, so nobody is
+    overtaken; direct bookings and holds are refused while anyone waits,
+    so freed seats stay with the queue. Each promotion commits on its own,
+    so one failure never undoes another.
+    """
+    movie = db.get(Movie, movie_id)
+    if movie is None or movie.auditorium_id is None:
+        return 0
+    available = available_seats(db, movie_id)
+    # Every party needs at least one seat, so at most `available` can fit
+    heads = db.execute(
+        select(WaitlistEntry.id, WaitlistEntry.user_id, WaitlistEntry.quantity)
+        .where(
+            WaitlistEntry.movie_id == movie_id,
+            WaitlistEntry.status == WAITLIST_WAITING,
+        )
+        .order_by(WaitlistEntry.id)
+        .limit(available)
+    ).all()
+
+    promoted = 0
+    for entry_id, user_id, quantity in heads:
+        if quantity > available:
+            break
+        # Claim the entry first so a user leaving concurrently isn't booked
+        if not _set_status(
+            db, entry_id, WAITLIST_WAITING, {WaitlistEntry.status: WAITLIST_PROMOTED}
+        ):
+            continue
+        try:
+            booking, seats = book_seats(
+                db, user_id, movie, quantity=quantity, from_waitlist=True
+            )
+        except HTTPException as error:
+            # Put the entry back at the head of the queue ourselves rather
+            # than rely on how book_seats cleaned up after itself
+            db.rollback()
+            _set_status(
+                db,
+                entry_id,
+                WAITLIST_PROMOTED,
+                {WaitlistEntry.status: WAITLIST_WAITING},
+            )
+            if error is not BOOKING_ALREADY_EXISTS_ERROR:
+                # Seats went to a direct booking meanwhile; look again on the
+                # next pass, since no cancellation may come to requeue the show
+                db.commit()
+                request_promotion([movie_id])
+                break
+            # Booked the show directly in the meantime; nothing to promote
+            _set_status(
+                db, entry_id, WAITLIST_WAITING, {WaitlistEntry.status: WAITLIST_LEFT}
+            )
+            db.commit()
+            continue
+        _set_status(
+            db, entry_id, WAITLIST_PROMOTED, {WaitlistEntry.booking_id: booking.id}
+        )
+        db.commit()
+        logger.info(
+            "Promoted waitlist entry %s: user %s booked %s for movie %s",
+            entry_id,
+            user_id,
+            ", ".join(seats),
+            movie_id,
+        )
+        available -= quantity
+        promoted += 1
+
+    if promoted:
+        promotion_queue.incr("promoted", promoted)
+        notify_availability(db, [movie_id])
+    return promoted
+
+
+def request_promotion(movie_ids):
+    """Ask the worker to fill freed seats from these shows' waitlists."""
+    promotion_queue.request(movie_ids)
+
+
+def load_waitlists(db: Session):
+    """Queue every show with waiting users, e.g. after a restart."""
+    request_promotion(
+        db.execute(
+            select(WaitlistEntry.movie_id)
+            .where(WaitlistEntry.status == WAITLIST_WAITING)
+            .distinct()
+        ).scalars()
+    )
+
+
+def promote_pending(session_factory) -> int:
+    """One worker pass over every show whose seats were freed since the last."""
+    movie_ids = promotion_queue.drain()
+    if not movie_ids:
+        return 0
+    total = 0
+    done = 0
+    try:
+        with session_factory() as db:
+            for movie_id in movie_ids:
+                total += promote_waitlist(db, movie_id)
+                done += 1
+    except Exception:
+        # Shows this pass did not finish are retried by the next one
+        request_promotion(movie_ids[done:])
+        raise
+    promotion_queue.incr("passes")
+    return total
+
+
+async def run_waitlist_worker(session_factory, stopping: asyncio.Event):
+    """Background task that promotes waiting users off the event loop.
+
+    Returns once `stopping` is set, never in the middle of a pass.
+    """
+    while True:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stopping.wait(), WAITLIST_PROMOTE_INTERVAL_SECONDS)
+        if stopping.is_set():
+            return
+        if not promotion_queue:
+            continue
+        try:
+            await asyncio.to_thread(promote_pending, session_factory)
+        except Exception:
+            logger.exception("Waitlist promotion failed")
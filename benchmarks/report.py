@@ -0,0 +1,71 @@
+import json
+import math
+
+# Relative change tolerated before a metric counts as a regression
+DEFAULT_TOLERANCE = 0.2
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Latencies in seconds in; milliseconds and requests per second out."""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE):
+    """List regressions of p95 latency or throughput against a baseline run."""
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (
+            1 + tolerance
+        ):
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms"
+            )
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {previous['rps']} -> {current['rps']}")
+        if current["errors"] > previous["errors"]:
+            regressions.append(
+                f"{name}: errors {previous['errors']} -> {current['errors']}"
+            )
+    return regressions
+
+
+def format_table(results: dict) -> str:
+    header = f"{'scenario':<16}{'requests':>10}{'errors':>8}{'rps':>10}"
+    header += f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    lines = [header]
+    for name, row in results["results"].items():
+        lines.append(
+            f"{name:<16}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def load(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def save(results: dict, path: str):
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
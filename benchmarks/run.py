@@ -0,0 +1,232 @@
+"""Load-test the hot endpoints in-process over ASGI with concurrent clients.
+
+    python -m benchmarks.run --scale full --concurrency 32 --requests 2000 \\
+        --output results.json --baseline benchmarks/baseline.json
+
+The database is seeded on first use and reused afterwards (`--reseed` starts
+over); the bookings a run makes are removed when it ends, so every run books
+the same free movies. Exits with status 1 when a result regresses against
+the baseline.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+SCENARIOS = ("login", "catalog", "book", "admin_bookings")
+
+
+def build_scenarios(scale, requests: int, rng: random.Random) -> dict:
+    """Request factories per scenario: `index -> (method, url, kwargs)`."""
+    from app.utils.security import create_access_token
+    from benchmarks.seed import BENCH_PASSWORD
+
+    def bearer(user_id: int, is_admin: bool = False) -> dict:
+        token = create_access_token(
+            f"user{user_id}", user_id, is_admin, timedelta(hours=1)
+        )
+        return {"Authorization": f"Bearer {token}"}
+
+    admin = bearer(1, is_admin=True)
+    reader = bearer(2)
+    first_day = datetime(2030, 1, 1)
+    days = max(1, scale.movies * 15 // (60 * 24))
+    # Tokens are minted up front so the timed loop only measures the server
+    bookers = [
+        bearer(user_id) for user_id in range(2, min(requests, scale.users - 1) + 2)
+    ]
+
+    def login(index):
+        user_id = rng.randint(2, scale.users)
+        form = {"username": f"user{user_id}", "password": BENCH_PASSWORD}
+        return "POST", "/auth/login", {"data": form}
+
+    def catalog(index):
+        # Mostly the front page, with a spread of date filters that miss the cache
+        params = {"limit": 50}
+        if rng.random() < 0.2:
+            day = first_day + timedelta(days=rng.randrange(days))
+            params.update(showtime_from=day.isoformat(), sort="showtime")
+        return "GET", "/movies", {"params": params, "headers": reader}
+
+    def book(index):
+        user_id = index + 2
+        movie_id = scale.free_movie_id(user_id)
+        return (
+            "POST",
+            f"/movies/{movie_id}/book",
+            {"json": {"movie_id": movie_id}, "headers": bookers[index]},
+        )
+
+    def admin_bookings(index):
+        if rng.random() < 0.5:
+            params = {"user_id": rng.randint(1, scale.users)}
+        else:
+            params = {"movie_id": rng.randint(1, scale.movies), "limit": 100}
+        return "GET", "/admin/bookings", {"params": params, "headers": admin}
+
+    return {
+        "login": (login, requests),
+        "catalog": (catalog, requests),
+        "book": (book, len(bookers)),
+        "admin_bookings": (admin_bookings, requests),
+    }
+
+
+async def run_scenario(client, build, total: int, concurrency: int) -> dict:
+    from benchmarks.report import summarize
+
+    counter = itertools.count()
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while (index := next(counter)) < total:
+            method, url, kwargs = build(index)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_benchmarks(
+    app,
+    scale,
+    requests: int,
+    concurrency: int,
+    scenarios=SCENARIOS,
+    seed: int = 0,
+) -> dict:
+    """Run each scenario in turn against `app`, whose database is seeded."""
+    import httpx
+
+    factories = build_scenarios(scale, requests, random.Random(seed))
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for name in scenarios:
+            build, total = factories[name]
+            results[name] = await run_scenario(client, build, total, concurrency)
+    return results
+
+
+def parse_args(argv=None):
+    from benchmarks.seed import SCALES
+    from benchmarks.report import DEFAULT_TOLERANCE
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--db", default="bench.db", help="SQLite file to seed and use")
+    parser.add_argument("--scale", choices=SCALES, default="full")
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--requests", type=int, default=2000, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    parser.add_argument("--output", help="write JSON results here")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.reseed:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    # Configuration is read at import time, so point the app at the benchmark
+    # database before importing it
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{args.db}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    # Every simulated client shares one address, which the login throttle
+    # would otherwise treat as a single brute-forcing host
+    os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+
+    from app.config import DATABASE_MODE
+    from app.database import engine
+    from app.main import app
+    from app.migrations import run_migrations
+    from app.models.user import User
+    from benchmarks import report
+    from benchmarks.seed import (
+        SCALES,
+        last_booking_id,
+        remove_bookings_after,
+        seed_database,
+    )
+    from sqlalchemy import func, select
+
+    scale = SCALES[args.scale]
+    run_migrations(engine)
+    with engine.connect() as conn:
+        seeded = conn.execute(select(func.count(User.id))).scalar()
+    if not seeded:
+        print(f"Seeding {args.db}: {scale}", file=sys.stderr)
+        started = time.perf_counter()
+        seed_database(engine, scale)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            return await run_benchmarks(
+                app,
+                scale,
+                args.requests,
+                args.concurrency,
+                args.scenario or SCENARIOS,
+            )
+
+    seeded_bookings = last_booking_id(engine)
+    try:
+        measured = asyncio.run(run())
+    finally:
+        # Otherwise the next run's bookings would all be duplicates
+        removed = remove_bookings_after(engine, seeded_bookings)
+        print(f"Removed {removed} bookings made by this run", file=sys.stderr)
+
+    results = {
+        "meta": {
+            "scale": args.scale,
+            "users": scale.users,
+            "movies": scale.movies,
+            "bookings": scale.bookings,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "database_mode": DATABASE_MODE,
+            "python": platform.python_version(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": measured,
+    }
+    print(report.format_table(results))
+    if args.output:
+        report.save(results, args.output)
+
+    if args.baseline:
+        regressions = report.compare(
+            results, report.load(args.baseline), args.tolerance
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Seed a benchmark database with realistic data volumes.
+
+Every user books `bookings_per_user` movies spaced `stride` apart, so the
+movie `bookings_per_user * stride` further on is guaranteed to still be free
+for that user; the booking scenario relies on that to never hit duplicates.
+A run's bookings are removed afterwards with `remove_bookings_after`, so the
+next run against the same database finds those movies free again.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+BENCH_PASSWORD = "benchmark-password"
+INSERT_CHUNK_SIZE = 50_000
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    movies: int
+    bookings_per_user: int
+
+    @property
+    def bookings(self) -> int:
+        return self.users * self.bookings_per_user
+
+    @property
+    def stride(self) -> int:
+        return max(1, self.movies // (self.bookings_per_user + 1))
+
+    def free_movie_id(self, user_id: int) -> int:
+        """A movie `user_id` has not booked yet."""
+        return (user_id + self.bookings_per_user * self.stride) % self.movies + 1
+
+
+SCALES = {
+    "full": Scale(users=100_000, movies=10_000, bookings_per_user=10),
+    "medium": Scale(users=10_000, movies=1_000, bookings_per_user=10),
+    "small": Scale(users=200, movies=50, bookings_per_user=3),
+}
+
+
+def _insert_chunked(conn, table, rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == INSERT_CHUNK_SIZE:
+            conn.execute(insert(table), chunk)
+            chunk = []
+    if chunk:
+        conn.execute(insert(table), chunk)
+
+
+def seed_database(engine, scale: Scale):
+    """Fill an empty, migrated database. User 1 is an admin; ids start at 1."""
+    # Imported here because app settings are read at import time and the
+    # runner only points them at the benchmark database after parsing args
+    from app.models.booking import Booking
+    from app.models.movie import Movie
+    from app.models.user import User
+    from app.utils.analytics import reconcile_occupancy
+    from app.utils.security import create_hash
+
+    # bcrypt is deliberately slow, so every user shares one precomputed hash
+    hashed_password = create_hash(BENCH_PASSWORD)
+    start = datetime(2030, 1, 1, 10, 0)
+    with engine.begin() as conn:
+        _insert_chunked(
+            conn,
+            User,
+            (
+                {
+                    "username": f"user{i}",
+                    "hashed_password": hashed_password,
+                    "is_admin": i == 1,
+                }
+                for i in range(1, scale.users + 1)
+            ),
+        )
+        _insert_chunked(
+            conn,
+            Movie,
+            (
+                {
+                    "title": f"Movie {i}",
+                    "description": f"Benchmark movie number {i}",
+                    "showtime": start + timedelta(minutes=15 * i),
+                }
+                for i in range(1, scale.movies + 1)
+            ),
+        )
+        _insert_chunked(
+            conn,
+            Booking,
+            (
+                {
+                    "user_id": user_id,
+                    "movie_id": (user_id + j * scale.stride) % scale.movies + 1,
+                }
+                for user_id in range(1, scale.users + 1)
+                for j in range(scale.bookings_per_user)
+            ),
+        )
+        # Bookings are inserted directly, so count them once at the end
+        reconcile_occupancy(conn)
+
+
+def last_booking_id(engine) -> int:
+    from app.models.booking import Booking
+
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(Booking.id))).scalar() or 0
+
+
+def remove_bookings_after(engine, booking_id: int) -> int:
+    """Cancel every booking newer than `booking_id`, as a user would, so the
+    occupancy counters follow. Returns how many were removed."""
+    from sqlalchemy.orm import Session
+
+    from app.models.booking import Booking
+    from app.utils.batch import cancel_batch
+
+    with Session(engine) as db:
+        items = [
+            {"user_id": user_id, "movie_id": movie_id}
+            for user_id, movie_id in db.execute(
+                select(Booking.user_id, Booking.movie_id).where(Booking.id > booking_id)
+            )
+        ]
+        if items:
+            cancel_batch(db, items)
+            db.commit()
+    return len(items)
@@ -0,0 +1,144 @@
+"""Compare listing serialization before and after the fast path, in rows per second.
+
+    python -m benchmarks.serialization --rows 10000 --repeat 20
+
+"Before" replays what the listing endpoints used to do with a page of rows:
+per-row response model validation, or `strftime` plus FastAPI's
+`jsonable_encoder` and `json.dumps`. "After" encodes the same rows with each
+of the JSON_ENCODERS. No database is involved, so only serialization is
+measured.
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+
+def sample_rows(count: int) -> dict:
+    """A page of rows per listing, shaped as `paginate` returns them."""
+    start = datetime(2030, 1, 1, 10, 0)
+    movies = [
+        {
+            "id": i,
+            "title": f"Movie {i}",
+            "description": f"Benchmark movie number {i}",
+            "showtime": start + timedelta(minutes=15 * i),
+        }
+        for i in range(1, count + 1)
+    ]
+    bookings = [{"user_id": i, "movie_id": i % 997 + 1} for i in range(1, count + 1)]
+    return {"movies": movies, "bookings": bookings}
+
+
+def before_paths() -> dict:
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+
+    from app.schemas.bookingSchema import ViewAllMovies, ViewBooking
+
+    movie_adapter = TypeAdapter(List[ViewAllMovies])
+    booking_adapter = TypeAdapter(List[ViewBooking])
+
+    def render(content) -> bytes:
+        # JSONResponse.render
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode()
+
+    def user_movies(rows):
+        return movie_adapter.dump_json(
+            movie_adapter.validate_python(rows), exclude_unset=True
+        )
+
+    def admin_movies(rows):
+        rows = [dict(row) for row in rows]
+        for row in rows:
+            row["showtime"] = row["showtime"].strftime("%Y-%m-%d %H:%M:%S")
+        return render(jsonable_encoder(rows))
+
+    def admin_bookings(rows):
+        validated = booking_adapter.validate_python(rows)
+        return render(
+            booking_adapter.dump_python(validated, mode="json", exclude_unset=True)
+        )
+
+    return {
+        "user_movies": user_movies,
+        "admin_movies": admin_movies,
+        "admin_bookings": admin_bookings,
+    }
+
+
+def after_paths(encoder) -> dict:
+    from app.utils.serialization import seconds_datetime
+
+    return {
+        "user_movies": encoder.dumps,
+        "admin_movies": lambda rows: encoder.dumps(rows, seconds_datetime),
+        "admin_bookings": encoder.dumps,
+    }
+
+
+LISTINGS = {
+    "user_movies": "movies",
+    "admin_movies": "movies",
+    "admin_bookings": "bookings",
+}
+
+
+def rows_per_second(encode, rows: list, repeat: int) -> float:
+    encode(rows)  # warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encode(rows)
+    return round(len(rows) * repeat / (time.perf_counter() - started))
+
+
+def run_serialization_benchmark(rows: int, repeat: int) -> dict:
+    """Rows per second per listing for "before" and each available encoder."""
+    from app.utils.serialization import JSON_ENCODERS
+
+    data = sample_rows(rows)
+    paths = {"before": before_paths()}
+    for name, encoder_class in JSON_ENCODERS.items():
+        try:
+            paths[name] = after_paths(encoder_class())
+        except ImportError:
+            continue  # optional encoder not installed
+
+    results = {}
+    for listing, kind in LISTINGS.items():
+        results[listing] = {
+            variant: rows_per_second(encoders[listing], data[kind], repeat)
+            for variant, encoders in paths.items()
+        }
+    return results
+
+
+def format_table(results: dict) -> str:
+    variants = list(next(iter(results.values())))
+    lines = [f"{'listing':<16}" + "".join(f"{v + ' rows/s':>18}" for v in variants)]
+    for listing, row in results.items():
+        cells = "".join(f"{row[variant]:>18,}" for variant in variants)
+        speedups = ", ".join(
+            f"{variant} x{row[variant] / row['before']:.1f}"
+            for variant in variants[1:]
+        )
+        lines.append(f"{listing:<16}{cells}   ({speedups})")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    print(format_table(run_serialization_benchmark(args.rows, args.repeat)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
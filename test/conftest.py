@@ -1,4 +1,5 @@
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -11,6 +12,12 @@ from app.models.user import User
 from app.models.movie import Movie
 from app.utils.security import create_hash, create_access_token
 from app.models.booking import Booking
+from app.models.auditorium import Auditorium
+from app.utils.inventory import build_seat_map
+from app.utils.cache import catalog_cache
+from app.utils.metrics import count_queries, instrument_engine
+from app.utils.ratelimit import login_limiter
+from app.utils.search import search_index
 
 # Test database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -19,6 +26,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+instrument_engine(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -45,11 +53,32 @@ def client(db_session):
             db_session.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    login_limiter.clear()
     with TestClient(app) as test_client:
+        # Startup indexed and cached the app's own database; start from this
+        # one instead
+        catalog_cache.invalidate()
+        search_index.clear(catalog_cache.version())
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def max_queries():
+    """Asserts a block issues at most `limit` SQL statements, to catch N+1 queries
+
+    Usage: `with max_queries(3): client.get(...)`
+    """
+
+    @contextmanager
+    def check(limit: int):
+        with count_queries() as stats:
+            yield stats
+        assert stats.count <= limit, f"{stats.count} queries, expected <= {limit}"
+
+    return check
+
+
 # ----------------------------MOCK Fixtures----------------------------------------------------
 @pytest.fixture
 def test_movie_data():
@@ -95,6 +124,45 @@ def test_movie(db_session, test_movie_data):
     return movie
 
 
+@pytest.fixture
+def many_movies(db_session):
+    """Creates five movies with increasing showtimes, inserted out of order"""
+    start = datetime(2030, 1, 1, 18, 0)
+    movies = [
+        Movie(
+            title=f"Movie {i}",
+            description=f"Description {i}",
+            showtime=start + timedelta(hours=(i * 3) % 5),
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(movies)
+    db_session.commit()
+    return [(movie.id, movie.showtime) for movie in movies]
+
+
+@pytest.fixture
+def test_auditorium(db_session):
+    """Creates a small 2x3 auditorium layout"""
+    auditorium = Auditorium(name="Screen 1", rows=2, seats_per_row=3)
+    db_session.add(auditorium)
+    db_session.commit()
+    db_session.refresh(auditorium)
+    return auditorium
+
+
+@pytest.fixture
+def seated_movie(db_session, test_movie_data, test_auditorium):
+    """Creates a movie with a reserved-seating map in the test auditorium"""
+    movie = Movie(**test_movie_data, auditorium_id=test_auditorium.id)
+    db_session.add(movie)
+    db_session.flush()
+    build_seat_map(db_session, movie.id, test_auditorium)
+    db_session.commit()
+    db_session.refresh(movie)
+    return movie
+
+
 @pytest.fixture
 def mock_booking(db_session, normal_user, test_movie):
     """Creates a mock booking for testing"""
@@ -30,6 +30,25 @@ class TestAdminRoutes:
         if movies:
             assert all(key in movies[0] for key in ["title", "description", "showtime"])
 
+    def test_movie_listing_format_and_cursor(self, client, admin_token, many_movies):
+        """Test the listing's showtime format and its next-page cursor header"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = client.get(
+            "/admin/movies", headers=headers, params={"limit": 2, "sort": "showtime"}
+        )
+        assert response.headers["content-type"] == "application/json"
+        assert [movie["showtime"] for movie in response.json()] == [
+            "2030-01-01 18:00:00",
+            "2030-01-01 19:00:00",
+        ]
+        cursor = response.headers["X-Next-Cursor"]
+        response = client.get(
+            "/admin/movies",
+            headers=headers,
+            params={"limit": 2, "sort": "showtime", "cursor": cursor},
+        )
+        assert response.json()[0]["showtime"] == "2030-01-01 20:00:00"
+
     @pytest.mark.parametrize(
         "invalid_data",
         [
@@ -46,3 +65,349 @@ class TestAdminRoutes:
             json=invalid_data,
         )
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_hashing_stats(self, client, admin_token):
+        """Test the hashing pool statistics endpoint"""
+        response = client.get(
+            "/admin/stats/hashing", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert all(
+            key in response.json()
+            for key in ["queue_depth", "completed", "avg_latency_ms", "max_latency_ms"]
+        )
+
+    def test_create_movie_with_auditorium(self, client, admin_token, test_movie_data):
+        """Test that scheduling a movie in an auditorium builds its seat map"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = client.post(
+            "/admin/auditoriums",
+            headers=headers,
+            json={"name": "IMAX", "rows": 3, "seats_per_row": 4},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        auditorium_id = response.json()["id"]
+
+        test_movie_data["showtime"] = test_movie_data["showtime"].isoformat()
+        test_movie_data["auditorium_id"] = auditorium_id
+        response = client.post("/admin/movies", headers=headers, json=test_movie_data)
+        assert response.status_code == status.HTTP_201_CREATED
+
+        seat_map = client.get("/movies/1/seats", headers=headers).json()
+        assert seat_map["available"] == 12
+        assert seat_map["seats"][-1]["label"] == "C4"
+
+    def test_create_movie_unknown_auditorium(self, client, admin_token, test_movie_data):
+        """Test scheduling a movie in an auditorium that does not exist"""
+        test_movie_data["showtime"] = test_movie_data["showtime"].isoformat()
+        test_movie_data["auditorium_id"] = 42
+        response = client.post(
+            "/admin/movies",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json=test_movie_data,
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_update_without_auditorium_keeps_seats(
+        self, client, admin_token, normal_user_token, seated_movie
+    ):
+        """Test that a PUT leaving out auditorium_id does not touch the seat map"""
+        show, auditorium_id = seated_movie.id, seated_movie.auditorium_id
+        body = {
+            "title": "Renamed",
+            "description": seated_movie.description,
+            "showtime": seated_movie.showtime.isoformat(),
+        }
+        client.post(
+            f"/movies/{show}/book",
+            headers={"Authorization": f"Bearer {normal_user_token}"},
+            json={"movie_id": show, "seats": ["A1"]},
+        )
+        response = client.put(
+            f"/admin/movies/{show}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json=body,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["movie"]["auditorium_id"] == auditorium_id
+        seat_map = client.get(
+            f"/movies/{show}/seats",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        ).json()
+        assert seat_map["available"] == 5
+
+    def test_db_pool_stats(self, client, admin_token):
+        """Test the database pool statistics endpoint"""
+        response = client.get(
+            "/admin/stats/db-pool", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "status" in response.json()["sync"]
+
+    def test_bookings_filter_and_projection(
+        self, client, admin_token, mock_booking, many_movies
+    ):
+        """Test filtering bookings by movie and projecting columns"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        movie_id = mock_booking.movie_id
+        response = client.get(
+            "/admin/bookings",
+            headers=headers,
+            params={"movie_id": movie_id, "fields": "id,movie_id"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{"id": 1, "movie_id": movie_id}]
+
+        response = client.get(
+            "/admin/bookings", headers=headers, params={"movie_id": movie_id + 1}
+        )
+        assert response.json() == []
+
+    @pytest.mark.parametrize("gzip", [False, True])
+    def test_export_bookings_ndjson(self, client, admin_token, mock_booking, gzip):
+        """Test streaming all bookings as NDJSON, optionally gzip encoded"""
+        import json
+
+        expected = {
+            "id": mock_booking.id,
+            "user_id": mock_booking.user_id,
+            "movie_id": mock_booking.movie_id,
+        }
+        response = client.get(
+            "/admin/bookings/export",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            params={"gzip": gzip},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert (response.headers.get("content-encoding") == "gzip") == gzip
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows == [expected]
+
+    def test_export_bookings_csv(self, client, admin_token, mock_booking):
+        """Test streaming all bookings as CSV"""
+        expected = f"{mock_booking.id},{mock_booking.user_id},{mock_booking.movie_id}"
+        response = client.get(
+            "/admin/bookings/export",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            params={"format": "csv"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text.splitlines() == ["id,user_id,movie_id", expected]
+
+    def test_duplicate_movie_rejected(self, client, admin_token, test_movie_data):
+        """Test that title and showtime identify a movie"""
+        test_movie_data["showtime"] = test_movie_data["showtime"].isoformat()
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        client.post("/admin/movies", headers=headers, json=test_movie_data)
+        response = client.post("/admin/movies", headers=headers, json=test_movie_data)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_bulk_import_json_upsert(self, client, admin_token):
+        """Test bulk import inserts new rows, updates existing ones and reports errors"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        rows = [
+            {"title": "Dune", "description": "v1", "showtime": "2030-01-01T18:00:00"},
+            {"title": "Alien", "description": "v1", "showtime": "2030-01-01T20:00:00"},
+            {"title": "Bad", "description": "v1", "showtime": "not a date"},
+        ]
+        response = client.post("/admin/movies/bulk", headers=headers, json=rows)
+        assert response.status_code == status.HTTP_200_OK
+        report = response.json()
+        assert (report["received"], report["written"], report["failed"]) == (3, 2, 1)
+        assert report["errors"][0]["row"] == 3
+
+        rows[0]["description"] = "v2"
+        response = client.post("/admin/movies/bulk", headers=headers, json=rows[:1])
+        assert response.json()["written"] == 1
+        movies = client.get(
+            "/admin/movies", headers=headers, params={"title_prefix": "Dune"}
+        ).json()
+        assert [movie["description"] for movie in movies] == ["v2"]
+
+    @pytest.mark.parametrize("on_conflict,written", [("skip", 0), ("error", 0)])
+    def test_bulk_import_conflicts(self, client, admin_token, on_conflict, written):
+        """Test the skip and error conflict policies for existing rows"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        row = {"title": "Dune", "description": "v1", "showtime": "2030-01-01T18:00:00"}
+        client.post("/admin/movies", headers=headers, json=row)
+        response = client.post(
+            "/admin/movies/bulk",
+            headers=headers,
+            params={"on_conflict": on_conflict},
+            json=[{**row, "description": "v2"}],
+        )
+        report = response.json()
+        assert report["written"] == written
+        assert report["failed"] == (1 if on_conflict == "error" else 0)
+
+    def test_bulk_import_csv_with_seating(self, client, admin_token, test_auditorium):
+        """Test streaming a CSV schedule that builds seat maps for seated shows"""
+        headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": "text/csv"}
+        body = (
+            "title,description,showtime,auditorium_id\n"
+            f'Dune,"Sand,\nworms",2030-01-01T18:00:00,{test_auditorium.id}\n'
+            "Alien,Space,2030-01-01T20:00:00,\n"
+        )
+        response = client.post("/admin/movies/bulk", headers=headers, content=body)
+        assert response.json()["written"] == 2
+        movies = client.get(
+            "/admin/movies",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            params={"title_prefix": "Dune"},
+        ).json()
+        assert movies[0]["description"] == "Sand,\nworms"
+        seat_map = client.get(f"/movies/{movies[0]['id']}/seats", headers=headers)
+        assert seat_map.json()["available"] == 6
+
+    def test_bulk_import_moves_shows(
+        self, client, admin_token, normal_user_token, test_auditorium
+    ):
+        """Test that re-importing a show in another auditorium swaps its seat map"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        first_screen = test_auditorium.id
+        screen = client.post(
+            "/admin/auditoriums",
+            headers=headers,
+            json={"name": "Screen 2", "rows": 1, "seats_per_row": 2},
+        ).json()["id"]
+        rows = [
+            {"title": "Dune", "description": "d", "showtime": "2030-01-01T18:00:00"},
+            {"title": "Alien", "description": "a", "showtime": "2030-01-01T20:00:00"},
+        ]
+        seated = [{**row, "auditorium_id": first_screen} for row in rows]
+        client.post("/admin/movies/bulk", headers=headers, json=seated)
+        alien = client.get(
+            "/admin/movies", headers=headers, params={"title_prefix": "Alien"}
+        ).json()[0]["id"]
+        client.post(
+            f"/movies/{alien}/book",
+            headers={"Authorization": f"Bearer {normal_user_token}"},
+            json={"movie_id": alien},
+        )
+
+        moved = [{**row, "auditorium_id": screen} for row in rows]
+        report = client.post("/admin/movies/bulk", headers=headers, json=moved).json()
+        assert (report["written"], report["failed"]) == (1, 1)
+        assert report["errors"][0]["row"] == 2
+        movies = client.get(
+            "/admin/movies", headers=headers, params={"fields": "title,auditorium_id"}
+        ).json()
+        assert {movie["title"]: movie["auditorium_id"] for movie in movies} == {
+            "Dune": screen,
+            "Alien": first_screen,
+        }
+
+        # Rows without auditorium_id leave the seating alone
+        report = client.post("/admin/movies/bulk", headers=headers, json=rows).json()
+        assert report["written"] == 2
+        seat_maps = [
+            client.get(f"/movies/{movie['id']}/seats", headers=headers).json()
+            for movie in client.get("/admin/movies", headers=headers).json()
+        ]
+        assert [seat_map["available"] for seat_map in seat_maps] == [2, 5]
+
+    def test_bulk_import_rejects_busy_screens(
+        self, client, admin_token, test_auditorium
+    ):
+        """Test that bulk rows cannot double-book a screen, as POST /movies cannot"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        screen = test_auditorium.id
+
+        def show(title, hour, **extra):
+            return {
+                "title": title,
+                "description": "d",
+                "showtime": f"2030-01-01T{hour}:00:00",
+                "auditorium_id": screen,
+                **extra,
+            }
+
+        client.post("/admin/movies", headers=headers, json=show("Legacy", 18))
+        rows = [
+            show("Dune", 18),
+            show("Alien", 20),
+            show("Heat", 20),
+            show("Heat", 18, auditorium_id=None),
+            show("Legacy", 18),
+        ]
+        report = client.post("/admin/movies/bulk", headers=headers, json=rows).json()
+        assert (report["written"], report["failed"]) == (3, 2)
+        assert [error["row"] for error in report["errors"]] == [1, 3]
+        assert report["errors"][0]["errors"] == [
+            "auditorium_id: The screen already has a show at that time"
+        ]
+
+        # The per-row fallback after a duplicate checks the screens too
+        report = client.post(
+            "/admin/movies/bulk",
+            headers=headers,
+            params={"on_conflict": "error"},
+            json=[show("Alien", 20), show("Jaws", 20), show("Jaws", 22)],
+        ).json()
+        assert (report["written"], report["failed"]) == (1, 2)
+        assert [error["errors"][0][:6] for error in report["errors"]] == [
+            "title,",
+            "audito",
+        ]
+
+    def test_bulk_import_rejects_invalid_utf8(self, client, admin_token):
+        """Test that undecodable lines are row errors, not server errors"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        good = b'{"title": "Dune", "description": "d", "showtime": "2030-01-01T18:00"}'
+        ndjson = b"\n".join([good, b'{"title": "\xff"}'])
+        response = client.post(
+            "/admin/movies/bulk",
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            content=ndjson,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.json()["written"], response.json()["failed"]) == (1, 1)
+
+        csv = b"title,description,showtime\n\xffAlien,a,2030-01-01T20:00\n"
+        response = client.post(
+            "/admin/movies/bulk",
+            headers={**headers, "Content-Type": "text/csv"},
+            content=csv,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["errors"][0]["errors"][0].startswith("Invalid UTF-8")
+
+    def test_bulk_import_ndjson(self, client, admin_token):
+        """Test importing newline-delimited JSON with a malformed line"""
+        headers = {
+            "Authorization": f"Bearer {admin_token}",
+            "Content-Type": "application/x-ndjson",
+        }
+        body = (
+            '{"title": "Dune", "description": "d", "showtime": "2030-01-01T18:00:00"}\n'
+            "{not json\n"
+        )
+        response = client.post("/admin/movies/bulk", headers=headers, content=body)
+        report = response.json()
+        assert (report["written"], report["failed"]) == (1, 1)
+        assert report["errors"][0]["row"] == 2
+
+    def test_batch_booking_for_users(
+        self, client, admin_token, normal_user, test_movie
+    ):
+        """Test booking and cancelling on behalf of several users"""
+        user_id, movie_id = normal_user.id, test_movie.id
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        items = [
+            {"user_id": user_id, "movie_id": movie_id},
+            {"user_id": 9999, "movie_id": movie_id},
+        ]
+        response = client.post(
+            "/admin/bookings/batch", headers=headers, json={"items": items}
+        )
+        results = response.json()["results"]
+        assert [result["status"] for result in results] == ["booked", "failed"]
+        assert results[1]["detail"] == "User not found"
+
+        response = client.post(
+            "/admin/bookings/batch/cancel", headers=headers, json={"items": items}
+        )
+        assert response.json()["succeeded"] == 1
+        bookings = client.get("/admin/bookings", headers=headers).json()
+        assert bookings == []
@@ -0,0 +1,191 @@
+import re
+
+import pytest
+from datetime import timedelta
+from fastapi import status
+from sqlalchemy import delete, event, update
+
+from app.models.booking import Booking
+from app.models.occupancy import HourlyBookings, MovieOccupancy
+from app.models.user import User
+from app.utils import batch
+from app.utils.security import create_access_token
+
+
+@pytest.fixture
+def users(db_session):
+    """Creates users `a` and `b` and returns their bearer headers"""
+    accounts = [User(username=name, hashed_password="x") for name in ("a", "b")]
+    db_session.add_all(accounts)
+    db_session.commit()
+    return {
+        account.username: {
+            "Authorization": "Bearer "
+            + create_access_token(
+                account.username, account.id, False, timedelta(minutes=5)
+            )
+        }
+        for account in accounts
+    }
+
+
+@pytest.fixture
+def admin(admin_token):
+    return {"Authorization": f"Bearer {admin_token}"}
+
+
+def book(client, headers, movie_id, quantity=1):
+    response = client.post(
+        f"/movies/{movie_id}/book",
+        headers=headers,
+        json={"movie_id": movie_id, "quantity": quantity},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+def top(client, admin, **params):
+    response = client.get("/admin/analytics/top-movies", headers=admin, params=params)
+    assert response.status_code == status.HTTP_200_OK
+    return [(row["movie_id"], row["bookings"], row["tickets"]) for row in response.json()]
+
+
+@pytest.mark.admin
+class TestAnalytics:
+    """Test suite for the occupancy counters and the analytics endpoints"""
+
+    def test_counters_follow_bookings(
+        self, client, db_session, admin, users, seated_movie, many_movies
+    ):
+        """Test that bookings, holds, batches and cancellations move the counters"""
+        seated_id = seated_movie.id
+        first, second = many_movies[0][0], many_movies[1][0]
+        book(client, users["a"], seated_id, quantity=2)
+        hold = client.post(
+            f"/movies/{seated_id}/hold", headers=users["b"], json={"quantity": 3}
+        ).json()
+        client.post(f"/holds/{hold['hold_id']}/confirm", headers=users["b"])
+        client.post(
+            "/bookings/batch",
+            headers=users["a"],
+            json={"items": [{"movie_id": first}, {"movie_id": second}]},
+        )
+        assert top(client, admin) == [(seated_id, 2, 5), (second, 1, 1), (first, 1, 1)]
+        best = client.get("/admin/analytics/top-movies", headers=admin).json()[0]
+        assert (best["capacity"], best["fill_rate"]) == (6, 0.8333)
+
+        client.delete(f"/movies/{seated_id}/cancel", headers=users["a"])
+        client.post(
+            "/bookings/batch/cancel", headers=users["a"], json={"movie_ids": [first]}
+        )
+        assert top(client, admin) == [(seated_id, 1, 3), (second, 1, 1)]
+        assert top(client, admin, limit=1) == [(seated_id, 1, 3)]
+
+        hours = client.get("/admin/analytics/bookings-per-hour", headers=admin).json()
+        assert [(row["booked"], row["cancelled"]) for row in hours] == [(4, 2)]
+        per_show = db_session.query(
+            HourlyBookings.movie_id, HourlyBookings.booked, HourlyBookings.cancelled
+        )
+        assert sorted(per_show) == sorted(
+            [(seated_id, 2, 1), (first, 1, 1), (second, 1, 0)]
+        )
+
+        client.delete(f"/admin/movies/{seated_id}", headers=admin)
+        assert top(client, admin) == [(second, 1, 1)]
+
+    def test_concurrent_cancel_counted_once(
+        self, client, db_session, monkeypatch, admin, users, seated_movie
+    ):
+        """Test that a booking another request deleted first is not counted again"""
+        seated_id = seated_movie.id
+        book(client, users["a"], seated_id, quantity=2)
+        delete_bookings = batch._delete_bookings
+
+        def cancelled_meanwhile(db, booking_ids):
+            db.execute(delete(Booking).where(Booking.id.in_(booking_ids)))
+            return delete_bookings(db, booking_ids)
+
+        monkeypatch.setattr(batch, "_delete_bookings", cancelled_meanwhile)
+        response = client.post(
+            "/bookings/batch/cancel",
+            headers=users["a"],
+            json={"movie_ids": [seated_id]},
+        )
+        assert response.json()["failed"] == 1
+        assert top(client, admin) == [(seated_id, 1, 2)]
+
+    def test_fill_rate_by_day(self, client, admin, users, seated_movie, many_movies):
+        """Test tickets against capacity per showtime day"""
+        seated_day = seated_movie.showtime.date().isoformat()
+        book(client, users["a"], seated_movie.id, quantity=3)
+        book(client, users["a"], many_movies[0][0])
+
+        days = client.get("/admin/analytics/fill-rate", headers=admin).json()
+        assert days == [
+            {
+                "day": seated_day,
+                "shows": 1,
+                "tickets": 3,
+                "capacity": 6,
+                "fill_rate": 0.5,
+            },
+            {
+                "day": "2030-01-01",
+                "shows": 5,
+                "tickets": 1,
+                "capacity": None,
+                "fill_rate": None,
+            },
+        ]
+        days = client.get(
+            "/admin/analytics/fill-rate",
+            headers=admin,
+            params={"date_from": "2030-01-01T00:00:00"},
+        ).json()
+        assert [day["day"] for day in days] == ["2030-01-01"]
+
+    def test_analytics_never_read_bookings(
+        self, client, db_session, admin, users, many_movies
+    ):
+        """Test that the analytics endpoints answer from the counters alone"""
+        book(client, users["a"], many_movies[0][0])
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            for endpoint in ("top-movies", "fill-rate", "bookings-per-hour"):
+                response = client.get(f"/admin/analytics/{endpoint}", headers=admin)
+                assert response.status_code == status.HTTP_200_OK
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        assert statements
+        for statement in statements:
+            assert not re.search(r"(FROM|JOIN) bookings\b", statement), statement
+
+    def test_reconcile_rebuilds_counters(
+        self, client, db_session, admin, users, seated_movie, many_movies
+    ):
+        """Test that reconciliation repairs drifted and missing counters"""
+        seated_id, other_id = seated_movie.id, many_movies[0][0]
+        book(client, users["a"], seated_id, quantity=2)
+        book(client, users["b"], seated_id, quantity=1)
+        book(client, users["a"], other_id)
+        db_session.execute(update(MovieOccupancy).values(tickets=99))
+        db_session.execute(
+            delete(MovieOccupancy).where(MovieOccupancy.movie_id == other_id)
+        )
+        db_session.commit()
+
+        response = client.post("/admin/analytics/reconcile", headers=admin)
+        assert response.json() == {"shows": 2, "corrected": 2}
+        assert top(client, admin) == [(seated_id, 2, 3), (other_id, 1, 1)]
+        response = client.post("/admin/analytics/reconcile", headers=admin)
+        assert response.json()["corrected"] == 0
+
+    def test_analytics_require_admin(self, client, users):
+        """Test that regular users cannot read analytics"""
+        response = client.get("/admin/analytics/top-movies", headers=users["a"])
+        assert response.status_code == status.HTTP_403_FORBIDDEN
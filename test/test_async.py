@@ -0,0 +1,163 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_async_db
+from app.models.movie import Movie
+from app.models.user import User
+from app.routes import asyncAdminRoute, asyncUserRoute
+from app.utils.cache import catalog_cache
+from app.utils.pipeline import booking_pipeline
+from app.utils.security import create_access_token
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    """A client for an app serving only the async routes over aiosqlite"""
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(
+            User.__table__.insert(),
+            [
+                {"username": "user", "hashed_password": "x", "is_admin": False},
+                {"username": "admin", "hashed_password": "x", "is_admin": True},
+            ],
+        )
+        conn.execute(
+            Movie.__table__.insert(),
+            {
+                "title": "Async Movie",
+                "description": "Non-blocking",
+                "showtime": datetime.now() + timedelta(days=1),
+            },
+        )
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(asyncAdminRoute.router)
+    app.include_router(asyncUserRoute.router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    catalog_cache.invalidate()
+    with TestClient(app) as client:
+        yield client
+
+
+def auth_header(user_id, username, is_admin=False):
+    token = create_access_token(username, user_id, is_admin, timedelta(minutes=20))
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.user
+class TestAsyncRoutes:
+    """Test suite for the async database mode"""
+
+    def test_book_and_cancel(self, async_client):
+        """Test booking, listing and cancelling through the async handlers"""
+        headers = auth_header(1, "user")
+        response = async_client.get("/movies", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]["title"] == "Async Movie"
+
+        response = async_client.post(
+            "/movies/1/book", headers=headers, json={"movie_id": 1}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        response = async_client.post(
+            "/movies/1/book", headers=headers, json={"movie_id": 1}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        history = async_client.get("/movies/history", headers=headers).json()
+        assert history == [{"user_id": 1, "movie_id": 1}]
+
+        response = async_client.delete("/movies/1/cancel", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    def test_book_through_pipeline(self, async_client, tmp_path):
+        """Test that async booking awaits the booking pipeline when it runs"""
+        engine = create_engine(f"sqlite:///{tmp_path}/async.db")
+        booked = booking_pipeline.stats()["booked"]
+        async_client.portal.call(booking_pipeline.start, sessionmaker(bind=engine))
+        try:
+            for user_id, expected in ((1, 201), (2, 201), (1, 400)):
+                response = async_client.post(
+                    "/movies/1/book",
+                    headers=auth_header(user_id, "user"),
+                    json={"movie_id": 1},
+                )
+                assert response.status_code == expected
+        finally:
+            async_client.portal.call(booking_pipeline.stop)
+            engine.dispose()
+        assert booking_pipeline.stats()["booked"] - booked == 2
+
+    def test_admin_update_movie(self, async_client):
+        """Test that async admin writes return fully loaded objects"""
+        response = async_client.put(
+            "/admin/movies/1",
+            headers=auth_header(2, "admin", is_admin=True),
+            json={
+                "title": "Renamed",
+                "description": "Updated",
+                "showtime": "2030-01-01T20:00:00",
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["movie"]["title"] == "Renamed"
+
+    def test_schedule_showtime(self, async_client):
+        """Test scheduling a film and finding its showings through async handlers"""
+        admin = auth_header(2, "admin", is_admin=True)
+        theater = async_client.post(
+            "/admin/theaters", headers=admin, json={"name": "Async Cinema"}
+        ).json()
+        screen = async_client.post(
+            "/admin/auditoriums",
+            headers=admin,
+            json={
+                "name": "A1",
+                "rows": 1,
+                "seats_per_row": 4,
+                "theater_id": theater["id"],
+            },
+        ).json()
+        film = async_client.post(
+            "/admin/films",
+            headers=admin,
+            json={"title": "Async", "duration_minutes": 90},
+        ).json()
+        show = {"film_id": film["id"], "auditorium_id": screen["id"]}
+        response = async_client.post(
+            "/admin/showtimes",
+            headers=admin,
+            json={**show, "showtime": "2030-01-01T18:00"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        response = async_client.post(
+            "/admin/showtimes",
+            headers=admin,
+            json={**show, "showtime": "2030-01-01T19:00"},
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = async_client.get(
+            f"/theaters/{theater['id']}/showtimes",
+            headers=auth_header(1, "user"),
+            params={"showtime_from": "2030-01-01T00:00"},
+        )
+        assert [show["ends_at"] for show in response.json()] == ["2030-01-01T19:30:00"]
@@ -46,6 +46,7 @@ class TestAuth:
         assert all(key in data for key in ["message", "access_token", "token_type"])
         assert data["token_type"] == "bearer"
         assert data["message"] == "Logged In Successfully"
+        assert data["refresh_token"] and data["expires_in"] > 0
 
     def test_login_invalid_credentials(self, client):
         """Test login with invalid credentials"""
@@ -54,3 +55,129 @@ class TestAuth:
         )
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert response.json()["detail"] == "Invalid Username Or Password"
+
+    def test_login_rejected_when_hash_pool_full(self, client, normal_user, monkeypatch):
+        """Test that a saturated hashing pool sheds load with 503"""
+        from app.utils.hashing import hash_pool
+
+        monkeypatch.setattr(hash_pool, "queue_limit", 0)
+        response = client.post(
+            "/auth/login",
+            data={"username": normal_user.username, "password": "testpass123"},
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["retry-after"] == "1"
+        assert hash_pool.stats()["rejected"] >= 1
+
+    def test_logout_revokes_token(self, client, normal_user_token):
+        """Test that a token stops working after logout"""
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        assert client.get("/movies/history", headers=headers).status_code == 200
+        response = client.post("/auth/logout", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        response = client.get("/movies/history", headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_login_throttled_per_username(self, client, normal_user, max_queries):
+        """Test that repeated attempts are throttled before touching DB or bcrypt"""
+        from app.config import LOGIN_USER_BURST
+
+        form = {"username": normal_user.username, "password": "wrongpass"}
+        for _ in range(LOGIN_USER_BURST):
+            response = client.post("/auth/login", data=form)
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+        with max_queries(0):
+            response = client.post(
+                "/auth/login",
+                data={"username": normal_user.username, "password": "testpass123"},
+            )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response.headers["retry-after"]) >= 1
+
+    def login(self, client, username="testuser", password="testpass123"):
+        response = client.post(
+            "/auth/login", data={"username": username, "password": password}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    def test_refresh_rotates_token(self, client, normal_user, max_queries, monkeypatch):
+        """Test that refreshing issues new tokens without any password hashing"""
+        tokens = self.login(client)
+
+        async def no_bcrypt(*args):
+            raise AssertionError("refresh must not verify a password")
+
+        monkeypatch.setattr("app.utils.security.verify_hash_async", no_bcrypt)
+        with max_queries(4):
+            response = client.post(
+                "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+            )
+        assert response.status_code == status.HTTP_200_OK
+        refreshed = response.json()
+        assert refreshed["refresh_token"] != tokens["refresh_token"]
+        headers = {"Authorization": f"Bearer {refreshed['access_token']}"}
+        assert client.get("/movies/history", headers=headers).status_code == 200
+
+        response = client.post(
+            "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_refresh_token_reuse_revokes_session(self, client, normal_user):
+        """Test that replaying a rotated refresh token revokes its successors"""
+        first = self.login(client)["refresh_token"]
+        second = client.post("/auth/refresh", json={"refresh_token": first}).json()
+        client.post("/auth/refresh", json={"refresh_token": first})
+        response = client.post(
+            "/auth/refresh", json={"refresh_token": second["refresh_token"]}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()["detail"] == "Invalid or expired refresh token"
+
+    def test_logout_revokes_refresh_token(self, client, normal_user):
+        """Test that logging out with a refresh token ends the whole session"""
+        tokens = self.login(client)
+        response = client.post(
+            "/auth/logout",
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        response = client.post(
+            "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_logout_ignores_another_users_refresh_token(
+        self, client, normal_user, admin_token
+    ):
+        """Test that logging out cannot end a session that is not the caller's"""
+        tokens = self.login(client)
+        response = client.post(
+            "/auth/logout",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        response = client.post(
+            "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_admin_revokes_user_sessions(self, client, normal_user, admin_token):
+        """Test that an admin can sign a user out of every session"""
+        user_id = normal_user.id
+        tokens = self.login(client)
+        response = client.post(
+            f"/admin/users/{user_id}/revoke-sessions",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["revoked_refresh_tokens"] == 1
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert client.get("/movies/history", headers=headers).status_code == 401
+        response = client.post(
+            "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_db_engine, get_db
+from app.main import app
+from app.migrations import run_migrations
+from app.utils.serialization import JSON_ENCODERS
+from app.models.booking import Booking
+from benchmarks.report import compare, percentile, summarize
+from benchmarks.run import run_benchmarks
+from benchmarks.serialization import (
+    LISTINGS,
+    after_paths,
+    before_paths,
+    run_serialization_benchmark,
+    sample_rows,
+)
+from benchmarks.seed import Scale, remove_bookings_after, seed_database
+
+
+@pytest.fixture
+def bench_scale():
+    return Scale(users=30, movies=12, bookings_per_user=3)
+
+
+@pytest.fixture
+def bench_app(tmp_path, bench_scale):
+    """The app served from a freshly seeded benchmark database"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    run_migrations(engine)
+    seed_database(engine, bench_scale)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield app, engine
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+@pytest.mark.admin
+class TestBenchmarks:
+    """Test suite for the load-test harness"""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles and the per-scenario summary"""
+        values = [i / 1000 for i in range(1, 101)]
+        assert percentile(values, 50) == 0.05
+        assert percentile(values, 99) == 0.099
+        summary = summarize(values, errors=2, elapsed=2.0)
+        assert summary["rps"] == 50.0
+        assert (summary["p50_ms"], summary["p95_ms"]) == (50.0, 95.0)
+
+    def test_compare_flags_regressions(self):
+        """Test that slower or less productive runs are reported against a baseline"""
+        row = {"requests": 10, "errors": 0, "rps": 100.0, "p95_ms": 10.0}
+        baseline = {"results": {"catalog": row, "book": row}}
+        current = {
+            "results": {
+                "catalog": {**row, "p95_ms": 11.0, "rps": 90.0},
+                "book": {**row, "p95_ms": 20.0, "rps": 50.0},
+            }
+        }
+        regressions = compare(current, baseline, tolerance=0.2)
+        assert len(regressions) == 2
+        assert all(regression.startswith("book:") for regression in regressions)
+
+    def test_seeded_run(self, bench_app, bench_scale):
+        """Test seeding volumes and driving the hot endpoints over ASGI"""
+        app, engine = bench_app
+        with engine.connect() as conn:
+            bookings = conn.execute(select(func.count(Booking.id))).scalar()
+        assert bookings == bench_scale.bookings
+
+        results = asyncio.run(
+            run_benchmarks(
+                app, bench_scale, 10, 4, scenarios=("catalog", "book", "admin_bookings")
+            )
+        )
+        assert set(results) == {"catalog", "book", "admin_bookings"}
+        assert all(
+            row["errors"] == 0 and row["requests"] == 10 for row in results.values()
+        )
+
+        # Once the run's bookings are removed, a second run books cleanly too
+        assert remove_bookings_after(engine, bookings) == 10
+        rerun = asyncio.run(
+            run_benchmarks(app, bench_scale, 10, 4, scenarios=("book",))
+        )
+        assert rerun["book"]["errors"] == 0
+
+    @pytest.mark.parametrize("encoder", JSON_ENCODERS)
+    def test_fast_serialization_matches_before(self, encoder):
+        """Test that every encoder produces the same JSON as the old paths"""
+        data = sample_rows(20)
+        before = before_paths()
+        after = after_paths(JSON_ENCODERS[encoder]())
+        for listing, kind in LISTINGS.items():
+            expected = json.loads(before[listing](data[kind]))
+            assert json.loads(after[listing](data[kind])) == expected, listing
+
+    def test_serialization_benchmark(self):
+        """Test that the serialization benchmark reports every listing and encoder"""
+        results = run_serialization_benchmark(rows=50, repeat=1)
+        assert set(results) == set(LISTINGS)
+        for row in results.values():
+            assert set(row) == {"before", *JSON_ENCODERS}
+            assert all(rate > 0 for rate in row.values())
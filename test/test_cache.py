@@ -0,0 +1,63 @@
+import pytest
+
+from app.utils.cache import CachedResponse, CatalogCache
+from app.utils.state import InMemoryLRUBackend
+
+
+class FakeRedis:
+    """Minimal stand-in for a redis.Redis client"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+        return int(self.data[key])
+
+
+@pytest.mark.user
+class TestCatalogCache:
+    """Test suite for the catalog cache and its backends"""
+
+    @pytest.mark.parametrize("backend", [InMemoryLRUBackend(), FakeRedis()])
+    def test_version_invalidation(self, backend):
+        """Test that bumping the version hides older entries"""
+        cache = CatalogCache(backend)
+        version = cache.version()
+        cache.put("all", version, CachedResponse.build(b"[]", "next"))
+        cached = cache.get("all", version)
+        assert cached.body == b"[]" and cached.next_cursor == "next"
+
+        cache.invalidate()
+        assert cache.version() == version + 1
+        assert cache.get("all", cache.version()) is None
+        assert cache.stats()["hits"] == 1
+
+    def test_lru_eviction(self):
+        """Test that the in-memory backend evicts the least recently used key"""
+        backend = InMemoryLRUBackend(max_entries=2)
+        backend.set("a", b"1")
+        backend.set("b", b"2")
+        backend.get("a")
+        backend.set("c", b"3")
+        assert backend.get("b") is None
+        assert backend.get("a") == b"1"
+
+    @pytest.mark.parametrize(
+        "header, matches", [(None, False), ("*", True), ('"other", {etag}', True)]
+    )
+    def test_etag_matching(self, header, matches):
+        """Test If-None-Match handling, including lists of tags"""
+        cached = CachedResponse.build(b"[]")
+        if header:
+            header = header.format(etag=f"W/{cached.etag}")
+        assert cached.matches(header) is matches
@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import text
+
+from app.database import create_db_engine, engine_options, pool_stats
+
+
+@pytest.mark.admin
+class TestDatabase:
+    """Test suite for engine construction and pool configuration"""
+
+    def test_sqlite_pragmas_applied(self, tmp_path):
+        """Test that file-backed SQLite connections run in WAL mode"""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        engine.dispose()
+
+    def test_pool_options(self):
+        """Test that pool sizing is only applied to pooled databases"""
+        assert "pool_size" in engine_options("sqlite:///./movie.db")
+        assert "pool_size" not in engine_options("sqlite://")
+        assert engine_options("postgresql://db/movies")["max_overflow"] == 10
+
+    def test_pool_stats(self, tmp_path):
+        """Test reporting pool counters for a queue pool"""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+        with engine.connect():
+            stats = pool_stats(engine)
+        assert stats["pool"] == "QueuePool"
+        assert stats["checkedout"] == 1
+        engine.dispose()
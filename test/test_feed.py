@@ -0,0 +1,130 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import status
+
+from app.main import app
+from app.utils.feed import FeedHub, feed_hub
+
+
+def event_data(chunk: bytes) -> dict:
+    return json.loads(chunk.split(b"data: ", 1)[1])
+
+
+async def read_stream(path: str, headers: dict, chunks: list, count: int):
+    """Call the app over ASGI, disconnecting once `count` chunks arrived"""
+    received = asyncio.Event()
+
+    async def receive():
+        await received.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"])
+            if len(chunks) == count:
+                received.set()
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+
+
+@pytest.mark.user
+class TestFeedHub:
+    """Test suite for the in-process availability fan-out hub"""
+
+    def test_rapid_updates_are_coalesced(self):
+        """Test that a burst of updates reaches subscribers as one message"""
+
+        async def scenario():
+            hub = FeedHub(coalesce_seconds=0.01)
+            hub.start(asyncio.get_running_loop())
+            subscriber = hub.subscribe(1)
+            other_show = hub.subscribe(2)
+            for booked in range(1, 4):
+                hub.publish(1, {"movie_id": 1, "booked": booked})
+            message = await subscriber.next(timeout=1)
+            assert json.loads(message.split(b"data: ")[1]) == {"movie_id": 1, "booked": 3}
+            assert await other_show.next(timeout=0.05) is None
+            return hub.stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["published"] == 3
+        assert stats["delivered"] == 1
+        assert stats["coalesced"] == 2
+
+    def test_slow_consumer_keeps_only_latest(self):
+        """Test that an unread message is replaced instead of queued"""
+
+        async def scenario():
+            hub = FeedHub(coalesce_seconds=0)
+            hub.start(asyncio.get_running_loop())
+            subscriber = hub.subscribe(1)
+            for booked in (1, 2):
+                hub.publish(1, {"movie_id": 1, "booked": booked})
+                await asyncio.sleep(0.01)
+            assert b'"booked": 2' in await subscriber.next(timeout=1)
+            assert await subscriber.next(timeout=0.05) is None
+            hub.unsubscribe(subscriber)
+            return hub.stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["subscribers"] == 0 and stats["shows"] == 0
+
+    def test_subscriber_limit(self, client, normal_user_token, test_movie, monkeypatch):
+        """Test that subscribers beyond the limit are told to poll instead"""
+        monkeypatch.setattr(feed_hub, "max_subscribers", 0)
+        response = client.get(
+            f"/movies/{test_movie.id}/availability/stream",
+            headers={"Authorization": f"Bearer {normal_user_token}"},
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def test_stream_pushes_booking(
+        self, client, normal_user_token, seated_movie, monkeypatch
+    ):
+        """Test that a booking is pushed to the show's subscribers"""
+        monkeypatch.setattr(feed_hub, "coalesce_seconds", 0)
+        movie_id = seated_movie.id
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        # The test client buffers whole responses, so drive the endpoint over
+        # raw ASGI on the client's event loop and hang up after two events
+        chunks = []
+        stream = client.portal.start_task_soon(
+            read_stream,
+            f"/movies/{movie_id}/availability/stream",
+            headers,
+            chunks,
+            2,
+        )
+        deadline = time.monotonic() + 5
+        while not chunks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        booking = client.post(
+            f"/movies/{movie_id}/book",
+            headers=headers,
+            json={"movie_id": movie_id, "quantity": 2},
+        )
+        assert booking.status_code == status.HTTP_201_CREATED
+        stream.result(timeout=5)
+
+        assert chunks[0].startswith(b"event: availability\n")
+        assert [event_data(chunk) for chunk in chunks] == [
+            {"movie_id": movie_id, "booked": 0, "available": 6},
+            {"movie_id": movie_id, "booked": 1, "available": 4},
+        ]
+        assert feed_hub.stats()["subscribers"] == 0
@@ -0,0 +1,179 @@
+import asyncio
+import threading
+import uuid
+
+import httpx
+import pytest
+from fastapi import status
+
+from app.main import app
+from app.models.booking import Booking
+from app.utils.idempotency import IdempotencyMiddleware
+from app.utils.state import SQLiteStateBackend
+
+
+def book(client, token, movie_id, key, **body):
+    return client.post(
+        f"/movies/{movie_id}/book",
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": key},
+        json={"movie_id": movie_id, **body},
+    )
+
+
+@pytest.mark.user
+class TestIdempotency:
+    """Test suite for Idempotency-Key replays on mutating endpoints"""
+
+    def test_retry_replays_response(
+        self, client, db_session, normal_user_token, test_movie, max_queries
+    ):
+        """Test that a retried booking replays the first response without the DB"""
+        movie_id = test_movie.id
+        key = str(uuid.uuid4())
+        first = book(client, normal_user_token, movie_id, key)
+        assert first.status_code == status.HTTP_201_CREATED
+        assert "idempotent-replayed" not in first.headers
+
+        with max_queries(0):
+            retry = book(client, normal_user_token, movie_id, key)
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert retry.json() == first.json()
+        assert db_session.query(Booking).count() == 1
+
+    def test_key_reused_for_different_request(
+        self, client, normal_user_token, many_movies
+    ):
+        """Test that a key cannot be replayed against a different payload"""
+        (first_id, _), (second_id, _) = many_movies[:2]
+        key = str(uuid.uuid4())
+        assert book(client, normal_user_token, first_id, key).status_code == 201
+        response = book(client, normal_user_token, second_id, key)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"] == (
+            "Idempotency-Key was already used for a different request"
+        )
+
+    def test_keys_are_scoped_per_user(
+        self, client, normal_user_token, admin_token, test_movie
+    ):
+        """Test that two users sending the same key both get their own booking"""
+        movie_id = test_movie.id
+        key = str(uuid.uuid4())
+        assert book(client, normal_user_token, movie_id, key).status_code == 201
+        response = book(client, admin_token, movie_id, key)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "idempotent-replayed" not in response.headers
+
+    def test_concurrent_duplicates_run_once(
+        self, client, db_session, normal_user_token, test_movie
+    ):
+        """Test that in-flight duplicates wait for the first and replay it"""
+        movie_id = test_movie.id
+        key = str(uuid.uuid4())
+
+        async def send_twice():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as async_client:
+                return await asyncio.gather(
+                    *(
+                        async_client.post(
+                            f"/movies/{movie_id}/book",
+                            headers={
+                                "Authorization": f"Bearer {normal_user_token}",
+                                "Idempotency-Key": key,
+                            },
+                            json={"movie_id": movie_id},
+                        )
+                        for _ in range(2)
+                    )
+                )
+
+        responses = asyncio.run(send_twice())
+        assert [r.status_code for r in responses] == [201, 201]
+        assert sum("idempotent-replayed" in r.headers for r in responses) == 1
+        assert db_session.query(Booking).count() == 1
+
+    def test_duplicates_on_two_workers_run_once(self, normal_user_token, tmp_path):
+        """Test that two workers sharing a state backend run one key only once"""
+        calls = []
+
+        async def slow_booking(scope, receive, send):
+            calls.append(scope["path"])
+            await asyncio.sleep(0.2)
+            await send({"type": "http.response.start", "status": 201, "headers": []})
+            await send({"type": "http.response.body", "body": b'{"ok": true}'})
+
+        path = str(tmp_path / "state.db")
+        backends = [SQLiteStateBackend(path), SQLiteStateBackend(path)]
+        workers = [IdempotencyMiddleware(slow_booking, backend) for backend in backends]
+
+        async def send_to_both():
+            responses = []
+            for worker in workers:
+                client = httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=worker), base_url="http://test"
+                )
+                responses.append(
+                    client.post(
+                        "/movies/1/book",
+                        headers={
+                            "Authorization": f"Bearer {normal_user_token}",
+                            "Idempotency-Key": "on-sale",
+                        },
+                        json={"movie_id": 1},
+                    )
+                )
+            return await asyncio.gather(*responses)
+
+        responses = asyncio.run(send_to_both())
+        assert [r.status_code for r in responses] == [201, 201]
+        assert sum("idempotent-replayed" in r.headers for r in responses) == 1
+        assert calls == ["/movies/1/book"]
+        for backend in backends:
+            backend.close()
+
+    def test_shared_backend_calls_leave_the_event_loop(
+        self, normal_user_token, tmp_path
+    ):
+        """Test that a shared backend is only called from worker threads"""
+        threads = []
+
+        class RecordingBackend(SQLiteStateBackend):
+            def get(self, key):
+                threads.append(threading.get_ident())
+                return super().get(key)
+
+            def set(self, key, value, ex=None, nx=False):
+                threads.append(threading.get_ident())
+                return super().set(key, value, ex=ex, nx=nx)
+
+        async def created(scope, receive, send):
+            await send({"type": "http.response.start", "status": 201, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        backend = RecordingBackend(str(tmp_path / "state.db"))
+        worker = IdempotencyMiddleware(created, backend)
+
+        async def send_twice():
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=worker), base_url="http://test"
+            )
+            headers = {
+                "Authorization": f"Bearer {normal_user_token}",
+                "Idempotency-Key": "off-loop",
+            }
+            for _ in range(2):
+                await client.post("/movies/1/book", headers=headers, json={})
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(send_twice())
+        assert threads and loop_thread not in threads
+        backend.close()
+
+    def test_invalid_key(self, client, normal_user_token, test_movie):
+        """Test that an oversized key is rejected"""
+        response = book(client, normal_user_token, test_movie.id, "k" * 256)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,92 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.auditorium import Auditorium
+from app.models.booking import Booking
+from app.models.movie import Movie
+from app.models.seat import Seat, SEAT_BOOKED
+from app.models.user import User
+from app.utils.inventory import book_seats, build_seat_map, row_name
+
+
+@pytest.fixture
+def file_sessionmaker(tmp_path):
+    """A file-backed database so that each thread gets its own connection"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'inventory.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.mark.user
+class TestInventory:
+    """Test suite for the seat inventory engine"""
+
+    @pytest.mark.parametrize(
+        "index, name", [(0, "A"), (25, "Z"), (26, "AA"), (27, "AB"), (701, "ZZ")]
+    )
+    def test_row_name(self, index, name):
+        """Test spreadsheet-style row naming"""
+        assert row_name(index) == name
+
+    def test_concurrent_bookings_never_oversell(self, file_sessionmaker):
+        """Test that many concurrent bookings cannot sell a seat twice"""
+        with file_sessionmaker() as db:
+            auditorium = Auditorium(name="Main", rows=2, seats_per_row=5)
+            db.add(auditorium)
+            db.add_all(User(username=f"user{i}", hashed_password="x") for i in range(40))
+            db.flush()
+            movie = Movie(
+                title="Blockbuster",
+                description="Opening night",
+                showtime=datetime(2030, 1, 1, 20, 0),
+                auditorium_id=auditorium.id,
+            )
+            db.add(movie)
+            db.flush()
+            build_seat_map(db, movie.id, auditorium)
+            db.commit()
+            movie_id = movie.id
+
+        def attempt(user_id):
+            with file_sessionmaker() as db:
+                movie = db.get(Movie, movie_id)
+                try:
+                    book_seats(db, user_id, movie, quantity=1)
+                    db.commit()
+                    return True
+                except HTTPException:
+                    return False
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(attempt, range(1, 41)))
+
+        with file_sessionmaker() as db:
+            booked = db.query(Seat).filter(Seat.status == SEAT_BOOKED).all()
+            assert sum(results) == 10
+            assert len(booked) == 10
+            assert len({seat.booking_id for seat in booked}) == 10
+            assert db.query(Booking).count() == 10
+
+    def test_duplicate_booking_rejected_by_constraint(self, file_sessionmaker):
+        """Test that the same user cannot hold two bookings for one show"""
+        with file_sessionmaker() as db:
+            db.add(User(username="solo", hashed_password="x"))
+            movie = Movie(
+                title="Matinee", description="Quiet", showtime=datetime(2030, 1, 1)
+            )
+            db.add(movie)
+            db.commit()
+            book_seats(db, 1, movie)
+            db.commit()
+            with pytest.raises(HTTPException) as error:
+                book_seats(db, 1, movie)
+            assert error.value.status_code == 400
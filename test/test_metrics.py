@@ -0,0 +1,58 @@
+import pytest
+from fastapi import status
+
+
+@pytest.mark.admin
+class TestMetrics:
+    """Test suite for request instrumentation and SQL query budgets"""
+
+    def test_server_timing_header(self, client, normal_user_token, many_movies):
+        """Test that responses report total and database time"""
+        response = client.get(
+            "/movies", headers={"Authorization": f"Bearer {normal_user_token}"}
+        )
+        timing = response.headers["server-timing"]
+        assert timing.startswith("app;dur=")
+        assert 'db;dur=' in timing and 'desc="1 queries"' in timing
+
+    def test_prometheus_metrics(self, client, normal_user_token):
+        """Test that per-route latency, query and size histograms are exposed"""
+        client.get("/movies", headers={"Authorization": f"Bearer {normal_user_token}"})
+        client.get("/does-not-exist")
+        response = client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        labels = 'method="GET",route="/movies",status="200"'
+        for name in (
+            "http_request_duration_seconds",
+            "http_request_db_queries",
+            "http_request_db_seconds",
+            "http_response_size_bytes",
+        ):
+            assert f'{name}_bucket{{{labels},le="+Inf"}}' in body
+        assert 'route="unmatched",status="404"' in body
+        assert "db_statements_total" in body
+
+    def test_listing_query_budget(self, client, admin_token, many_movies, max_queries):
+        """Test that listings fetch a page with a single query"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        with max_queries(1):
+            client.get("/admin/movies", headers=headers)
+        with max_queries(1):
+            client.get("/admin/bookings", headers=headers)
+
+    @pytest.mark.parametrize("size", [1, 5])
+    def test_batch_booking_query_budget(
+        self, client, normal_user_token, many_movies, max_queries, size
+    ):
+        """Test that batch booking issues the same queries whatever its size"""
+        items = [{"movie_id": movie_id} for movie_id, _ in many_movies[:size]]
+        # Includes the two upserts that keep the occupancy counters in step
+        with max_queries(6):
+            response = client.post(
+                "/bookings/batch",
+                headers={"Authorization": f"Bearer {normal_user_token}"},
+                json={"items": items},
+            )
+        assert response.json()["succeeded"] == size
@@ -0,0 +1,174 @@
+import re
+
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, func, inspect, select
+from sqlalchemy.dialects import sqlite
+
+from app.migrations import MIGRATIONS, run_migrations
+from app.models.auditorium import Auditorium
+from app.models.booking import Booking
+from app.models.hold import SeatHold, HOLD_ACTIVE
+from app.models.movie import Movie
+from app.models.occupancy import HourlyBookings, MovieOccupancy
+from app.models.seat import Seat, SEAT_AVAILABLE
+from app.models.waitlist import WaitlistEntry, WAITLIST_WAITING
+
+# The schema as created by the first release, before any migration existed
+LEGACY_SCHEMA = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR UNIQUE,"
+    " hashed_password VARCHAR, is_admin BOOLEAN)",
+    "CREATE TABLE movies (id INTEGER PRIMARY KEY, title VARCHAR,"
+    " description VARCHAR, showtime DATETIME)",
+    "CREATE TABLE bookings (id INTEGER PRIMARY KEY,"
+    " user_id INTEGER REFERENCES users (id), movie_id INTEGER REFERENCES movies (id))",
+    "INSERT INTO movies (title, description, showtime)"
+    " VALUES ('Old', 'Kept', '2030-01-01 18:00:00')",
+    "INSERT INTO users (username, hashed_password, is_admin) VALUES ('old', 'x', 0)",
+    "INSERT INTO bookings (user_id, movie_id) VALUES (1, 1)",
+]
+
+# The filters behind booking, cancellation, history, listings, seat claims,
+# the hold sweeper, waitlist promotion, analytics and schedules
+HOT_QUERIES = {
+    "booking by user and movie": select(Booking.id).where(
+        Booking.user_id == 1, Booking.movie_id == 2
+    ),
+    "booking history": select(Booking.movie_id).where(Booking.user_id == 1),
+    "bookings by movie": select(Booking.id).where(Booking.movie_id == 2),
+    "movies by showtime": select(Movie.id, Movie.title)
+    .where(Movie.showtime >= datetime(2030, 1, 1))
+    .order_by(Movie.showtime, Movie.id)
+    .limit(100),
+    "movie by natural key": select(Movie.id).where(
+        Movie.title == "Dune",
+        Movie.showtime == datetime(2030, 1, 1),
+        Movie.film_id.is_(None),
+    ),
+    "available seats": select(Seat.id).where(
+        Seat.movie_id == 2, Seat.status == SEAT_AVAILABLE
+    ),
+    "seats of booking": select(Seat.label).where(Seat.booking_id == 3),
+    "due holds": select(SeatHold.id).where(
+        SeatHold.status == HOLD_ACTIVE, SeatHold.expires_at <= datetime(2030, 1, 1)
+    ),
+    "top movies": select(MovieOccupancy.movie_id)
+    .where(MovieOccupancy.tickets > 0)
+    .order_by(MovieOccupancy.tickets.desc(), MovieOccupancy.movie_id.desc())
+    .limit(10),
+    "bookings per hour": select(HourlyBookings.hour, func.sum(HourlyBookings.booked))
+    .where(HourlyBookings.hour >= datetime(2030, 1, 1))
+    .group_by(HourlyBookings.hour)
+    .order_by(HourlyBookings.hour),
+    "waitlist head": select(WaitlistEntry.id)
+    .where(WaitlistEntry.movie_id == 2, WaitlistEntry.status == WAITLIST_WAITING)
+    .order_by(WaitlistEntry.id)
+    .limit(10),
+    "screen overlap check": select(Movie.id)
+    .where(
+        Movie.auditorium_id == 1,
+        Movie.showtime > datetime(2030, 1, 1, 8),
+        Movie.showtime < datetime(2030, 1, 1, 21),
+        Movie.ends_at > datetime(2030, 1, 1, 18),
+    )
+    .limit(1),
+    "playing at theater": select(Movie.id, Auditorium.name)
+    .join(Auditorium, Auditorium.id == Movie.auditorium_id)
+    .where(
+        Auditorium.theater_id == 1,
+        Movie.showtime >= datetime(2030, 1, 1, 18),
+        Movie.showtime < datetime(2030, 1, 2),
+    )
+    .order_by(Movie.showtime, Movie.id),
+    "next showings of film": select(Movie.id)
+    .where(Movie.film_id == 1, Movie.showtime >= datetime(2030, 1, 1))
+    .order_by(Movie.showtime, Movie.id)
+    .limit(10),
+}
+
+# Sorting is fine where it merges a few small index ranges: one theater's
+# evening is a range scan per screen
+SORTED_IN_MEMORY = {"playing at theater"}
+
+
+def query_plan(conn, statement) -> list[str]:
+    sql = statement.compile(
+        dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.admin
+class TestMigrations:
+    """Test suite for schema migrations and the indexes behind hot queries"""
+
+    def test_fresh_database(self, migrated_engine):
+        """Test that a new database gets every table and records each migration"""
+        tables = set(inspect(migrated_engine).get_table_names())
+        assert {"movies", "bookings", "seats", "seat_holds"} <= tables
+        assert run_migrations(migrated_engine) == []
+
+    def test_upgrade_legacy_database(self, tmp_path):
+        """Test upgrading a database created before migrations existed"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as conn:
+            for statement in LEGACY_SCHEMA:
+                conn.exec_driver_sql(statement)
+
+        assert run_migrations(engine) == [version for version, _, _ in MIGRATIONS]
+        schema = inspect(engine)
+        movie_columns = {c["name"] for c in schema.get_columns("movies")}
+        assert {"auditorium_id", "film_id", "ends_at"} <= movie_columns
+        movie_indexes = {i["name"] for i in schema.get_indexes("movies")}
+        assert {"ix_movies_screen_start", "ix_movies_film_start"} <= movie_indexes
+        booking_indexes = {i["name"]: i for i in schema.get_indexes("bookings")}
+        assert booking_indexes["uq_bookings_user_movie"]["unique"]
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT title FROM movies").scalar() == "Old"
+            title_key = conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE name = 'uq_movies_title_showtime'"
+            ).scalar()
+            assert title_key.endswith("WHERE film_id IS NULL")
+            # Occupancy counters are backfilled from the existing bookings
+            counters = conn.exec_driver_sql(
+                "SELECT movie_id, bookings, tickets FROM movie_occupancy"
+            ).all()
+            assert counters == [(1, 1, 1)]
+        engine.dispose()
+
+    def test_hourly_rollup_keyed_by_show(self, migrated_engine):
+        """Test that the global hourly rollup is rebuilt per show, keeping its totals"""
+        with migrated_engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE booking_hourly")
+            conn.exec_driver_sql(
+                "CREATE TABLE booking_hourly (hour DATETIME PRIMARY KEY,"
+                " booked INTEGER NOT NULL, cancelled INTEGER NOT NULL)"
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO booking_hourly VALUES ('2030-01-01 18:00:00.000000', 5, 1)"
+            )
+            conn.exec_driver_sql("DELETE FROM schema_migrations WHERE version = 8")
+
+        assert run_migrations(migrated_engine) == [8]
+        with migrated_engine.connect() as conn:
+            rows = conn.execute(select(HourlyBookings)).all()
+        assert [tuple(row) for row in rows] == [(datetime(2030, 1, 1, 18), 0, 5, 1)]
+
+    @pytest.mark.parametrize("name", HOT_QUERIES)
+    def test_hot_queries_use_indexes(self, migrated_engine, name):
+        """Test that hot queries search an index instead of scanning a table"""
+        with migrated_engine.connect() as conn:
+            plan = query_plan(conn, HOT_QUERIES[name])
+        assert plan, name
+        for step in plan:
+            assert not re.fullmatch(r"SCAN \w+", step), f"{name}: {plan}"
+            if name not in SORTED_IN_MEMORY:
+                assert "TEMP B-TREE" not in step, f"{name}: {plan}"
@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy.orm import sessionmaker
+
+from app.models.booking import Booking
+from app.models.seat import Seat, SEAT_BOOKED
+from app.models.user import User
+from app.utils.exceptions import BOOKING_QUEUE_FULL_ERROR
+from app.utils.pipeline import BookingPipeline, booking_pipeline
+
+
+@pytest.fixture
+def sessions(db_session):
+    """What the app's SessionLocal is for the test database"""
+    return sessionmaker(bind=db_session.get_bind())
+
+
+@pytest.fixture
+def buyers(db_session):
+    """Eight users queueing for the same show"""
+    users = [User(username=f"buyer{i}", hashed_password="x") for i in range(8)]
+    db_session.add_all(users)
+    db_session.commit()
+    return [user.id for user in users]
+
+
+def run_on_sale(pipeline, sessions, requests):
+    """Submit every request at once, then stop the pipeline; returns each
+    caller's result or HTTPException, in request order"""
+
+    async def scenario():
+        pipeline.start(sessions)
+        calls = [asyncio.create_task(pipeline.book(*request)) for request in requests]
+        await asyncio.sleep(0)  # let every caller queue before stopping
+        await pipeline.stop()
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.user
+class TestBookingPipeline:
+    """Test suite for the write-behind booking queue with group commit"""
+
+    def test_group_commit_keeps_capacity_and_uniqueness(
+        self, db_session, sessions, seated_movie, buyers
+    ):
+        """Test that one batch books the six seats once each and rejects the rest"""
+        show = seated_movie.id
+        requests = [(user_id, show, None, 1) for user_id in buyers]
+        requests.insert(1, (buyers[0], show, None, 1))  # a double submit
+        pipeline = BookingPipeline(batch_size=64, max_wait_ms=5)
+
+        outcomes = run_on_sale(pipeline, sessions, requests)
+
+        booked = [outcome for outcome in outcomes if isinstance(outcome, dict)]
+        failed = [outcome.status_code for outcome in outcomes if outcome not in booked]
+        assert len(booked) == 6
+        assert outcomes[1].status_code == status.HTTP_400_BAD_REQUEST
+        assert failed.count(status.HTTP_409_CONFLICT) == 2
+        assert pipeline.stats()["batches"] == 1
+
+        seats = db_session.query(Seat).filter(Seat.movie_id == show).all()
+        assert all(seat.status == SEAT_BOOKED for seat in seats)
+        assert len({seat.booking_id for seat in seats}) == 6
+        assert db_session.query(Booking).count() == 6
+
+    def test_batches_are_capped(self, db_session, sessions, test_movie, buyers):
+        """Test that a full queue is split into batches of at most batch_size"""
+        requests = [(user_id, test_movie.id, None, 1) for user_id in buyers]
+        pipeline = BookingPipeline(batch_size=3, max_wait_ms=1)
+
+        outcomes = run_on_sale(pipeline, sessions, requests)
+
+        assert all(isinstance(outcome, dict) for outcome in outcomes)
+        assert [outcome["user_id"] for outcome in outcomes] == buyers
+        stats = pipeline.stats()
+        assert stats["batches"] == 3 and stats["largest_batch"] == 3
+        assert db_session.query(Booking).count() == 8
+
+    def test_queue_limit_rejects_with_retry_after(self, sessions, test_movie, buyers):
+        """Test that bookings beyond the queue limit are turned away with 503"""
+        requests = [(user_id, test_movie.id, None, 1) for user_id in buyers[:3]]
+        pipeline = BookingPipeline(queue_limit=1)
+
+        outcomes = run_on_sale(pipeline, sessions, requests)
+
+        assert isinstance(outcomes[0], dict)
+        for outcome in outcomes[1:]:
+            assert isinstance(outcome, HTTPException)
+            assert outcome.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert outcome.headers["Retry-After"] == "1"
+        assert pipeline.stats()["rejected"] == 2
+
+    def test_stalled_writer_times_out(self, sessions, test_movie, buyers):
+        """Test that callers give up with 503 instead of waiting on a stuck batch"""
+        pipeline = BookingPipeline(max_wait_ms=1, wait_seconds=0.05)
+        released = asyncio.Event()
+
+        async def stuck(batch):
+            await released.wait()
+
+        pipeline._commit = stuck
+
+        async def scenario():
+            pipeline.start(sessions)
+            try:
+                return await asyncio.gather(
+                    pipeline.book(buyers[0], test_movie.id, None, 1),
+                    asyncio.to_thread(
+                        pipeline.book_from_thread, buyers[1], test_movie.id, None, 1
+                    ),
+                    return_exceptions=True,
+                )
+            finally:
+                released.set()
+                await pipeline.stop()
+
+        outcomes = asyncio.run(scenario())
+
+        for outcome in outcomes:
+            assert isinstance(outcome, HTTPException)
+            assert outcome.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert outcome is not BOOKING_QUEUE_FULL_ERROR
+        assert pipeline.stats()["timed_out"] == 2
+
+    def test_stop_fails_bookings_left_in_queue(self, sessions, test_movie, buyers):
+        """Test that a booking queued behind the stop sentinel is not left waiting"""
+        pipeline = BookingPipeline(max_wait_ms=1)
+
+        async def scenario():
+            pipeline.start(sessions)
+            pipeline._queue.put_nowait(None)  # as if stop() had already run
+            late = asyncio.create_task(pipeline.book(buyers[0], test_movie.id, None, 1))
+            await asyncio.sleep(0)
+            await pipeline.stop()
+            return await asyncio.gather(late, return_exceptions=True)
+
+        (outcome,) = asyncio.run(scenario())
+
+        assert outcome is BOOKING_QUEUE_FULL_ERROR
+        assert pipeline.stats()["queue_depth"] == 0
+
+    def test_booking_endpoint_uses_pipeline(
+        self, client, sessions, normal_user_token, admin_token, seated_movie
+    ):
+        """Test that the booking endpoint answers from the pipeline when it runs"""
+        user = {"Authorization": f"Bearer {normal_user_token}"}
+        body = {"movie_id": seated_movie.id, "seats": ["A1", "A2"]}
+        before = booking_pipeline.stats()
+        client.portal.call(booking_pipeline.start, sessions)
+        try:
+            response = client.post(
+                f"/movies/{seated_movie.id}/book", headers=user, json=body
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            assert response.json()["seats"] == ["A1", "A2"]
+            assert response.json()["booking"]["movie_id"] == seated_movie.id
+
+            response = client.post(
+                f"/movies/{seated_movie.id}/book", headers=user, json=body
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            response = client.post(
+                "/movies/999/book", headers=user, json={"movie_id": 999}
+            )
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+
+            stats = client.get(
+                "/admin/stats/booking-pipeline",
+                headers={"Authorization": f"Bearer {admin_token}"},
+            ).json()
+            assert stats["running"] is True
+            assert stats["booked"] - before["booked"] == 1
+            assert stats["failed"] - before["failed"] == 2
+        finally:
+            client.portal.call(booking_pipeline.stop)
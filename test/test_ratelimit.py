@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import (
+    LOGIN_FAILURE_WINDOW_SECONDS,
+    LOGIN_IP_BURST,
+    LOGIN_MAX_FAILURES,
+    LOGIN_USER_BURST,
+)
+from app.utils.ratelimit import (
+    InMemoryRateLimitStore,
+    LoginLimiter,
+    StateRateLimitStore,
+)
+from app.utils.state import SQLiteStateBackend
+
+
+@pytest.mark.auth
+class TestRateLimit:
+    """Test suite for the token-bucket and sliding-window rate limit store"""
+
+    def test_token_bucket_refills(self):
+        """Test that a bucket allows a burst, then one request per refill"""
+        store = InMemoryRateLimitStore()
+        assert [store.take("ip", 3, 1.0, now=100.0) for _ in range(3)] == [0, 0, 0]
+        assert store.take("ip", 3, 1.0, now=100.0) == pytest.approx(1.0)
+        assert store.take("ip", 3, 1.0, now=101.5) == 0
+        assert store.take("ip", 3, 1.0, now=101.5) == pytest.approx(0.5)
+
+    def test_sliding_window_counts(self):
+        """Test that the previous window fades out as the current one advances"""
+        store = InMemoryRateLimitStore()
+        for _ in range(4):
+            store.hit("user", 60, now=30.0)
+        assert store.count("user", 60, now=59.0) == 4
+        assert store.count("user", 60, now=75.0) == pytest.approx(3.0)
+        assert store.hit("user", 60, now=90.0) == pytest.approx(3.0)
+        assert store.count("user", 60, now=200.0) == 0
+
+    def test_lockout_lasts_until_the_sliding_count_drops(self):
+        """Test that the wait covers the previous window fading out, not just
+        the rest of the current one"""
+        store = InMemoryRateLimitStore()
+        for _ in range(12):
+            store.hit("user", 60, now=30.0)
+        assert store.wait("user", 60, 10, now=30.0) == pytest.approx(40.0)
+        assert store.wait("user", 60, 10, now=65.0) == pytest.approx(5.0)
+        assert store.count("user", 60, now=70.5) < 10
+        assert store.wait("user", 60, 10, now=70.5) == 0
+        assert store.wait("nobody", 60, 10, now=30.0) == 0
+
+    def test_least_recently_used_keys_evicted(self):
+        """Test that the store stays within its key budget"""
+        store = InMemoryRateLimitStore(max_keys=2)
+        store.take("a", 1, 1.0, now=0.0)
+        store.take("b", 1, 1.0, now=0.0)
+        store.take("a", 1, 1.0, now=0.0)
+        store.take("c", 1, 1.0, now=0.0)
+        assert len(store) == 2
+        assert store.take("b", 1, 1.0, now=0.0) == 0  # evicted, so full again
+
+    def test_failures_lock_out_username(self):
+        """Test that too many failures lock a username until success resets it"""
+        limiter = LoginLimiter(InMemoryRateLimitStore())
+        for _ in range(LOGIN_MAX_FAILURES):
+            limiter.record_failure("Alice")
+        with pytest.raises(HTTPException) as error:
+            limiter.check("10.0.0.1", "alice")
+        assert error.value.status_code == 429
+        assert int(error.value.headers["Retry-After"]) <= LOGIN_FAILURE_WINDOW_SECONDS
+
+        limiter.record_success("alice")
+        limiter.check("10.0.0.1", "alice")
+        assert limiter.stats()["throttled"] == 1
+
+    def test_throttled_ip_cannot_drain_username(self):
+        """Test that attempts rejected per IP leave the username's bucket untouched"""
+        limiter = LoginLimiter(InMemoryRateLimitStore())
+        for attempt in range(LOGIN_IP_BURST):
+            limiter.check("10.0.0.1", f"user{attempt}")
+        for _ in range(LOGIN_USER_BURST * 2):
+            with pytest.raises(HTTPException):
+                limiter.check("10.0.0.1", "victim")
+        limiter.check("10.0.0.2", "victim")
+
+    def test_shared_store_is_checked_off_the_event_loop(self, tmp_path):
+        """Test that the async variants call a shared store from a worker thread"""
+        threads = []
+
+        class RecordingStore(StateRateLimitStore):
+            def take(self, *args):
+                threads.append(threading.get_ident())
+                return super().take(*args)
+
+        backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+        limiter = LoginLimiter(RecordingStore(backend))
+
+        async def attempt():
+            await limiter.check_async("10.0.0.1", "alice")
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(attempt())
+        assert len(threads) == 2  # the IP's and the username's bucket
+        assert loop_thread not in threads
+        backend.close()
@@ -0,0 +1,211 @@
+import pytest
+from datetime import datetime
+from fastapi import status
+from sqlalchemy import select
+
+from app.models.movie import Movie
+from app.utils.schedule import overlapping_show
+
+
+@pytest.fixture
+def admin(admin_token):
+    return {"Authorization": f"Bearer {admin_token}"}
+
+
+@pytest.fixture
+def user(normal_user_token):
+    return {"Authorization": f"Bearer {normal_user_token}"}
+
+
+@pytest.fixture
+def cinema(client, admin):
+    """A theater with two screens, a second theater, and two films"""
+
+    def post(path, body):
+        response = client.post(path, headers=admin, json=body)
+        assert response.status_code == status.HTTP_201_CREATED, response.json()
+        return response.json()["id"]
+
+    downtown, uptown = post("/admin/theaters", {"name": "Downtown"}), post(
+        "/admin/theaters", {"name": "Uptown"}
+    )
+    layout = {"rows": 2, "seats_per_row": 3}
+    return {
+        "downtown": downtown,
+        "uptown": uptown,
+        "screen 1": post(
+            "/admin/auditoriums", {"name": "D1", "theater_id": downtown, **layout}
+        ),
+        "screen 2": post(
+            "/admin/auditoriums", {"name": "D2", "theater_id": downtown, **layout}
+        ),
+        "uptown screen": post(
+            "/admin/auditoriums", {"name": "U1", "theater_id": uptown, **layout}
+        ),
+        "dune": post(
+            "/admin/films",
+            {"title": "Dune", "description": "Sand", "duration_minutes": 150},
+        ),
+        "heat": post("/admin/films", {"title": "Heat", "duration_minutes": 170}),
+    }
+
+
+def schedule(client, admin, film_id, screen_id, start):
+    return client.post(
+        "/admin/showtimes",
+        headers=admin,
+        json={"film_id": film_id, "auditorium_id": screen_id, "showtime": start},
+    )
+
+
+@pytest.mark.admin
+class TestSchedule:
+    """Test suite for films, theaters, screens and their showtimes"""
+
+    def test_screen_cannot_be_double_booked(self, client, admin, cinema):
+        """Test that overlapping shows on one screen are rejected"""
+        dune, heat, screen = cinema["dune"], cinema["heat"], cinema["screen 1"]
+        response = schedule(client, admin, dune, screen, "2030-01-01T18:00:00")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["ends_at"] == "2030-01-01T20:30:00"
+        assert response.json()["screen"] == "D1"
+
+        for start in ("2030-01-01T16:00:00", "2030-01-01T20:29:00"):
+            response = schedule(client, admin, heat, screen, start)
+            assert response.status_code == status.HTTP_409_CONFLICT, start
+        # Back to back on the same screen, or at once on another one
+        response = schedule(client, admin, heat, screen, "2030-01-01T20:30:00")
+        assert response.status_code == status.HTTP_201_CREATED
+        response = schedule(client, admin, heat, screen, "2030-01-01T15:10:00")
+        assert response.status_code == status.HTTP_201_CREATED
+        response = schedule(
+            client, admin, heat, cinema["screen 2"], "2030-01-01T18:00:00"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_film_starts_on_two_screens_at_once(self, client, admin, cinema):
+        """Test that the title key does not stop one film playing on two screens"""
+        for screen in (cinema["screen 1"], cinema["screen 2"]):
+            response = schedule(
+                client, admin, cinema["dune"], screen, "2030-01-01T18:00:00"
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+
+    def test_movie_edits_respect_the_schedule(self, client, db_session, admin, cinema):
+        """Test that adding or moving a show goes through the overlap check"""
+        dune, screen = cinema["dune"], cinema["screen 1"]
+        schedule(client, admin, dune, screen, "2030-01-01T18:00:00")
+        show = schedule(
+            client, admin, cinema["heat"], cinema["screen 2"], "2030-01-01T21:00:00"
+        ).json()["id"]
+        movie = {"title": "Heat", "description": "Heist", "auditorium_id": screen}
+
+        response = client.post(
+            "/admin/movies",
+            headers=admin,
+            json={**movie, "title": "Legacy", "showtime": "2030-01-01T19:00:00"},
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        response = client.put(
+            f"/admin/movies/{show}",
+            headers=admin,
+            json={**movie, "showtime": "2030-01-01T19:30:00"},
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        # Moving a show later over its own old slot is fine; ends_at follows
+        response = client.put(
+            f"/admin/movies/{show}",
+            headers=admin,
+            json={**movie, "showtime": "2030-01-01T22:00:00"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        ends_at = db_session.execute(
+            select(Movie.ends_at).where(Movie.id == show)
+        ).scalar()
+        assert ends_at == datetime(2030, 1, 2, 0, 50)
+
+    def test_legacy_shows_block_their_start_time(
+        self, client, db_session, admin, cinema
+    ):
+        """Test that shows added without a film still occupy their screen"""
+        screen = cinema["screen 1"]
+        client.post(
+            "/admin/movies",
+            headers=admin,
+            json={
+                "title": "Legacy",
+                "description": "No runtime",
+                "showtime": "2030-01-01T19:00:00",
+                "auditorium_id": screen,
+            },
+        )
+        response = schedule(
+            client, admin, cinema["dune"], screen, "2030-01-01T18:00:00"
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert (
+            overlapping_show(
+                db_session,
+                screen,
+                datetime(2030, 1, 1, 19, 1),
+                datetime(2030, 1, 1, 21),
+            )
+            is None
+        )
+
+    def test_playing_tonight(self, client, admin, user, cinema):
+        """Test what's playing at one theater within a time window, by start"""
+        dune, heat = cinema["dune"], cinema["heat"]
+        schedule(client, admin, dune, cinema["screen 1"], "2030-01-01T21:00:00")
+        schedule(client, admin, heat, cinema["screen 2"], "2030-01-01T19:00:00")
+        schedule(client, admin, dune, cinema["screen 2"], "2030-01-02T10:00:00")
+        schedule(client, admin, dune, cinema["uptown screen"], "2030-01-01T20:00:00")
+
+        response = client.get(
+            f"/theaters/{cinema['downtown']}/showtimes",
+            headers=user,
+            params={"showtime_from": "2030-01-01T17:00:00"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [(show["title"], show["screen"]) for show in response.json()] == [
+            ("Heat", "D2"),
+            ("Dune", "D1"),
+        ]
+        response = client.get("/theaters/999/showtimes", headers=user)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        theaters = client.get("/theaters", headers=user).json()
+        assert [theater["name"] for theater in theaters] == ["Downtown", "Uptown"]
+
+    def test_next_showings_are_bookable(self, client, admin, user, cinema):
+        """Test a film's next showings across theaters, and booking one"""
+        dune = cinema["dune"]
+        for screen, start in (
+            ("uptown screen", "2030-01-03T18:00:00"),
+            ("screen 1", "2030-01-01T18:00:00"),
+            ("screen 2", "2030-01-02T18:00:00"),
+        ):
+            schedule(client, admin, dune, cinema[screen], start)
+
+        response = client.get(
+            f"/films/{dune}/showtimes",
+            headers=user,
+            params={"showtime_from": "2030-01-01T19:00:00", "limit": 1},
+        )
+        shows = response.json()
+        assert [(show["screen"], show["showtime"]) for show in shows] == [
+            ("D2", "2030-01-02T18:00:00")
+        ]
+
+        show_id = shows[0]["id"]
+        response = client.post(
+            f"/movies/{show_id}/book",
+            headers=user,
+            json={"movie_id": show_id, "quantity": 2},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        seats = client.get(f"/movies/{show_id}/seats", headers=user).json()
+        assert seats["available"] == 4
+
+        listing = client.get("/movies", headers=user, params={"fields": "id,film_id"})
+        assert {"id": show_id, "film_id": dune} in listing.json()
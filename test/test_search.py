@@ -0,0 +1,136 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app.utils.search import MovieSearchIndex, edit_distance, tokenize
+
+
+def search(client, token, q, **params):
+    response = client.get(
+        "/movies/search",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"q": q, **params},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return [hit["title"] for hit in response.json()]
+
+
+def add_movie(client, token, title, description, hour=18):
+    response = client.post(
+        "/admin/movies",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "title": title,
+            "description": description,
+            "showtime": f"2030-01-01T{hour:02d}:00:00",
+        },
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.user
+class TestMovieSearch:
+    """Test suite for the movie search endpoint and its index"""
+
+    def test_tokenize_and_edit_distance(self):
+        """Test accent folding and the bounded edit distance"""
+        words = ["amelie", "le", "fabuleux", "2001"]
+        assert tokenize("Amélie: Le Fabuleux, 2001!") == words
+        assert edit_distance("interstelar", "interstellar", 2) == 1
+        assert edit_distance("knigth", "knight", 1) == 1
+        assert edit_distance("kitten", "sitting", 1) == 2
+
+    def test_search_follows_admin_writes(self, client, admin_token, normal_user_token):
+        """Test that created, updated and deleted movies are reflected at once"""
+        add_movie(client, admin_token, "Interstellar", "Space travel")
+        add_movie(client, admin_token, "Inception", "Dreams within dreams", hour=20)
+        hits = client.get(
+            "/movies/search",
+            headers={"Authorization": f"Bearer {normal_user_token}"},
+            params={"q": "interstellar"},
+        ).json()
+        assert [hit["title"] for hit in hits] == ["Interstellar"]
+        movie_id = hits[0]["id"]
+
+        client.put(
+            f"/admin/movies/{movie_id}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={
+                "title": "Gravity",
+                "description": "Space debris",
+                "showtime": "2030-01-01T18:00:00",
+            },
+        )
+        assert search(client, normal_user_token, "interstellar") == []
+        assert search(client, normal_user_token, "space") == ["Gravity"]
+
+        client.delete(
+            f"/admin/movies/{movie_id}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert search(client, normal_user_token, "gravity") == []
+
+    def test_prefix_and_typo_matching(self, client, admin_token, normal_user_token):
+        """Test search-as-you-type prefixes and misspelled words"""
+        add_movie(client, admin_token, "Interstellar", "Space travel")
+        add_movie(client, admin_token, "The Dark Knight", "Gotham", hour=20)
+        assert search(client, normal_user_token, "inter") == ["Interstellar"]
+        assert search(client, normal_user_token, "interstelar") == ["Interstellar"]
+        assert search(client, normal_user_token, "dark knigth") == ["The Dark Knight"]
+        # Only the last word is a prefix; the others must match in full
+        assert search(client, normal_user_token, "da knight") == []
+
+    def test_title_matches_rank_first(self, client, admin_token, normal_user_token):
+        """Test that a word in the title outranks the same word in a description"""
+        add_movie(client, admin_token, "Heat", "A crew plans one last robbery")
+        add_movie(client, admin_token, "Robbery", "A thriller", hour=20)
+        assert search(client, normal_user_token, "robbery") == ["Robbery", "Heat"]
+        assert search(client, normal_user_token, "robbery", limit=1) == ["Robbery"]
+
+    def test_bulk_import_is_indexed(self, client, admin_token, normal_user_token):
+        """Test that movies written by a bulk import are searchable"""
+        rows = [
+            {"title": "Dune", "description": "Desert", "showtime": "2030-01-01T18:00"},
+            {"title": "Alien", "description": "Space", "showtime": "2030-01-01T20:00"},
+        ]
+        client.post(
+            "/admin/movies/bulk",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json=rows,
+        )
+        assert search(client, normal_user_token, "desert") == ["Dune"]
+        assert search(client, normal_user_token, "ali") == ["Alien"]
+
+    def test_search_requires_query(self, client, normal_user_token):
+        """Test that an empty query is rejected and punctuation matches nothing"""
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        response = client.get("/movies/search", headers=headers, params={"q": ""})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert search(client, normal_user_token, "?!") == []
+
+    def test_query_latency_on_large_catalog(self):
+        """Test that typical queries stay fast over 100k indexed movies"""
+        rng = random.Random(0)
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        words = [
+            "".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(5000)
+        ]
+        start = datetime(2030, 1, 1)
+        index = MovieSearchIndex()
+        index._add_many(
+            (
+                movie_id,
+                " ".join(rng.sample(words, 3)),
+                " ".join(rng.sample(words, 12)),
+                start + timedelta(minutes=movie_id),
+            )
+            for movie_id in range(1, 100_001)
+        )
+        queries = [words[0], words[1][:3], f"{words[2]} {words[3][:2]}", words[4] + "x"]
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query)
+            assert time.perf_counter() - started < 0.05, query
@@ -0,0 +1,250 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import context
+from app.context import AppContext, warm_up
+from app.models.movie import Movie
+from app.utils import holds
+from app.utils.catalog import catalog_page
+from app.utils.feed import StateBroker
+from app.utils.pagination import MovieFilters, PageParams
+from app.utils.ratelimit import StateRateLimitStore
+from app.utils.state import InMemoryLRUBackend, SQLiteStateBackend
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two backends over one SQLite file, as two worker processes would open it"""
+    path = str(tmp_path / "state.db")
+    backends = [SQLiteStateBackend(path), SQLiteStateBackend(path)]
+    yield backends
+    for backend in backends:
+        backend.close()
+
+
+class RecordingHub:
+    def __init__(self, watched=()):
+        self.published = []
+        self.shows = list(watched)
+
+    def has_subscribers(self, movie_id):
+        return movie_id in self.shows
+
+    def watched(self):
+        return self.shows
+
+    def publish(self, movie_id, update):
+        self.published.append((movie_id, update))
+
+
+@pytest.mark.user
+class TestSharedState:
+    """Test suite for the shared-state backends and the stores built on them"""
+
+    @pytest.mark.parametrize("kind", ["memory", "sqlite"])
+    def test_backend_contract(self, kind, tmp_path):
+        """Test get, set with expiry, delete, incr and update"""
+        if kind == "memory":
+            backend = InMemoryLRUBackend()
+        else:
+            backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+        backend.set("page", b"[]")
+        backend.set("short", b"x", ex=0.05)
+        assert backend.get("page") == b"[]" and backend.get("short") == b"x"
+        time.sleep(0.1)
+        assert backend.get("short") is None
+
+        assert [backend.incr("version") for _ in range(3)] == [1, 2, 3]
+        assert int(backend.get("version")) == 3
+        assert backend.update("list", lambda value: (value or b"") + b"a") == b"a"
+        assert backend.update("list", lambda value: (value or b"") + b"b") == b"ab"
+
+        assert backend.set("claim", b"first", ex=60, nx=True)
+        assert backend.set("claim", b"second", nx=True) is None
+        assert backend.get("claim") == b"first"
+        assert backend.set("short", b"again", nx=True)  # expired keys are free
+
+        backend.delete("page", "version")
+        assert backend.get("page") is None and backend.get("version") is None
+        backend.close()
+
+    def test_unbounded_memory_backend_only_drops_expired(self):
+        """Test that without max_entries entries stay until they expire"""
+        backend = InMemoryLRUBackend(max_entries=None)
+        backend.set("short", b"x", ex=0.01)
+        time.sleep(0.02)
+        for index in range(InMemoryLRUBackend.PURGE_EVERY * 2):
+            backend.set(f"denied:{index}", b"1", ex=60)
+        assert backend.get("denied:0") == b"1"
+        assert "short" not in backend._entries
+
+    def test_workers_share_state(self, workers):
+        """Test that what one worker writes the other reads"""
+        first, second = workers
+        first.set("catalog:1:page", b"[]", ex=60)
+        assert second.get("catalog:1:page") == b"[]"
+        assert first.incr("catalog:version") == 1
+        assert second.incr("catalog:version") == 2
+        second.delete("catalog:1:page")
+        assert first.get("catalog:1:page") is None
+
+    def test_concurrent_increments_are_atomic(self, workers):
+        """Test that read-modify-writes from both workers never lose an update"""
+
+        def bump(backend):
+            for _ in range(100):
+                backend.update("count", lambda value: b"%d" % (int(value or 0) + 1))
+                backend.incr("hits")
+
+        threads = [
+            threading.Thread(target=bump, args=(backend,)) for backend in workers * 2
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert workers[0].get("count") == b"400"
+        assert workers[1].get("hits") == b"400"
+
+    def test_rate_limits_shared_between_workers(self, workers):
+        """Test that both workers drain the same token bucket and window"""
+        first, second = (StateRateLimitStore(backend) for backend in workers)
+        assert first.take("ip", 2, 1.0, now=100.0) == 0
+        assert second.take("ip", 2, 1.0, now=100.0) == 0
+        assert first.take("ip", 2, 1.0, now=100.0) == pytest.approx(1.0)
+        assert second.take("ip", 2, 1.0, now=101.5) == 0
+
+        for store in (first, second, first):
+            store.hit("user", 60, now=30.0)
+        assert second.count("user", 60, now=59.0) == 3
+        assert first.hit("user", 60, now=90.0) == pytest.approx(2.5)
+
+        now = time.time()
+        first.hit("fail", 60, now)
+        second.reset("fail", 60)
+        assert first.count("fail", 60, now) == 0
+
+    def test_feed_relayed_between_workers(self, workers):
+        """Test that updates published by one worker reach the other's hub"""
+        hubs = [RecordingHub(), RecordingHub()]
+        publisher, listener = (
+            StateBroker(hub, backend) for hub, backend in zip(hubs, workers)
+        )
+        seen = listener._sequence()
+        publisher.publish(1, {"movie_id": 1, "booked": 3})
+        publisher.publish(2, {"movie_id": 2, "booked": 1})
+        assert listener._relay(seen) == seen + 2
+        assert hubs[1].published == [
+            (1, {"movie_id": 1, "booked": 3}),
+            (2, {"movie_id": 2, "booked": 1}),
+        ]
+        assert listener._relay(seen + 2) == seen + 2
+        assert len(hubs[1].published) == 2
+
+    def test_relay_waits_for_an_event_still_being_written(self, workers):
+        """Test that a sequence number without its event holds the relay back"""
+        hubs = [RecordingHub(), RecordingHub()]
+        publisher, listener = (
+            StateBroker(hub, backend) for hub, backend in zip(hubs, workers)
+        )
+        seen = listener._sequence()
+        pending = publisher.backend.incr(StateBroker.SEQUENCE_KEY)  # not set yet
+        publisher.publish(2, {"movie_id": 2, "booked": 1})
+        assert listener._relay(seen) == seen
+        assert hubs[1].published == []
+
+        publisher.backend.set(f"feed:event:{pending}", b'{"movie_id": 1}')
+        assert listener._relay(seen) == seen + 2
+        assert [movie_id for movie_id, _ in hubs[1].published] == [1, 2]
+
+        lost = publisher.backend.incr(StateBroker.SEQUENCE_KEY)  # never written
+        publisher.publish(3, {"movie_id": 3, "booked": 1})
+        listener.GAP_WAIT_SECONDS = 0
+        assert listener._relay(seen + 2) == seen + 2
+        assert listener._relay(seen + 2) == lost + 1
+        assert hubs[1].published[-1][0] == 3
+
+    def test_only_watched_shows_are_counted(self, workers):
+        """Test that writers skip availability for shows nobody watches anywhere"""
+        hubs = [RecordingHub(), RecordingHub(watched=[7])]
+        writer, viewer = (
+            StateBroker(hub, backend) for hub, backend in zip(hubs, workers)
+        )
+        assert not writer.wants(7)
+        viewer._refresh_watched()
+        assert writer.wants(7) and not writer.wants(8)
+        viewer.watch(8)  # a new subscription
+        assert writer.wants(8)
+
+
+@pytest.mark.admin
+class TestAppContext:
+    """Test suite for startup warm-up and graceful shutdown"""
+
+    def test_warm_up_primes_catalog(self, db_session, many_movies):
+        """Test that warm-up caches the first catalog page and opens the pool"""
+        engine = db_session.get_bind()
+        report = warm_up(engine, sessionmaker(bind=engine))
+        assert report["connections"] == 1  # the test engine's StaticPool
+        assert report["catalog_primed"] is True
+
+        page = PageParams(limit=100, cursor=None, fields=None)
+        cached, cache_status = catalog_page(db_session, page, MovieFilters(sort="id"))
+        assert cache_status == "HIT"
+        assert cached.body.count(b'"title"') == db_session.query(Movie).count()
+
+    def test_app_stats_report_startup(self, client, admin_token):
+        """Test that the running worker reports itself ready and warmed up"""
+        response = client.get(
+            "/admin/stats/app", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        stats = response.json()
+        assert stats["status"] == "ready"
+        assert stats["state_backend"] == "memory"
+        assert stats["warmup"]["queries"] > 0
+
+    def test_stop_after_a_failed_start(self, monkeypatch):
+        """Test that shutdown still releases resources when startup failed"""
+
+        def unreachable():
+            raise RuntimeError("database unreachable")
+
+        monkeypatch.setattr(context, "AUTO_MIGRATE", False)
+        app_context = AppContext(create_engine("sqlite://"), unreachable)
+
+        async def scenario():
+            with pytest.raises(RuntimeError):
+                await app_context.start()
+            await app_context.stop()
+
+        asyncio.run(scenario())
+        assert app_context.status == "stopped"
+
+    def test_workers_finish_their_pass_before_stopping(self, monkeypatch):
+        """Test that shutdown waits for an in-flight sweep instead of cutting it off"""
+        started, finished = threading.Event(), []
+
+        def slow_sweep(session_factory):
+            started.set()
+            time.sleep(0.2)
+            finished.append(True)
+
+        monkeypatch.setattr(holds, "sweep_expired_holds", slow_sweep)
+        monkeypatch.setattr(holds, "HOLD_SWEEP_INTERVAL_SECONDS", 0.01)
+
+        async def scenario():
+            stopping = asyncio.Event()
+            task = asyncio.create_task(holds.run_hold_sweeper(None, stopping))
+            await asyncio.to_thread(started.wait, 1)
+            stopping.set()
+            await asyncio.wait_for(task, 1)
+
+        asyncio.run(scenario())
+        assert finished == [True]
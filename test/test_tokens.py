@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+import time
+from datetime import timedelta
+
+from app.utils.security import create_access_token
+from app.utils.state import SQLiteStateBackend
+from app.utils.tokens import TokenCache, TokenError, jwt_backend
+
+
+class CountingBackend:
+    """Wraps the real JWT backend and counts decode calls"""
+
+    def __init__(self):
+        self.decodes = 0
+
+    def encode(self, claims):
+        return jwt_backend.encode(claims)
+
+    def decode(self, token):
+        self.decodes += 1
+        return jwt_backend.decode(token)
+
+
+@pytest.mark.auth
+class TestTokenCache:
+    """Test suite for the verified-token cache"""
+
+    def test_cache_hit_skips_decode(self):
+        """Test that a repeated token is only decoded once"""
+        backend = CountingBackend()
+        cache = TokenCache(backend)
+        token = create_access_token("user", 1, False, timedelta(minutes=5))
+        for _ in range(3):
+            assert cache.decode(token)["sub"] == "user"
+        assert backend.decodes == 1
+        assert cache.stats()["hits"] == 2
+
+    def test_expired_token_rejected(self):
+        """Test that expired tokens are never served, cached or not"""
+        cache = TokenCache(CountingBackend())
+        token = create_access_token("user", 1, False, timedelta(seconds=-1))
+        with pytest.raises(TokenError):
+            cache.decode(token)
+
+    def test_revoke_user(self):
+        """Test that revoking a user rejects tokens issued before the revocation"""
+        cache = TokenCache(CountingBackend())
+        old = create_access_token("user", 1, False, timedelta(minutes=5))
+        other = create_access_token("other", 2, False, timedelta(minutes=5))
+        cache.decode(old)
+        cache.revoke_user(1)
+        with pytest.raises(TokenError):
+            cache.decode(old)
+        assert cache.decode(other)["id"] == 2
+
+        time.sleep(0.01)
+        fresh = create_access_token("user", 1, False, timedelta(minutes=5))
+        assert cache.decode(fresh)["id"] == 1
+
+    def test_lru_bound(self):
+        """Test that the cache never grows past its size limit"""
+        cache = TokenCache(CountingBackend(), max_entries=2)
+        for user_id in range(5):
+            cache.decode(create_access_token("u", user_id, False, timedelta(minutes=5)))
+        assert cache.stats()["size"] == 2
+
+    def test_revocations_shared_between_workers(self, tmp_path):
+        """Test that a logout or session revocation on one worker holds on another"""
+        path = str(tmp_path / "state.db")
+        states = [SQLiteStateBackend(path), SQLiteStateBackend(path)]
+        first, second = (TokenCache(CountingBackend(), state=state) for state in states)
+        token = create_access_token("user", 1, False, timedelta(minutes=5))
+        other = create_access_token("other", 2, False, timedelta(minutes=5))
+        for cache in (first, second):
+            cache.decode(token)
+            cache.decode(other)
+
+        first.revoke_token(token)
+        with pytest.raises(TokenError):
+            second.decode(token)  # even though the claims are cached there
+        with pytest.raises(TokenError):
+            asyncio.run(second.decode_async(token))
+        second.revoke_user(2)
+        with pytest.raises(TokenError):
+            first.decode(other)
+        for state in states:
+            state.close()
+
+    def test_revocations_outlive_the_lru(self):
+        """Test that logouts are kept until the token expires, however many there are"""
+        cache = TokenCache(CountingBackend())
+        first = create_access_token("user", 0, False, timedelta(minutes=5))
+        cache.revoke_token(first)
+        for user_id in range(1, 1500):
+            cache.revoke_token(
+                create_access_token("user", user_id, False, timedelta(minutes=5))
+            )
+        with pytest.raises(TokenError):
+            asyncio.run(cache.decode_async(first))
@@ -82,3 +82,284 @@ class TestUser:
         assert isinstance(bookings, list)
         if bookings:
             assert all(key in bookings[0] for key in ["user_id", "movie_id"])
+
+    def test_view_seat_map(self, client, normal_user_token, seated_movie):
+        """Test viewing the seat map of a reserved-seating show"""
+        movie_id = seated_movie.id
+        response = client.get(
+            f"/movies/{movie_id}/seats",
+            headers={"Authorization": f"Bearer {normal_user_token}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["available"] == 6
+        assert [seat["label"] for seat in data["seats"]][:3] == ["A1", "A2", "A3"]
+
+    def test_book_specific_seats(self, client, normal_user_token, seated_movie):
+        """Test booking several named seats in one request"""
+        movie_id = seated_movie.id
+        response = client.post(
+            f"/movies/{movie_id}/book",
+            headers={"Authorization": f"Bearer {normal_user_token}"},
+            json={"movie_id": movie_id, "seats": ["a1", "A2"]},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["seats"] == ["A1", "A2"]
+
+        seat_map = client.get(
+            f"/movies/{movie_id}/seats",
+            headers={"Authorization": f"Bearer {normal_user_token}"},
+        ).json()
+        assert seat_map["available"] == 4
+
+    def test_book_taken_seat(
+        self, client, db_session, normal_user_token, admin_user, seated_movie
+    ):
+        """Test that a seat already sold to someone else cannot be booked"""
+        from app.utils.inventory import book_seats
+
+        movie_id = seated_movie.id
+        book_seats(db_session, admin_user.id, seated_movie, labels=["B3"])
+        db_session.commit()
+
+        response = client.post(
+            f"/movies/{movie_id}/book",
+            headers={"Authorization": f"Bearer {normal_user_token}"},
+            json={"movie_id": movie_id, "seats": ["B2", "B3"]},
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        history = client.get(
+            "/movies/history", headers={"Authorization": f"Bearer {normal_user_token}"}
+        ).json()
+        assert history == []
+
+    def test_book_more_seats_than_available(
+        self, client, normal_user_token, seated_movie
+    ):
+        """Test that a quantity larger than the remaining seats is rejected"""
+        movie_id = seated_movie.id
+        response = client.post(
+            f"/movies/{movie_id}/book",
+            headers={"Authorization": f"Bearer {normal_user_token}"},
+            json={"movie_id": movie_id, "quantity": 7},
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_cancel_releases_seats(self, client, normal_user_token, seated_movie):
+        """Test that cancelling a booking frees its seats"""
+        movie_id = seated_movie.id
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        client.post(
+            f"/movies/{movie_id}/book",
+            headers=headers,
+            json={"movie_id": movie_id, "quantity": 3},
+        )
+        response = client.delete(f"/movies/{movie_id}/cancel", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        seat_map = client.get(f"/movies/{movie_id}/seats", headers=headers)
+        assert seat_map.json()["available"] == 6
+
+    def test_hold_and_confirm_seats(self, client, normal_user_token, seated_movie):
+        """Test holding seats and then confirming them as a booking"""
+        movie_id = seated_movie.id
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        response = client.post(
+            f"/movies/{movie_id}/hold", headers=headers, json={"seats": ["A1", "A2"]}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        hold = response.json()
+        assert hold["seats"] == ["A1", "A2"]
+
+        seat_map = client.get(f"/movies/{movie_id}/seats", headers=headers).json()
+        assert seat_map["available"] == 4
+        assert seat_map["seats"][0]["status"] == "held"
+
+        response = client.post(f"/holds/{hold['hold_id']}/confirm", headers=headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["seats"] == ["A1", "A2"]
+
+        response = client.post(f"/holds/{hold['hold_id']}/confirm", headers=headers)
+        assert response.status_code == status.HTTP_410_GONE
+
+    def test_release_hold(self, client, normal_user_token, seated_movie):
+        """Test releasing a hold before it expires"""
+        movie_id = seated_movie.id
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        hold = client.post(
+            f"/movies/{movie_id}/hold", headers=headers, json={"quantity": 6}
+        ).json()
+        response = client.delete(f"/holds/{hold['hold_id']}", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        seat_map = client.get(f"/movies/{movie_id}/seats", headers=headers).json()
+        assert seat_map["available"] == 6
+
+    def test_expired_holds_are_swept(
+        self, client, db_session, normal_user_token, seated_movie
+    ):
+        """Test that the sweeper frees seats of holds past their TTL"""
+        from datetime import datetime, timedelta
+        from app.utils.holds import hold_stats, sweep_expired_holds
+
+        movie_id = seated_movie.id
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        hold = client.post(
+            f"/movies/{movie_id}/hold", headers=headers, json={"quantity": 2}
+        ).json()
+        expired_before = hold_stats.snapshot()["expired"]
+
+        later = datetime.utcnow() + timedelta(hours=1)
+        assert sweep_expired_holds(lambda: db_session, now=later) == 1
+        assert hold_stats.snapshot()["expired"] == expired_before + 1
+
+        seat_map = client.get(f"/movies/{movie_id}/seats", headers=headers).json()
+        assert seat_map["available"] == 6
+        response = client.post(f"/holds/{hold['hold_id']}/confirm", headers=headers)
+        assert response.status_code == status.HTTP_410_GONE
+
+    def test_failed_sweep_is_retried(
+        self, client, db_session, normal_user_token, seated_movie, monkeypatch
+    ):
+        """Test that holds from a sweep that failed are expired by the next one"""
+        from datetime import datetime, timedelta
+        from app.utils import holds
+
+        movie_id = seated_movie.id
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        client.post(f"/movies/{movie_id}/hold", headers=headers, json={"quantity": 2})
+
+        def database_down(*args):
+            raise RuntimeError("database is locked")
+
+        later = datetime.utcnow() + timedelta(hours=1)
+        with monkeypatch.context() as patch:
+            patch.setattr(holds, "expire_holds", database_down)
+            with pytest.raises(RuntimeError):
+                holds.sweep_expired_holds(lambda: db_session, now=later)
+        assert holds.sweep_expired_holds(lambda: db_session, now=later) == 1
+        seat_map = client.get(f"/movies/{movie_id}/seats", headers=headers).json()
+        assert seat_map["available"] == 6
+
+    def test_movies_keyset_pagination(self, client, normal_user_token, many_movies):
+        """Test walking the movie listing page by page with the cursor header"""
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, "sort": "showtime", "fields": "id,showtime"}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/movies", headers=headers, params=params)
+            assert response.status_code == status.HTTP_200_OK
+            page = response.json()
+            assert all(set(movie) == {"id", "showtime"} for movie in page)
+            seen.extend(movie["id"] for movie in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        expected = [movie_id for movie_id, _ in sorted(many_movies, key=lambda m: m[1])]
+        assert seen == expected
+
+    def test_movies_filters(self, client, normal_user_token, many_movies):
+        """Test filtering the movie listing by title prefix and showtime range"""
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        response = client.get(
+            "/movies", headers=headers, params={"title_prefix": "Movie 3"}
+        )
+        assert [movie["title"] for movie in response.json()] == ["Movie 3"]
+
+        response = client.get(
+            "/movies",
+            headers=headers,
+            params={
+                "showtime_from": "2030-01-01T19:00:00",
+                "showtime_to": "2030-01-01T21:00:00",
+            },
+        )
+        assert len(response.json()) == 2
+
+    @pytest.mark.parametrize(
+        "params", [{"cursor": "not-a-cursor"}, {"fields": "title,password"}]
+    )
+    def test_movies_invalid_listing_params(self, client, normal_user_token, params):
+        """Test rejecting malformed cursors and unknown projected fields"""
+        response = client.get(
+            "/movies",
+            headers={"Authorization": f"Bearer {normal_user_token}"},
+            params=params,
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_movies_served_from_cache(
+        self, client, normal_user_token, admin_token, test_movie_data, many_movies
+    ):
+        """Test catalog caching, ETag revalidation and invalidation on admin writes"""
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        first = client.get("/movies", headers=headers)
+        assert first.headers["x-cache"] == "MISS"
+        second = client.get("/movies", headers=headers)
+        assert second.headers["x-cache"] == "HIT"
+        assert second.content == first.content
+
+        etag = first.headers["etag"]
+        response = client.get("/movies", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        test_movie_data["showtime"] = test_movie_data["showtime"].isoformat()
+        client.post(
+            "/admin/movies",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json=test_movie_data,
+        )
+        response = client.get("/movies", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["x-cache"] == "MISS"
+        assert len(response.json()) == len(many_movies) + 1
+
+    def test_batch_booking(self, client, normal_user_token, many_movies, seated_movie):
+        """Test booking several movies at once with per-item results"""
+        seated_id = seated_movie.id
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        (first, _), (second, _) = many_movies[:2]
+        items = [
+            {"movie_id": first},
+            {"movie_id": second},
+            {"movie_id": first},
+            {"movie_id": 9999},
+            {"movie_id": second + 1, "quantity": 2},
+            {"movie_id": seated_id, "seats": ["A1", "Z9"]},
+        ]
+        response = client.post("/bookings/batch", headers=headers, json={"items": items})
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert (data["succeeded"], data["failed"]) == (2, 4)
+        statuses = [result["status"] for result in data["results"]]
+        assert statuses == ["booked", "booked", "failed", "failed", "failed", "failed"]
+        assert data["results"][3]["detail"] == "Movie not found"
+
+        response = client.post(
+            "/bookings/batch",
+            headers=headers,
+            json={"items": [{"movie_id": seated_id, "quantity": 2}]},
+        )
+        assert len(response.json()["results"][0]["seats"]) == 2
+        seat_map = client.get(f"/movies/{seated_id}/seats", headers=headers).json()
+        assert seat_map["available"] == 4
+
+        history = client.get("/movies/history", headers=headers).json()
+        assert len(history) == 3
+
+    def test_batch_cancel(self, client, normal_user_token, many_movies, seated_movie):
+        """Test cancelling several bookings at once, freeing their seats"""
+        (movie_id, _), seated_id = many_movies[0], seated_movie.id
+        headers = {"Authorization": f"Bearer {normal_user_token}"}
+        items = [{"movie_id": movie_id}, {"movie_id": seated_id, "quantity": 3}]
+        client.post("/bookings/batch", headers=headers, json={"items": items})
+        response = client.post(
+            "/bookings/batch/cancel",
+            headers=headers,
+            json={"movie_ids": [movie_id, seated_id, 9999]},
+        )
+        data = response.json()
+        assert (data["succeeded"], data["failed"]) == (2, 1)
+        assert client.get("/movies/history", headers=headers).json() == []
+        seat_map = client.get(f"/movies/{seated_id}/seats", headers=headers).json()
+        assert seat_map["available"] == 6
@@ -0,0 +1,182 @@
+import pytest
+from datetime import timedelta
+from fastapi import status
+
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.utils import waitlist
+from app.utils.exceptions import SEATS_UNAVAILABLE_ERROR
+from app.utils.security import create_access_token
+
+# The background worker would race the tests for pending shows, so tests
+# disable it and run a promotion pass themselves with the original function
+promote_pending = waitlist.promote_pending
+
+
+@pytest.fixture
+def users(db_session, monkeypatch):
+    """Creates users `a` to `e` and returns their bearer headers"""
+    monkeypatch.setattr(waitlist, "promote_pending", lambda session_factory: 0)
+    waitlist.promotion_queue.drain()
+    names = ["a", "b", "c", "d", "e"]
+    accounts = [User(username=name, hashed_password="x") for name in names]
+    db_session.add_all(accounts)
+    db_session.commit()
+    return {
+        account.username: {
+            "Authorization": "Bearer "
+            + create_access_token(
+                account.username, account.id, False, timedelta(minutes=5)
+            )
+        }
+        for account in accounts
+    }
+
+
+@pytest.fixture
+def sold_out(client, users, seated_movie):
+    """Books all six seats of the seated movie: three for `a`, three for `b`"""
+    movie_id = seated_movie.id
+    for name in ("a", "b"):
+        response = client.post(
+            f"/movies/{movie_id}/book",
+            headers=users[name],
+            json={"movie_id": movie_id, "quantity": 3},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+    return movie_id
+
+
+def join(client, headers, movie_id, quantity):
+    return client.post(
+        f"/movies/{movie_id}/waitlist", headers=headers, json={"quantity": quantity}
+    )
+
+
+def entry(client, headers, movie_id):
+    return client.get(f"/movies/{movie_id}/waitlist", headers=headers).json()
+
+
+@pytest.mark.user
+class TestWaitlist:
+    """Test suite for waitlists on sold-out shows"""
+
+    def test_join_requires_sold_out_show(self, client, users, seated_movie):
+        """Test that users are told to book while seats are free"""
+        response = join(client, users["c"], seated_movie.id, 1)
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_join_and_leave(self, client, users, sold_out):
+        """Test queue positions, duplicate joins and leaving"""
+        first = join(client, users["c"], sold_out, 2)
+        assert first.status_code == status.HTTP_201_CREATED
+        assert first.json()["position"] == 1
+        assert join(client, users["d"], sold_out, 1).json()["position"] == 2
+        assert join(client, users["c"], sold_out, 1).status_code == 400
+
+        response = client.delete(f"/movies/{sold_out}/waitlist", headers=users["c"])
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert entry(client, users["c"], sold_out)["status"] == "left"
+        assert entry(client, users["d"], sold_out)["position"] == 1
+
+    def test_promotion_is_fifo(self, client, db_session, users, sold_out):
+        """Test that freed seats go to the head of the queue, never overtaking"""
+        for name, quantity in (("c", 2), ("d", 2), ("e", 1)):
+            assert join(client, users[name], sold_out, quantity).status_code == 201
+        client.delete(f"/movies/{sold_out}/cancel", headers=users["a"])
+
+        assert promote_pending(lambda: db_session) == 1
+        promoted = entry(client, users["c"], sold_out)
+        assert promoted["status"] == "promoted" and promoted["booking_id"]
+        history = client.get("/movies/history", headers=users["c"]).json()
+        assert [booking["movie_id"] for booking in history] == [sold_out]
+        # One seat is left, but `e` (party of 1) must not jump ahead of `d`
+        assert entry(client, users["d"], sold_out)["position"] == 1
+        assert entry(client, users["e"], sold_out)["position"] == 2
+
+    def test_lost_race_requeues_show(
+        self, client, db_session, users, sold_out, monkeypatch
+    ):
+        """Test that a promotion beaten to the seats keeps its place and is retried"""
+        join(client, users["c"], sold_out, 2)
+        client.delete(f"/movies/{sold_out}/cancel", headers=users["a"])
+
+        def seats_taken(db, *args, **kwargs):
+            raise SEATS_UNAVAILABLE_ERROR
+
+        with monkeypatch.context() as patch:
+            patch.setattr(waitlist, "book_seats", seats_taken)
+            assert promote_pending(lambda: db_session) == 0
+        assert db_session.query(WaitlistEntry.status).scalar() == "waiting"
+        assert waitlist.promotion_queue.drain() == [sold_out]
+
+        waitlist.request_promotion([sold_out])
+        assert promote_pending(lambda: db_session) == 1
+
+    def test_freed_seats_cannot_be_taken_past_the_queue(
+        self, client, db_session, users, sold_out
+    ):
+        """Test that direct bookings, holds and batches wait behind the waitlist"""
+        join(client, users["c"], sold_out, 2)
+        client.delete(f"/movies/{sold_out}/cancel", headers=users["a"])
+
+        response = client.post(
+            f"/movies/{sold_out}/book",
+            headers=users["d"],
+            json={"movie_id": sold_out, "quantity": 1},
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert "waitlist" in response.json()["detail"]
+        response = client.post(
+            f"/movies/{sold_out}/hold", headers=users["d"], json={"quantity": 1}
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        response = client.post(
+            "/bookings/batch",
+            headers=users["d"],
+            json={"items": [{"movie_id": sold_out}]},
+        )
+        assert response.json()["failed"] == 1
+
+        assert promote_pending(lambda: db_session) == 1
+        assert entry(client, users["c"], sold_out)["status"] == "promoted"
+        # With nobody left waiting, the last free seat can be booked directly
+        response = client.post(
+            f"/movies/{sold_out}/book",
+            headers=users["d"],
+            json={"movie_id": sold_out, "quantity": 1},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_failed_pass_requeues_shows(
+        self, client, db_session, users, sold_out, monkeypatch
+    ):
+        """Test that shows drained by a pass that failed are offered again"""
+        join(client, users["c"], sold_out, 2)
+        client.delete(f"/movies/{sold_out}/cancel", headers=users["a"])
+
+        def database_down(db, movie_id):
+            raise RuntimeError("database is locked")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(waitlist, "promote_waitlist", database_down)
+            with pytest.raises(RuntimeError):
+                promote_pending(lambda: db_session)
+        assert promote_pending(lambda: db_session) == 1
+
+    def test_cancellations_promoted_in_one_pass(
+        self, client, db_session, users, sold_out
+    ):
+        """Test that cancellations landing together are handled by one pass"""
+        for name, quantity in (("c", 2), ("d", 2), ("e", 1)):
+            join(client, users[name], sold_out, quantity)
+        for name in ("a", "b"):
+            client.delete(f"/movies/{sold_out}/cancel", headers=users[name])
+
+        passes = waitlist.promotion_queue.snapshot()["passes"]
+        assert promote_pending(lambda: db_session) == 3
+        assert waitlist.promotion_queue.snapshot()["passes"] == passes + 1
+        for name in ("c", "d", "e"):
+            assert entry(client, users[name], sold_out)["status"] == "promoted"
+        seats = client.get(f"/movies/{sold_out}/seats", headers=users["a"]).json()
+        assert seats["available"] == 1